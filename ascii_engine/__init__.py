@@ -0,0 +1,54 @@
+"""
+ASCII Engine: a terminal canvas with Processing-style sketches
+
+Importing the package is cheap: submodules and the names below are only
+imported the first time they are accessed, so `import ascii_engine` does not
+pull in multiprocessing, NumPy or anything else a program never uses.
+
+    import ascii_engine
+    canvas = ascii_engine.Canvas(50, 150)   # imports ascii_engine.main here
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'Canvas': 'main',
+    'COLORS': 'main',
+    'WorldCanvas': 'world',
+    'Camera': 'world',
+    'BrailleCanvas': 'subcell',
+    'HalfBlockCanvas': 'subcell',
+    'ParticleSystem': 'particles',
+    'STYLES': 'styles',
+    'StyleTable': 'styles',
+    'style': 'styles',
+    'rgb': 'colors',
+    'hsv': 'colors',
+    'SwapChain': 'swapchain',
+    'Frame': 'swapchain',
+    'LiveSketch': 'sketch',
+    'sketch_namespace': 'sketch',
+    'SketchProcess': 'sketch_process',
+}
+
+_SUBMODULES = ('main', 'colors', 'styles', 'rowhash', 'terminal', 'font', 'world', 'subcell',
+               'particles', 'swapchain', 'sketch', 'sketch_process', 'recording', 'runner')
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f'{__name__}.{_EXPORTS[name]}'), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f'{__name__}.{name}')
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cache it so later lookups don't come back here
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_SUBMODULES))
@@ -0,0 +1,8 @@
+"""Command line entry point: python -m ascii_engine run sketch.py"""
+
+import sys
+
+from ascii_engine.runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Color parsing, HSV helpers and terminal palette quantization for the ASCII Engine
+
+Colors can be given as one of the named ANSI colors, a hex string ('#ff8800'
+or '#f80') or an (r, g, b) tuple. RGB colors are emitted as truecolor escapes
+when the terminal supports them; otherwise they are downsampled through a
+32x32x32 lookup table that is filled on demand, so every distinct color pays
+for the nearest-color search once.
+"""
+
+import os
+import colorsys
+from array import array
+
+COLOR_16 = 16
+COLOR_256 = 256
+COLOR_TRUECOLOR = 1 << 24
+
+# Typical xterm RGB values for the 16 system colors, in SGR order
+ANSI16_NAMES = [
+    'black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white',
+    'bright_black', 'bright_red', 'bright_green', 'bright_yellow',
+    'bright_blue', 'bright_magenta', 'bright_cyan', 'bright_white',
+]
+
+ANSI16_RGB = [
+    (0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0),
+    (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+    (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+    (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+]
+
+NAMED_RGB = dict(zip(ANSI16_NAMES, ANSI16_RGB))
+
+# Channel levels of the 6x6x6 cube in the xterm 256-color palette (indices 16-231)
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+
+def _clamp(value):
+    value = int(round(value))
+    return 0 if value < 0 else 255 if value > 255 else value
+
+
+def parse_color(color):
+    """Normalize a color spec to a name, an (r, g, b) tuple or None"""
+    if color is None:
+        return None
+    if isinstance(color, str):
+        if color in NAMED_RGB:
+            return color
+        if color.startswith('#'):
+            digits = color[1:]
+            if len(digits) == 3:
+                digits = ''.join(d * 2 for d in digits)
+            if len(digits) == 6:
+                try:
+                    return tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+                except ValueError:
+                    pass
+        raise ValueError(f"Unknown color: {color!r}")
+    if isinstance(color, (tuple, list)) and len(color) == 3:
+        return tuple(_clamp(c) for c in color)
+    raise ValueError(f"Unknown color: {color!r}")
+
+
+def rgb(r, g, b):
+    """Build an RGB color from 0-255 channel values"""
+    return (_clamp(r), _clamp(g), _clamp(b))
+
+
+def hsv(h, s=1.0, v=1.0):
+    """Build an RGB color from hue, saturation and value in the 0-1 range (hue wraps)"""
+    r, g, b = colorsys.hsv_to_rgb(h % 1.0, s, v)
+    return (_clamp(r * 255), _clamp(g * 255), _clamp(b * 255))
+
+
+def to_rgb(color):
+    """Return the RGB tuple for any color spec"""
+    color = parse_color(color)
+    if isinstance(color, str):
+        return NAMED_RGB[color]
+    return color
+
+
+def detect_color_mode(environ=None):
+    """Guess the color capability of the attached terminal from the environment"""
+    environ = os.environ if environ is None else environ
+    if environ.get('COLORTERM', '').lower() in ('truecolor', '24bit'):
+        return COLOR_TRUECOLOR
+    if '256color' in environ.get('TERM', ''):
+        return COLOR_256
+    return COLOR_16
+
+
+def _distance(c1, c2):
+    dr = c1[0] - c2[0]
+    dg = c1[1] - c2[1]
+    db = c1[2] - c2[2]
+    return dr * dr + dg * dg + db * db
+
+
+def _nearest_cube_level(value):
+    return min(range(6), key=lambda i: abs(CUBE_LEVELS[i] - value))
+
+
+def _nearest_256(color):
+    """Nearest xterm-256 index from the color cube and the grayscale ramp"""
+    ri, gi, bi = (_nearest_cube_level(c) for c in color)
+    cube_index = 16 + 36 * ri + 6 * gi + bi
+    cube_rgb = (CUBE_LEVELS[ri], CUBE_LEVELS[gi], CUBE_LEVELS[bi])
+
+    gray_step = min(23, max(0, (sum(color) // 3 - 8 + 5) // 10))
+    gray_level = 8 + 10 * gray_step
+    gray_rgb = (gray_level, gray_level, gray_level)
+
+    if _distance(color, gray_rgb) < _distance(color, cube_rgb):
+        return 232 + gray_step
+    return cube_index
+
+
+def palette_rgb(index):
+    """RGB of an xterm-256 palette index (0-15 are the ANSI colors)"""
+    if index < 16:
+        return ANSI16_RGB[index]
+    if index < 232:
+        index -= 16
+        return (CUBE_LEVELS[index // 36], CUBE_LEVELS[index // 6 % 6], CUBE_LEVELS[index % 6])
+    level = 8 + 10 * (index - 232)
+    return (level, level, level)
+
+
+def _nearest_16(color):
+    return min(range(16), key=lambda i: _distance(color, ANSI16_RGB[i]))
+
+
+class Quantizer:
+    """Maps RGB colors to a palette index through a 32x32x32 lookup table"""
+
+    def __init__(self, nearest):
+        self._nearest = nearest
+        self._lut = array('h', [-1]) * (32 * 32 * 32)
+
+    def index(self, color):
+        r, g, b = color
+        slot = ((r >> 3) << 10) | ((g >> 3) << 5) | (b >> 3)
+        palette_index = self._lut[slot]
+        if palette_index < 0:
+            # Quantize the cell center so every color in the slot agrees
+            center = ((r & ~7) | 4, (g & ~7) | 4, (b & ~7) | 4)
+            palette_index = self._nearest(center)
+            self._lut[slot] = palette_index
+        return palette_index
+
+    def prime(self):
+        """Fill the whole table up front instead of on first use"""
+        for r in range(0, 256, 8):
+            for g in range(0, 256, 8):
+                for b in range(0, 256, 8):
+                    self.index((r, g, b))
+
+
+QUANTIZE_16 = Quantizer(_nearest_16)
+QUANTIZE_256 = Quantizer(_nearest_256)
+
+
+def sgr_color_codes(color, mode, background=False):
+    """SGR parameters selecting a parsed color in the given output mode"""
+    if isinstance(color, str):
+        index = ANSI16_NAMES.index(color)
+        base = 40 if background else 30
+        return [str(base + index if index < 8 else base + 60 + index - 8)]
+
+    if mode == COLOR_TRUECOLOR:
+        return ['48' if background else '38', '2', str(color[0]), str(color[1]), str(color[2])]
+    if mode == COLOR_256:
+        return ['48' if background else '38', '5', str(QUANTIZE_256.index(color))]
+    return sgr_color_codes(ANSI16_NAMES[QUANTIZE_16.index(color)], mode, background)
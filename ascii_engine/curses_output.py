@@ -0,0 +1,144 @@
+"""
+Showing canvas frames in a curses window
+
+Shared by the IDE preview and the command line runner's curses backend.
+Rows are painted as runs of cells with the same style, one addnstr() per
+run, and style IDs are translated to curses attributes and color pairs the
+first time they are seen.
+
+curses.color_pair() only has 8 bits for the pair number, so at most 256
+pairs are usable however many the terminal reports. All style maps share
+one set of pairs; once it is used up, new color combinations get the
+nearest pair that already exists rather than a number that would wrap.
+"""
+
+import curses
+
+from ascii_engine.colors import ANSI16_NAMES, QUANTIZE_16, QUANTIZE_256, palette_rgb
+
+# Pair numbers that fit in the A_COLOR bits of an attribute
+MAX_PAIRS = 256
+# How far a default (-1) color is from any palette color when matching pairs
+DEFAULT_COLOR_DISTANCE = 3 * 255 * 255
+
+
+def style_runs(chars, styles):
+    """Split a canvas row into (start column, text, style ID) runs of equal style"""
+    n = len(chars)
+    start = 0
+    while start < n:
+        style_id = styles[start]
+        end = start + 1
+        while end < n and styles[end] == style_id:
+            end += 1
+        yield start, ''.join(chars[start:end]), style_id
+        start = end
+
+
+def paint_row(win, y, x, chars, styles, attr_for):
+    """Paint one row of cells at (y, x) of a window, one addnstr() per style run"""
+    for start, text, style_id in style_runs(chars, styles):
+        win.addnstr(y, x + start, text, len(text), attr_for(style_id))
+
+
+class CursesPairs:
+    """Color pairs handed out on demand, from first_pair up to limit (exclusive)"""
+
+    def __init__(self, limit, first_pair=16, init_pair=None):
+        self.limit = min(limit, MAX_PAIRS)
+        self.next_pair = first_pair
+        self.init_pair = init_pair or curses.init_pair
+        # (fg, bg) -> pair, including combinations mapped onto a nearest pair
+        self.pairs = {(-1, -1): 0}
+        self.allocated = [(0, -1, -1)]
+
+    def pair(self, fg, bg):
+        """Pair number showing curses colors fg on bg, or the closest available"""
+        pair = self.pairs.get((fg, bg))
+        if pair is None:
+            if self.next_pair < self.limit:
+                pair = self.next_pair
+                self.init_pair(pair, fg, bg)
+                self.allocated.append((pair, fg, bg))
+                self.next_pair += 1
+            else:
+                # No pair is ever redefined, so attributes built earlier stay right
+                pair = min(self.allocated, key=lambda p: _color_distance(p[1], fg) + _color_distance(p[2], bg))[0]
+            self.pairs[(fg, bg)] = pair
+        return pair
+
+
+def _color_distance(a, b):
+    if a == b:
+        return 0
+    if a == -1 or b == -1:
+        return DEFAULT_COLOR_DISTANCE
+    return sum((x - y) ** 2 for x, y in zip(palette_rgb(a), palette_rgb(b)))
+
+
+_shared_pairs = None
+
+
+def shared_pairs():
+    """The pairs all style maps of this process share; curses.start_color() must have been called"""
+    global _shared_pairs
+    if _shared_pairs is None:
+        _shared_pairs = CursesPairs(getattr(curses, 'COLOR_PAIRS', 0))
+    return _shared_pairs
+
+
+class CursesStyleMap:
+    """Translates engine style IDs into curses attributes, allocating color pairs lazily"""
+
+    ATTRS = {
+        'bold': 'A_BOLD',
+        'dim': 'A_DIM',
+        'italic': 'A_ITALIC',
+        'underline': 'A_UNDERLINE',
+        'blink': 'A_BLINK',
+        'reverse': 'A_REVERSE',
+    }
+
+    def __init__(self, style_table, pairs=None):
+        self.style_table = style_table
+        self.attrs = []
+        self.has_colors = curses.has_colors()
+        if self.has_colors:
+            self.pairs = pairs or shared_pairs()
+
+    def attr(self, style_id):
+        """Curses attribute for a style ID, built on first use"""
+        attrs = self.attrs
+        while len(attrs) <= style_id:
+            attrs.append(self._build(self.style_table.keys[len(attrs)]))
+        return attrs[style_id]
+
+    def _build(self, key):
+        fg, bg, names = key
+        attr = 0
+        for name in names:
+            attr |= getattr(curses, self.ATTRS.get(name, ''), 0)
+
+        if self.has_colors:
+            fg_number, fg_bold = self._color_number(fg)
+            bg_number, _ = self._color_number(bg)
+            if fg_bold:
+                attr |= curses.A_BOLD
+            attr |= curses.color_pair(self.pairs.pair(fg_number, bg_number))
+        return attr
+
+    def _color_number(self, color):
+        """Curses color number for a parsed color, plus whether it needs bold to look bright"""
+        if color is None:
+            return -1, False
+        if isinstance(color, str):
+            index = ANSI16_NAMES.index(color)
+        elif curses.COLORS >= 256:
+            return QUANTIZE_256.index(color), False
+        else:
+            index = QUANTIZE_16.index(color)
+
+        # Terminals with only 8 colors show the bright half as bold
+        if index >= curses.COLORS:
+            return index - 8, True
+        return index, False
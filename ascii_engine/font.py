@@ -0,0 +1,130 @@
+"""
+Built-in bitmap font for banner text
+
+Each glyph is GLYPH_HEIGHT rows of '#' (set) and '.' (clear) cells, rows
+separated by '/'. Glyphs are 1 to 5 cells wide. Lowercase letters are drawn
+with the uppercase glyphs and unknown characters as '?'.
+
+glyph_sprite() rasterizes a glyph once per scale into the runs of set cells
+in each row. Canvas.big_text() draws those runs as spans, so a banner costs
+a few slice writes per glyph row instead of one write per cell.
+"""
+
+import functools
+
+GLYPH_HEIGHT = 5
+# Blank columns between glyphs and rows between lines, before scaling
+GLYPH_SPACING = 1
+LINE_SPACING = 1
+
+FONT = {
+    'A': '.##./#..#/####/#..#/#..#',
+    'B': '###./#..#/###./#..#/###.',
+    'C': '.###/#.../#.../#.../.###',
+    'D': '###./#..#/#..#/#..#/###.',
+    'E': '####/#.../###./#.../####',
+    'F': '####/#.../###./#.../#...',
+    'G': '.###/#.../#.##/#..#/.###',
+    'H': '#..#/#..#/####/#..#/#..#',
+    'I': '###/.#./.#./.#./###',
+    'J': '..##/...#/...#/#..#/.##.',
+    'K': '#..#/#.#./##../#.#./#..#',
+    'L': '#.../#.../#.../#.../####',
+    'M': '#...#/##.##/#.#.#/#...#/#...#',
+    'N': '#..#/##.#/#.##/#..#/#..#',
+    'O': '.##./#..#/#..#/#..#/.##.',
+    'P': '###./#..#/###./#.../#...',
+    'Q': '.##./#..#/#..#/#.#./.#.#',
+    'R': '###./#..#/###./#.#./#..#',
+    'S': '.###/#.../.##./...#/###.',
+    'T': '#####/..#../..#../..#../..#..',
+    'U': '#..#/#..#/#..#/#..#/.##.',
+    'V': '#...#/#...#/#...#/.#.#./..#..',
+    'W': '#...#/#...#/#.#.#/##.##/#...#',
+    'X': '#...#/.#.#./..#../.#.#./#...#',
+    'Y': '#...#/.#.#./..#../..#../..#..',
+    'Z': '####/...#/.##./#.../####',
+    '0': '.##./#.##/#..#/##.#/.##.',
+    '1': '.#./##./.#./.#./###',
+    '2': '###./...#/.##./#.../####',
+    '3': '###./...#/.##./...#/###.',
+    '4': '#..#/#..#/####/...#/...#',
+    '5': '####/#.../###./...#/###.',
+    '6': '.##./#.../###./#..#/.##.',
+    '7': '####/...#/..#./.#../.#..',
+    '8': '.##./#..#/.##./#..#/.##.',
+    '9': '.##./#..#/.###/...#/.##.',
+    ' ': '.../.../.../.../...',
+    '.': '././././#',
+    ',': '../../../.#/#.',
+    ':': './#/./#/.',
+    ';': '../.#/../.#/#.',
+    '!': '#/#/#/./#',
+    '?': '###./...#/.##./..../.#..',
+    '-': '.../.../###/.../...',
+    '+': '.../.#./###/.#./...',
+    '=': '.../###/.../###/...',
+    '_': '..../..../..../..../####',
+    '/': '..#/..#/.#./#../#..',
+    '\\': '#../#../.#./..#/..#',
+    '%': '#...#/...#./..#../.#.../#...#',
+    '(': '.#/#./#./#./.#',
+    ')': '#./.#/.#/.#/#.',
+    '[': '##/#./#./#./##',
+    ']': '##/.#/.#/.#/##',
+    '<': '..#/.#./#../.#./..#',
+    '>': '#../.#./..#/.#./#..',
+    '|': '#/#/#/#/#',
+    "'": '#/#/././.',
+    '"': '#.#/#.#/.../.../...',
+    '*': '.../#.#/.#./#.#/...',
+    '#': '.#.#./#####/.#.#./#####/.#.#.',
+}
+
+
+def _glyph_rows(char):
+    rows = FONT.get(char)
+    if rows is None:
+        rows = FONT.get(char.upper(), FONT['?'])
+    return rows.split('/')
+
+
+def glyph_width(char, scale=1):
+    """Width in cells of a glyph drawn at the given scale"""
+    return len(_glyph_rows(char)[0]) * scale
+
+
+@functools.lru_cache(maxsize=1024)
+def glyph_sprite(char, scale=1):
+    """A glyph rasterized as (width, runs), each run (row, start, end) with end exclusive
+
+    Every font cell becomes a scale x scale block. Sprites are cached, so
+    each glyph is only rasterized once per scale.
+    """
+    rows = _glyph_rows(char)
+    runs = []
+    for r, row in enumerate(rows):
+        col = 0
+        while col < len(row):
+            if row[col] != '#':
+                col += 1
+                continue
+            end = col
+            while end < len(row) and row[end] == '#':
+                end += 1
+            for dy in range(scale):
+                runs.append((r * scale + dy, col * scale, end * scale))
+            col = end
+    return len(rows[0]) * scale, tuple(runs)
+
+
+def text_size(s, scale=1):
+    """(width, height) in cells of a string drawn with Canvas.big_text()"""
+    lines = s.split('\n')
+    width = 0
+    for line in lines:
+        if line:
+            line_width = sum(glyph_width(char, scale) for char in line)
+            width = max(width, line_width + GLYPH_SPACING * scale * (len(line) - 1))
+    height = len(lines) * GLYPH_HEIGHT * scale + (len(lines) - 1) * LINE_SPACING * scale
+    return width, height
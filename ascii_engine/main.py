@@ -1,8 +1,21 @@
 import os
+import sys
 import time
 import math
+import functools
+import itertools
 from random import randint
 
+if __package__ in (None, ''):
+    # Allow running this file directly as a script
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ascii_engine.styles import STYLES, DEFAULT_STYLE, encode_cells
+from ascii_engine.rowhash import row_hashes, RowDiff
+from ascii_engine.terminal import stdout_writer, reset_stdout_writer
+from ascii_engine.font import GLYPH_HEIGHT, GLYPH_SPACING, LINE_SPACING, glyph_sprite
+
+# Raw escape codes kept for sketches that print directly; drawing goes through STYLES
 COLORS = {
   'black': '\u001b[30m',
   'yellow': '\u001b[33m',
@@ -15,12 +28,177 @@ COLORS = {
   'reset': '\u001b[0m'
 }
 
+def _minor_offset(k, major, minor):
+    """Minor-axis offset at step k of a Bresenham line with major >= minor > 0 deltas"""
+    return (2 * minor * k + major - 1) // (2 * major)
+
+
+def _first_step(j, major, minor):
+    """First step at which a Bresenham line's minor-axis offset reaches j"""
+    if j <= 0:
+        return 0
+    return (2 * j - 1) * major // (2 * minor) + 1
+
+
+def _axis_range(start, sign, low, high):
+    """Offsets n for which start + sign * n lies in [low, high)"""
+    if sign > 0:
+        return low - start, high - 1 - start
+    return start - (high - 1), start - low
+
+
+def _clip_steps(major, minor, major_range, minor_range, start=0):
+    """First and last step from start on of a Bresenham line whose pixel is inside both offset ranges
+
+    This is Liang-Barsky on the integer grid: the minor offset at each step
+    has a closed form, so the visible steps are solved for rather than found
+    by walking the line. Returns None if no step is visible.
+    """
+    first = max(start, major_range[0])
+    last = min(major, major_range[1])
+    low, high = minor_range
+    if minor == 0:
+        if not low <= 0 <= high:
+            return None
+    else:
+        first = max(first, _first_step(low, major, minor))
+        last = min(last, _first_step(high + 1, major, minor) - 1)
+    if first > last:
+        return None
+    return first, last
+
+
+@functools.lru_cache(maxsize=512)
+def _circle_spans(radius):
+    """Rows of a filled midpoint circle as (row offset, half width) pairs
+
+    The cells the midpoint algorithm fills depend only on the radius, so
+    they are worked out once per radius and reused by every circle.
+    """
+    half_widths = {}
+    x = 0
+    y = radius
+    d = 1 - radius
+    while True:
+        for row, half in ((y, x), (-y, x), (x, y), (-x, y)):
+            if half_widths.get(row, -1) < half:
+                half_widths[row] = half
+        if x >= y:
+            break
+        if d < 0:
+            d += 2 * x + 3
+        else:
+            d += 2 * (x - y) + 5
+            y -= 1
+        x += 1
+    return tuple(sorted(half_widths.items()))
+
+
+@functools.lru_cache(maxsize=512)
+def _circle_outline(radius):
+    """Cells of a midpoint circle outline as (x offset, y offset) pairs"""
+    points = set()
+    x = 0
+    y = radius
+    d = 1 - radius
+    while True:
+        points.update(((x, y), (-x, y), (x, -y), (-x, -y),
+                       (y, x), (-y, x), (y, -x), (-y, -x)))
+        if x >= y:
+            break
+        if d < 0:
+            d += 2 * x + 3
+        else:
+            d += 2 * (x - y) + 5
+            y -= 1
+        x += 1
+    return tuple(sorted(points))
+
+
+def _coords(points):
+    """Split (x, y) pairs or flat x0, y0, x1, y1, ... coordinates into rounded x and y lists"""
+    try:
+        x, y = points[0]
+    except TypeError:
+        return ([int(round(x)) for x in points[0::2]],
+                [int(round(y)) for y in points[1::2]])
+    return ([int(round(point[0])) for point in points],
+            [int(round(point[1])) for point in points])
+
+
+def _edge_table(xs, ys, inclusive=False):
+    """Edges of a closed outline as [first scanline, end scanline, x, numerator, dx, dy, winding]
+
+    x is where the edge crosses its current scanline, kept as numerator / dy
+    so that stepping to the next scanline is numerator += dx and integer
+    vertices give exact crossings. Scanlines are the integer y values in
+    [y_top, y_bottom), or [y_top, y_bottom] with inclusive=True; horizontal
+    edges are dropped.
+    """
+    edges = []
+    for i in range(len(xs)):
+        x1, y1, x2, y2 = xs[i - 1], ys[i - 1], xs[i], ys[i]
+        if y1 == y2:
+            continue
+        winding = 1
+        if y1 > y2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+            winding = -1
+        first = math.ceil(y1)
+        end = math.floor(y2) + 1 if inclusive else math.ceil(y2)
+        if first < end:
+            dx = x2 - x1
+            dy = y2 - y1
+            numerator = x1 * dy + (first - y1) * dx
+            edges.append([first, end, numerator / dy, numerator, dx, dy, winding])
+    return edges
+
+
+def _scan_edges(edges, top, bottom):
+    """Step an edge table down the scanlines in [top, bottom)
+
+    Yields (y, active) for each scanline crossed by an edge, with the active
+    edges sorted by x. Each edge's x is stepped incrementally from one
+    scanline to the next instead of being intersected again, and edges that
+    start above top are stepped straight to it.
+    """
+    if not edges:
+        return
+    edges.sort(key=lambda edge: edge[0])
+    count = len(edges)
+    active = []
+    i = 0
+    y = max(top, edges[0][0])
+    while y < bottom:
+        while i < count and edges[i][0] <= y:
+            edge = edges[i]
+            if edge[0] < y:
+                edge[3] += edge[4] * (y - edge[0])
+                edge[2] = edge[3] / edge[5]
+            active.append(edge)
+            i += 1
+        active = [edge for edge in active if edge[1] > y]
+        if not active:
+            if i == count:
+                return
+            y = edges[i][0]
+            continue
+        active.sort(key=lambda edge: edge[2])
+        yield y, active
+        for edge in active:
+            edge[3] += edge[4]
+            edge[2] = edge[3] / edge[5]
+        y += 1
+
+
 class Canvas:
     def __init__(self, rows, cols):
         self.blank = ' '
         self.rows = rows
         self.cols = cols
+        self.style_table = STYLES
         self.canvas = [[self.blank for c in range(cols)] for r in range(rows)]
+        self.styles = [[DEFAULT_STYLE] * cols for r in range(rows)]
         self.fill_char = '●'
         self.stroke_char = '○'
         self.rect_fill_char = '█'
@@ -28,81 +206,251 @@ class Canvas:
         self.line_char = '█'
         self.arc_char = '●'
         self.triangle_char = '▲'
+        self.polygon_fill_char = '█'
+        self.big_text_char = '█'
         self.ellipse_fill_char = '●'
         self.ellipse_stroke_char = '○'
         self.bezier_char = '█'
         self.curve_char = '█'
+        # Hashes of the last frame drawn in place, so identical frames send nothing
+        self.output_diff = RowDiff()
+        self.stats = self.output_diff.stats
+        # Row lists dropped by resize(), kept for when the canvas grows again
+        self._spare_rows = ([], [])
+        self._resized = False
+
+    def draw(self, in_place=False):
+        """Print the frame
+
+        Every call prints a frame, even one identical to the last. With
+        in_place=True on a terminal, only the rows that changed are rewritten
+        where they are, with one write(), and an identical frame sends
+        nothing. Only use that when nothing else prints to the terminal
+        between frames: text that scrolls it moves the rows that weren't
+        rewritten.
+        """
+        # On a terminal, rewrite the changed rows in place with one write()
+        writer = stdout_writer() if in_place else None
+        if writer is not None:
+            changed = self.output_diff.changed(self.row_hashes())
+            if self._resized:
+                writer.reset()  # Clear what the old size left on screen
+            self._resized = False
+            writer.write_rows(changed, self.encode_row, self.rows)
+            return
+
+        # Printing scrolls the terminal, so an in-place frame after this starts over
+        reset_stdout_writer()
 
-    def draw(self):
         # Build entire frame as a string first (buffer)
         output = []
         for r in range(self.rows):
-            row = ''.join(self.canvas[r])
-            output.append(row)
+            output.append(self.encode_row(r))
         
         # Print entire frame at once to reduce flickering
         print('\n'.join(output), flush=True)
 
+    def row_hashes(self):
+        """One hash per row of the current cells"""
+        return row_hashes(self.canvas, self.styles)
+
+    def encode_row(self, r):
+        """Encode one row, emitting a cached escape only where the style changes"""
+        return encode_cells(self.canvas[r], self.styles[r], self.style_table.escapes)
+
+    def clip_rect(self):
+        """The drawable area as (top, left, bottom, right), bottom and right exclusive"""
+        return 0, 0, self.rows, self.cols
+
+    def _outside(self, left, top, right, bottom):
+        """True if a bounding box (inclusive, in x/y) misses the drawable area entirely"""
+        clip_top, clip_left, clip_bottom, clip_right = self.clip_rect()
+        # Written so that fractional coordinates rounding onto the edge still count
+        return (right <= clip_left - 1 or left >= clip_right or
+                bottom <= clip_top - 1 or top >= clip_bottom)
+
+    def _inside(self, left, top, right, bottom):
+        """True if a bounding box (inclusive, in x/y) lies entirely in the drawable area"""
+        clip_top, clip_left, clip_bottom, clip_right = self.clip_rect()
+        return (left >= clip_left and right <= clip_right - 1 and
+                top >= clip_top and bottom <= clip_bottom - 1)
+
     def set_pixel(self, row, col, char, color='white'):
-        """Set a single pixel on the canvas"""
+        """Set a single pixel on the canvas (color is a name or a style ID)"""
         if 0 <= row < self.rows and 0 <= col < self.cols:
-            colored_char = f"{COLORS[color]}{char}{COLORS['reset']}"
-            self.canvas[row][col] = colored_char
+            self.canvas[row][col] = char
+            self.styles[row][col] = self.style_table.resolve(color)
+
+    def _plot(self, row, col, char, style):
+        """Set a cell already known to be inside the clip rectangle"""
+        self.canvas[row][col] = char
+        self.styles[row][col] = style
+
+    def _span(self, row, start, end, char, style):
+        """Fill cells start..end-1 of a row already clipped to the clip rectangle"""
+        chars = self.canvas[row]
+        styles = self.styles[row]
+        count = end - start
+        if count < 8:
+            # Short runs (most line spans) are cheaper cell by cell than as slices
+            for col in range(start, end):
+                chars[col] = char
+                styles[col] = style
+        else:
+            chars[start:end] = [char] * count
+            styles[start:end] = [style] * count
+
+    def _write(self, row, col, text, style):
+        """Write a string into a row already clipped to the clip rectangle"""
+        end = col + len(text)
+        self.canvas[row][col:end] = text
+        self.styles[row][col:end] = [style] * len(text)
+
+    def _hline(self, clip, row, x1, x2, char, style):
+        """Fill columns x1..x2 of a row, clamped to the clip rectangle"""
+        top, left, bottom, right = clip
+        if top <= row < bottom:
+            start = max(x1, left)
+            end = min(x2 + 1, right)
+            if start < end:
+                self._span(row, start, end, char, style)
+    
+    def points(self, xs, ys, chars='.', styles=None, color='white'):
+        """Set many single cells in one call
+        
+        xs and ys are sequences or arrays of x/y coordinates, rounded to the
+        nearest cell. chars is one character for every point or a sequence
+        with one per point; styles works as in circles().
+        """
+        resolve = self.style_table.resolve
+        if styles is None:
+            styles = itertools.repeat(resolve(color))
+        if isinstance(chars, str):
+            chars = itertools.repeat(chars)
+        top, left, bottom, right = self.clip_rect()
+        plot = self._plot
+        
+        for x, y, char, style in zip(xs, ys, chars, styles):
+            x = int(round(x))
+            y = int(round(y))
+            if top <= y < bottom and left <= x < right:
+                plot(y, x, char, resolve(style))
+    
+    def text(self, x, y, s, color='white'):
+        """Write a string with its first character at column x of row y
+        
+        Each line is clipped and written with one slice assignment; a newline
+        continues on the next row at column x. Returns the column just past
+        the end of the last line, for appending text in another color.
+        """
+        style = self.style_table.resolve(color)
+        top, left, bottom, right = self.clip_rect()
+        x = int(round(x))
+        y = int(round(y))
+        end = x
+        for row, line in enumerate(s.split('\n'), y):
+            end = x + len(line)
+            if top <= row < bottom:
+                start = max(x, left)
+                stop = min(end, right)
+                if start < stop:
+                    self._write(row, start, line[start - x:stop - x], style)
+        return end
+    
+    def big_text(self, x, y, s, color='white', scale=1, char=None):
+        """Write banner text in the built-in bitmap font with its top-left corner at (x, y)
+        
+        Glyphs are GLYPH_HEIGHT cells tall, scaled up by an integer factor,
+        and drawn with char (big_text_char by default). Each glyph is
+        rasterized once into cached runs, which are drawn as spans. Returns
+        the column just past the end of the last line.
+        """
+        char = self.big_text_char if char is None else char
+        style = self.style_table.resolve(color)
+        clip = self.clip_rect()
+        x = int(round(x))
+        y = int(round(y))
+        height = GLYPH_HEIGHT * scale
+        spacing = GLYPH_SPACING * scale
+        end = x
+        for line in s.split('\n'):
+            end = x
+            last_row = y + height - 1
+            for glyph in line:
+                width, runs = glyph_sprite(glyph, scale)
+                last_col = end + width - 1
+                if runs and not self._outside(end, y, last_col, last_row):
+                    if self._inside(end, y, last_col, last_row):
+                        for row, start, stop in runs:
+                            self._span(y + row, end + start, end + stop, char, style)
+                    else:
+                        for row, start, stop in runs:
+                            self._hline(clip, y + row, end + start, end + stop - 1, char, style)
+                end = last_col + 1 + spacing
+            if line:
+                end -= spacing
+            y += height + LINE_SPACING * scale
+        return end
     
     def circle(self, center_x, center_y, radius, filled=True, color='yellow'):
         """Draw a circle using the midpoint circle algorithm (Bresenham-like)"""
-        if radius <= 0:
-            return
-            
+        self.circles((center_x,), (center_y,), (radius,), filled=filled, color=color)
+    
+    def circles(self, xs, ys, radii, styles=None, filled=True, color='yellow'):
+        """Draw many circles in one call
+        
+        xs, ys and radii are equal-length sequences or arrays. styles gives
+        each circle its own color or style ID; without it every circle uses
+        color. Circles are drawn in order from span tables cached per radius,
+        with the clip rectangle looked up once for the whole batch.
+        """
+        resolve = self.style_table.resolve
+        if styles is None:
+            styles = itertools.repeat(resolve(color))
         char = self.fill_char if filled else self.stroke_char
+        top, left, bottom, right = self.clip_rect()
+        span = self._span
+        plot = self._plot
         
-        # Handle single pixel circle
-        if radius == 1:
-            self.set_pixel(center_y, center_x, char, color)
-            return
+        for cx, cy, radius, style in zip(xs, ys, radii, styles):
+            cx, cy, radius = int(round(cx)), int(round(cy)), int(round(radius))
+            if (radius <= 0 or cx + radius < left or cx - radius >= right or
+                    cy + radius < top or cy - radius >= bottom):
+                continue
+            style = resolve(style)
             
-        # Midpoint circle algorithm
-        x = 0
-        y = radius
-        d = 1 - radius
-        
-        # Draw initial points
-        self._draw_circle_points(center_x, center_y, x, y, char, color, filled)
-        
-        while x < y:
-            if d < 0:
-                d += 2 * x + 3
+            if radius == 1:
+                # Single pixel circle
+                if top <= cy < bottom and left <= cx < right:
+                    plot(cy, cx, char, style)
+            elif filled:
+                # One span per row, clamped to the clip rectangle
+                for offset, half in _circle_spans(radius):
+                    row = cy + offset
+                    if top <= row < bottom:
+                        start = max(cx - half, left)
+                        end = min(cx + half + 1, right)
+                        if start < end:
+                            span(row, start, end, char, style)
+            elif (cx - radius >= left and cx + radius < right and
+                    cy - radius >= top and cy + radius < bottom):
+                # Entirely visible: no bounds checks
+                for dx, dy in _circle_outline(radius):
+                    plot(cy + dy, cx + dx, char, style)
             else:
-                d += 2 * (x - y) + 5
-                y -= 1
-            x += 1
-            self._draw_circle_points(center_x, center_y, x, y, char, color, filled)
-    
-    def _draw_circle_points(self, cx, cy, x, y, char, color, filled):
-        """Draw the 8 symmetric points of a circle"""
-        points = [
-            (cx + x, cy + y), (cx - x, cy + y),
-            (cx + x, cy - y), (cx - x, cy - y),
-            (cx + y, cy + x), (cx - y, cy + x),
-            (cx + y, cy - x), (cx - y, cy - x)
-        ]
-        
-        if filled:
-            # Fill horizontal lines for filled circle
-            for py in [cy + y, cy - y, cy + x, cy - x]:
-                if py == cy + y or py == cy - y:
-                    for px in range(cx - x, cx + x + 1):
-                        self.set_pixel(py, px, char, color)
-                elif py == cy + x or py == cy - x:
-                    for px in range(cx - y, cx + y + 1):
-                        self.set_pixel(py, px, char, color)
-        else:
-            # Just draw the outline points
-            for px, py in points:
-                self.set_pixel(py, px, char, color)
+                for dx, dy in _circle_outline(radius):
+                    if top <= cy + dy < bottom and left <= cx + dx < right:
+                        plot(cy + dy, cx + dx, char, style)
     
     def bezier(self, x1, y1, cx1, cy1, cx2, cy2, x2, y2, color='white', steps=50):
         """Draw a cubic Bezier curve with two control points"""
+        # The curve stays inside the hull of its control points
+        xs = (x1, cx1, cx2, x2)
+        ys = (y1, cy1, cy2, y2)
+        if self._outside(min(xs), min(ys), max(xs), max(ys)):
+            return
+        plot = self._plot if self._inside(min(xs), min(ys), max(xs), max(ys)) else self.set_pixel
+        color = self.style_table.resolve(color)
         char = self.bezier_char
         
         # Draw curve using parametric equation
@@ -126,10 +474,15 @@ class Canvas:
                  3 * t_inv * t2 * cy2 + 
                  t3 * y2)
             
-            self.set_pixel(int(round(y)), int(round(x)), char, color)
+            plot(int(round(y)), int(round(x)), char, color)
     
     def bezier_quad(self, x1, y1, cx, cy, x2, y2, color='white', steps=30):
         """Draw a quadratic Bezier curve with one control point"""
+        bounds = (min(x1, cx, x2), min(y1, cy, y2), max(x1, cx, x2), max(y1, cy, y2))
+        if self._outside(*bounds):
+            return
+        plot = self._plot if self._inside(*bounds) else self.set_pixel
+        color = self.style_table.resolve(color)
         char = self.bezier_char
         
         # Draw curve using parametric equation
@@ -144,10 +497,20 @@ class Canvas:
             x = t_inv2 * x1 + 2 * t_inv * t * cx + t2 * x2
             y = t_inv2 * y1 + 2 * t_inv * t * cy + t2 * y2
             
-            self.set_pixel(int(round(y)), int(round(x)), char, color)
+            plot(int(round(y)), int(round(x)), char, color)
     
     def curve(self, x1, y1, x2, y2, x3, y3, x4, y4, color='white', steps=50, tension=0.5):
         """Draw a Catmull-Rom spline curve through 4 points"""
+        # Unlike a Bezier curve this can overshoot its points, so pad the hull
+        xs = (x1, x2, x3, x4)
+        ys = (y1, y2, y3, y4)
+        pad_x = abs(tension) * (max(xs) - min(xs)) + 1
+        pad_y = abs(tension) * (max(ys) - min(ys)) + 1
+        bounds = (min(xs) - pad_x, min(ys) - pad_y, max(xs) + pad_x, max(ys) + pad_y)
+        if self._outside(*bounds):
+            return
+        plot = self._plot if self._inside(*bounds) else self.set_pixel
+        color = self.style_table.resolve(color)
         char = self.curve_char
         
         # Catmull-Rom spline passes through the middle two points (x2,y2) and (x3,y3)
@@ -168,16 +531,15 @@ class Canvas:
             x = h1 * x1 + h2 * x2 + h3 * x3 + h4 * x4
             y = h1 * y1 + h2 * y2 + h3 * y3 + h4 * y4
             
-            self.set_pixel(int(round(y)), int(round(x)), char, color)
+            plot(int(round(y)), int(round(x)), char, color)
     
     def curve_vertex(self, points, color='white', steps=50, tension=0.5, closed=False):
         """Draw a smooth curve through multiple points using Catmull-Rom splines"""
+        color = self.style_table.resolve(color)
         if len(points) < 4:
             # Not enough points for Catmull-Rom, fall back to lines
-            for i in range(len(points) - 1):
-                x1, y1 = points[i]
-                x2, y2 = points[i + 1]
-                self.line(x1, y1, x2, y2, color)
+            if len(points) > 1:
+                self.polyline(points, color=color)
             return
         
         # Draw segments between consecutive groups of 4 points
@@ -201,31 +563,108 @@ class Canvas:
     
     def rect(self, x, y, width, height, filled=True, color='white'):
         """Draw a rectangle - Processing-style rect(x, y, width, height)"""
-        if width <= 0 or height <= 0:
-            return
-            
+        self.rects((x,), (y,), (width,), (height,), filled=filled, color=color)
+    
+    def rects(self, xs, ys, widths, heights, styles=None, filled=True, color='white'):
+        """Draw many rectangles in one call, like circles()"""
+        resolve = self.style_table.resolve
+        if styles is None:
+            styles = itertools.repeat(resolve(color))
         char = self.rect_fill_char if filled else self.rect_stroke_char
+        top, left, bottom, right = self.clip_rect()
+        span = self._span
+        plot = self._plot
         
-        if filled:
-            # Fill the entire rectangle
-            for row in range(y, y + height):
-                for col in range(x, x + width):
-                    self.set_pixel(row, col, char, color)
-        else:
-            # Draw just the outline
-            # Top and bottom edges
-            for col in range(x, x + width):
-                self.set_pixel(y, col, char, color)  # Top edge
-                self.set_pixel(y + height - 1, col, char, color)  # Bottom edge
+        for x, y, width, height, style in zip(xs, ys, widths, heights, styles):
+            x, y, width, height = int(round(x)), int(round(y)), int(round(width)), int(round(height))
+            x2 = x + width - 1
+            y2 = y + height - 1
+            if width <= 0 or height <= 0 or x2 < left or x >= right or y2 < top or y >= bottom:
+                continue
+            style = resolve(style)
             
-            # Left and right edges
-            for row in range(y, y + height):
-                self.set_pixel(row, x, char, color)  # Left edge
-                self.set_pixel(row, x + width - 1, char, color)  # Right edge
+            # Only the visible rows and columns are visited
+            start = max(x, left)
+            end = min(x2 + 1, right)
+            first_row = max(y, top)
+            last_row = min(y2 + 1, bottom)
+            if filled:
+                # Fill the entire rectangle
+                for row in range(first_row, last_row):
+                    span(row, start, end, char, style)
+            else:
+                # Top and bottom edges
+                for row in (y, y2):
+                    if top <= row < bottom:
+                        span(row, start, end, char, style)
+                # Left and right edges
+                for col in (x, x2):
+                    if left <= col < right:
+                        for row in range(first_row, last_row):
+                            plot(row, col, char, style)
     
     def line(self, x1, y1, x2, y2, color='white'):
-        """Draw a line using Bresenham's line algorithm"""
+        """Draw a line using Bresenham's line algorithm
+        
+        The line is clipped analytically: only the steps whose pixels land in
+        the clip rectangle are visited, and runs of steps on the same row are
+        filled as one span.
+        """
+        x1, y1, x2, y2 = int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2))
+        clip = self.clip_rect()
+        top, left, bottom, right = clip
+        if ((x1 < left and x2 < left) or (x1 >= right and x2 >= right) or
+                (y1 < top and y2 < top) or (y1 >= bottom and y2 >= bottom)):
+            return
+        self._segment(x1, y1, x2, y2, 0, self.line_char, self.style_table.resolve(color), clip)
+    
+    def lines(self, x1s, y1s, x2s, y2s, styles=None, color='white'):
+        """Draw many separate lines in one call, like circles()"""
+        resolve = self.style_table.resolve
+        if styles is None:
+            styles = itertools.repeat(resolve(color))
         char = self.line_char
+        clip = self.clip_rect()
+        top, left, bottom, right = clip
+        segment = self._segment
+        
+        for x1, y1, x2, y2, style in zip(x1s, y1s, x2s, y2s, styles):
+            x1, y1, x2, y2 = int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2))
+            if ((x1 < left and x2 < left) or (x1 >= right and x2 >= right) or
+                    (y1 < top and y2 < top) or (y1 >= bottom and y2 >= bottom)):
+                continue
+            segment(x1, y1, x2, y2, 0, char, resolve(style), clip)
+    
+    def polyline(self, points, closed=False, color='white'):
+        """Draw connected line segments through a sequence of points in one pass
+        
+        points is a sequence of (x, y) pairs or a flat sequence of coordinates
+        x0, y0, x1, y1, ... such as a list or an array. Each joint cell is
+        drawn once, and closed=True joins the last point back to the first.
+        """
+        if len(points) == 0:
+            return
+        xs, ys = _coords(points)
+        if self._outside(min(xs), min(ys), max(xs), max(ys)):
+            return
+        color = self.style_table.resolve(color)
+        char = self.line_char
+        clip = self.clip_rect()
+        
+        x1, y1 = xs[0], ys[0]
+        self._segment(x1, y1, x1, y1, 0, char, color, clip)
+        if closed:
+            xs.append(x1)
+            ys.append(y1)
+        for x2, y2 in zip(xs, ys):
+            if x2 != x1 or y2 != y1:
+                # Step 0 is the previous segment's last cell
+                self._segment(x1, y1, x2, y2, 1, char, color, clip)
+                x1, y1 = x2, y2
+    
+    def _segment(self, x1, y1, x2, y2, first, char, color, clip):
+        """Rasterize the steps of a Bresenham line from step first on, clipped to clip"""
+        top, left, bottom, right = clip
         
         # Bresenham's line algorithm
         dx = abs(x2 - x1)
@@ -235,25 +674,70 @@ class Canvas:
         sx = 1 if x1 < x2 else -1
         sy = 1 if y1 < y2 else -1
         
-        err = dx - dy
+        if dx == 0 and dy == 0:
+            if first == 0 and top <= y1 < bottom and left <= x1 < right:
+                self._plot(y1, x1, char, color)
+            return
         
-        x, y = x1, y1
+        # Both ends visible (the common case): every step is, no need to clip
+        visible = (left <= x1 < right and left <= x2 < right and
+                   top <= y1 < bottom and top <= y2 < bottom)
         
-        while True:
-            self.set_pixel(y, x, char, color)
-            
-            if x == x2 and y == y2:
-                break
-                
-            e2 = 2 * err
-            
-            if e2 > -dy:
-                err -= dy
-                x += sx
-                
-            if e2 < dx:
-                err += dx
-                y += sy
+        if dx >= dy:
+            # x advances every step; y after _minor_offset() steps
+            if visible:
+                steps = (first, dx)
+            else:
+                steps = _clip_steps(dx, dy, _axis_range(x1, sx, left, right), _axis_range(y1, sy, top, bottom), first)
+            if steps is None:
+                return
+            k, last = steps
+            span = self._span
+            if dy == 0:
+                # Horizontal: a single span
+                start_x = x1 + sx * k
+                end_x = x1 + sx * last
+                span(y1, min(start_x, end_x), max(start_x, end_x) + 1, char, color)
+                return
+            m = _minor_offset(k, dx, dy)
+            row = y1 + sy * m
+            # Steps sharing a row form one horizontal span; _first_step() unrolled:
+            # the span on row m ends at step numerator // denominator
+            numerator = (2 * m + 1) * dx
+            denominator = 2 * dy
+            while k <= last:
+                end = numerator // denominator
+                if end > last:
+                    end = last
+                if sx > 0:
+                    span(row, x1 + k, x1 + end + 1, char, color)
+                else:
+                    span(row, x1 - end, x1 - k + 1, char, color)
+                k = end + 1
+                row += sy
+                numerator += 2 * dx
+        else:
+            # y advances every step; x after _minor_offset() steps
+            if visible:
+                steps = (first, dy)
+            else:
+                steps = _clip_steps(dy, dx, _axis_range(y1, sy, top, bottom), _axis_range(x1, sx, left, right), first)
+            if steps is None:
+                return
+            k, last = steps
+            plot = self._plot
+            rows = range(y1 + sy * k, y1 + sy * (last + 1), sy)
+            if dx == 0:
+                # Vertical: no column arithmetic
+                for y in rows:
+                    plot(y, x1, char, color)
+                return
+            # _minor_offset() unrolled: x offset = numerator // denominator
+            numerator = 2 * dx * k + dy - 1
+            denominator = 2 * dy
+            for y in rows:
+                plot(y, x1 + sx * (numerator // denominator), char, color)
+                numerator += 2 * dx
     
     def square(self, x, y, size, filled=True, color='white'):
         """Draw a square - shorthand for rect with equal width and height"""
@@ -261,8 +745,11 @@ class Canvas:
     
     def arc(self, center_x, center_y, radius, start_angle, end_angle, color='white'):
         """Draw an arc from start_angle to end_angle (in radians)"""
+        color = self.style_table.resolve(color)
         if radius <= 0:
             return
+        if self._outside(center_x - radius, center_y - radius, center_x + radius, center_y + radius):
+            return
             
         char = self.arc_char
         
@@ -274,12 +761,17 @@ class Canvas:
         if end_angle < start_angle:
             end_angle += 2 * math.pi
         
+        if self._inside(center_x - radius, center_y - radius, center_x + radius, center_y + radius):
+            plot = self._plot
+        else:
+            plot = self.set_pixel
+        
         # Use circle algorithm but only draw points within angle range
         x = 0
         y = radius
         d = 1 - radius
         
-        self._draw_arc_points(center_x, center_y, x, y, start_angle, end_angle, char, color)
+        self._draw_arc_points(center_x, center_y, x, y, start_angle, end_angle, char, color, plot)
         
         while x < y:
             if d < 0:
@@ -288,9 +780,9 @@ class Canvas:
                 d += 2 * (x - y) + 5
                 y -= 1
             x += 1
-            self._draw_arc_points(center_x, center_y, x, y, start_angle, end_angle, char, color)
+            self._draw_arc_points(center_x, center_y, x, y, start_angle, end_angle, char, color, plot)
     
-    def _draw_arc_points(self, cx, cy, x, y, start_angle, end_angle, char, color):
+    def _draw_arc_points(self, cx, cy, x, y, start_angle, end_angle, char, color, plot):
         """Draw arc points only within the specified angle range"""
         points = [
             (cx + x, cy + y), (cx - x, cy + y),
@@ -310,13 +802,16 @@ class Canvas:
             # Check if angle is within arc range (handle wraparound)
             if end_angle > 2 * math.pi:
                 if angle >= start_angle or angle <= (end_angle - 2 * math.pi):
-                    self.set_pixel(py, px, char, color)
+                    plot(py, px, char, color)
             else:
                 if start_angle <= angle <= end_angle:
-                    self.set_pixel(py, px, char, color)
+                    plot(py, px, char, color)
     
     def triangle(self, x1, y1, x2, y2, x3, y3, filled=True, color='white'):
         """Draw a triangle with three points"""
+        if self._outside(min(x1, x2, x3), min(y1, y2, y3), max(x1, x2, x3), max(y1, y2, y3)):
+            return
+        color = self.style_table.resolve(color)
         if filled:
             # Fill triangle using scanline algorithm
             self._fill_triangle(x1, y1, x2, y2, x3, y3, color)
@@ -330,48 +825,63 @@ class Canvas:
         """Fill triangle using scanline algorithm"""
         char = self.triangle_char
         
-        # Sort vertices by y coordinate
-        vertices = [(x1, y1), (x2, y2), (x3, y3)]
-        vertices.sort(key=lambda v: v[1])
-        (x1, y1), (x2, y2), (x3, y3) = vertices
-        
         # Handle degenerate triangles
-        if y1 == y3:
+        if y1 == y2 == y3:
             return
         
-        # Scanline fill
-        for y in range(int(y1), int(y3) + 1):
-            # Find intersection points with triangle edges
-            intersections = []
-            
-            # Check edge 1-2
-            if y1 != y2 and y1 <= y <= y2:
-                t = (y - y1) / (y2 - y1)
-                x = x1 + t * (x2 - x1)
-                intersections.append(x)
-            
-            # Check edge 2-3
-            if y2 != y3 and y2 <= y <= y3:
-                t = (y - y2) / (y3 - y2)
-                x = x2 + t * (x3 - x2)
-                intersections.append(x)
-            
-            # Check edge 1-3
-            if y1 != y3 and y1 <= y <= y3:
-                t = (y - y1) / (y3 - y1)
-                x = x1 + t * (x3 - x1)
-                intersections.append(x)
-            
-            # Fill between intersection points
-            if len(intersections) >= 2:
-                intersections.sort()
-                start_x = int(intersections[0])
-                end_x = int(intersections[-1])
-                for x in range(start_x, end_x + 1):
-                    self.set_pixel(y, x, char, color)
+        # Step the edges down the visible rows, filling between the outermost
+        # edges; each edge includes both of its end rows
+        clip = self.clip_rect()
+        edges = _edge_table((x1, x2, x3), (y1, y2, y3), inclusive=True)
+        for y, active in _scan_edges(edges, clip[0], clip[2]):
+            if len(active) >= 2:
+                self._hline(clip, y, int(active[0][2]), int(active[-1][2]), char, color)
+    
+    def polygon(self, points, filled=True, color='white', rule='evenodd'):
+        """Draw a closed polygon through (x, y) pairs or flat x0, y0, x1, y1, ... coordinates
+        
+        Filled polygons are scan converted with an active edge table; rule
+        is 'evenodd' or 'nonzero' and decides whether the overlapping parts
+        of a self-intersecting outline are inside. The outline cells are
+        filled too, so a filled polygon covers its outline.
+        """
+        if rule not in ('evenodd', 'nonzero'):
+            raise ValueError(f"Unknown fill rule: {rule!r}")
+        if len(points) == 0:
+            return
+        if not filled:
+            self.polyline(points, closed=True, color=color)
+            return
+        xs, ys = _coords(points)
+        if self._outside(min(xs), min(ys), max(xs), max(ys)):
+            return
+        color = self.style_table.resolve(color)
+        char = self.polygon_fill_char
+        clip = self.clip_rect()
+        
+        # Interior: cells whose centre lies inside, as spans between crossings
+        for y, active in _scan_edges(_edge_table(xs, ys), clip[0], clip[2]):
+            if rule == 'evenodd':
+                for i in range(0, len(active) - 1, 2):
+                    self._hline(clip, y, math.ceil(active[i][2]), math.ceil(active[i + 1][2]) - 1, char, color)
+            else:
+                winding = 0
+                for edge in active:
+                    if winding == 0:
+                        start = edge[2]
+                    winding += edge[6]
+                    if winding == 0:
+                        self._hline(clip, y, math.ceil(start), math.ceil(edge[2]) - 1, char, color)
+        
+        # Boundary
+        x1, y1 = xs[-1], ys[-1]
+        for x2, y2 in zip(xs, ys):
+            self._segment(x1, y1, x2, y2, 0, char, color, clip)
+            x1, y1 = x2, y2
     
     def ellipse(self, center_x, center_y, width, height, filled=True, color='white'):
         """Draw an ellipse using the midpoint ellipse algorithm"""
+        color = self.style_table.resolve(color)
         if width <= 0 or height <= 0:
             return
             
@@ -380,6 +890,8 @@ class Canvas:
         
         if a == 0 or b == 0:
             return
+        if self._outside(center_x - a, center_y - b, center_x + a, center_y + b):
+            return
             
         char = self.ellipse_fill_char if filled else self.ellipse_stroke_char
         
@@ -388,6 +900,12 @@ class Canvas:
             self.circle(center_x, center_y, a, filled, color)
             return
         
+        clip = self.clip_rect()
+        if self._inside(center_x - a, center_y - b, center_x + a, center_y + b):
+            plot = self._plot
+        else:
+            plot = self.set_pixel
+        
         # Midpoint ellipse algorithm
         x = 0
         y = b
@@ -398,7 +916,7 @@ class Canvas:
         dy = 2 * a * a * y
         
         while dx < dy:
-            self._draw_ellipse_points(center_x, center_y, x, y, char, color, filled)
+            self._draw_ellipse_points(center_x, center_y, x, y, char, color, filled, clip, plot)
             
             if d1 < 0:
                 x += 1
@@ -415,7 +933,7 @@ class Canvas:
         d2 = b * b * (x + 0.5) * (x + 0.5) + a * a * (y - 1) * (y - 1) - a * a * b * b
         
         while y >= 0:
-            self._draw_ellipse_points(center_x, center_y, x, y, char, color, filled)
+            self._draw_ellipse_points(center_x, center_y, x, y, char, color, filled, clip, plot)
             
             if d2 > 0:
                 y -= 1
@@ -428,23 +946,52 @@ class Canvas:
                 dy -= 2 * a * a
                 d2 += dx - dy + a * a
     
-    def _draw_ellipse_points(self, cx, cy, x, y, char, color, filled):
+    def _draw_ellipse_points(self, cx, cy, x, y, char, color, filled, clip, plot):
         """Draw the 4 symmetric points of an ellipse"""
         if filled:
-            # Fill horizontal lines for filled ellipse
-            for py in [cy + y, cy - y]:
-                for px in range(cx - x, cx + x + 1):
-                    self.set_pixel(py, px, char, color)
+            # Fill horizontal lines for filled ellipse, clamped to the clip rectangle
+            self._hline(clip, cy + y, cx - x, cx + x, char, color)
+            self._hline(clip, cy - y, cx - x, cx + x, char, color)
         else:
             # Just draw the outline points
             points = [(cx + x, cy + y), (cx - x, cy + y), (cx + x, cy - y), (cx - x, cy - y)]
             for px, py in points:
-                self.set_pixel(py, px, char, color)
+                plot(py, px, char, color)
+
+    def resize(self, rows, cols):
+        """Change the canvas size in place, keeping the cells that still fit
+
+        Rows grow and shrink with list operations, which over-allocate, and
+        rows dropped when the canvas shrinks are kept for reuse when it grows
+        again, so repeated resizes don't reallocate the grid.
+        """
+        if rows == self.rows and cols == self.cols:
+            return
+        for grid, fill, spare in ((self.canvas, self.blank, self._spare_rows[0]),
+                                  (self.styles, DEFAULT_STYLE, self._spare_rows[1])):
+            for row in grid[:rows]:
+                if cols < len(row):
+                    del row[cols:]
+                else:
+                    row.extend([fill] * (cols - len(row)))
+            if rows < len(grid):
+                spare.extend(grid[rows:])
+                del grid[rows:]
+            while len(grid) < rows:
+                row = spare.pop() if spare else []
+                row[:] = [fill] * cols
+                grid.append(row)
+        self.rows = rows
+        self.cols = cols
+        self.output_diff.reset()
+        self._resized = True
 
     def clear(self):
+        blank_row = [self.blank] * self.cols
+        default_row = [DEFAULT_STYLE] * self.cols
         for r in range(self.rows):
-            for c in range(self.cols):
-                self.canvas[r][c] = self.blank
+            self.canvas[r][:] = blank_row
+            self.styles[r][:] = default_row
         # Don't print anything when clearing - let the IDE handle display
 
 if __name__ == "__main__":
@@ -577,6 +1124,6 @@ if __name__ == "__main__":
             filled = randint(0, 1) == 1
             canvas.circle(x, y, radius, filled=filled, color=color)
         
-        canvas.draw()
+        canvas.draw(in_place=True)
         time.sleep(1.0)
 
@@ -0,0 +1,252 @@
+"""
+Particle systems for the ASCII Engine
+
+A ParticleSystem keeps each particle attribute in its own flat array
+(struct of arrays): position, velocity, age, lifetime, glyph and style ID.
+update() advances every particle with a few whole-array passes instead of
+touching one Python object per particle, the slots of dead particles go on
+a free list for the next emit(), and render() hands all live particles to
+Canvas.points() in one call.
+
+With NumPy installed the passes are NumPy array operations. Without it the
+columns are array.array objects and the passes run through map() with the
+operator module, which still keeps the physics out of Python-level loops.
+"""
+
+import math
+import random
+import operator
+from array import array
+from itertools import compress, repeat
+
+from ascii_engine.styles import STYLES
+
+# NumPy takes longer to import than the rest of the engine, so it is only
+# imported when the first ParticleSystem is created
+_numpy = None
+
+
+def load_numpy():
+    """The numpy module, or None when it is not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False  # Columns fall back to array.array
+        _numpy = numpy
+    return _numpy or None
+
+
+class ParticleSystem:
+    """Up to capacity particles stored as parallel arrays
+
+    Ages and lifetimes are in whatever unit update() is stepped with:
+    frames with the default dt=1, or seconds if you pass elapsed time.
+    Velocities are in cells per unit and gravity pulls towards +y.
+    """
+
+    def __init__(self, capacity=10000, gravity=0.0, drag=0.0, use_numpy=None, style_table=STYLES):
+        numpy = load_numpy() if use_numpy is not False else None
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ImportError("use_numpy=True needs NumPy, which is not installed")
+        self.capacity = capacity
+        self.gravity = gravity
+        self.drag = drag
+        self.style_table = style_table
+        self.np = numpy if use_numpy else None
+
+        if self.np is not None:
+            self.x = numpy.zeros(capacity)
+            self.y = numpy.zeros(capacity)
+            self.vx = numpy.zeros(capacity)
+            self.vy = numpy.zeros(capacity)
+            self.age = numpy.zeros(capacity)
+            self.lifetime = numpy.full(capacity, math.inf)
+            self.glyph = numpy.zeros(capacity, dtype=numpy.uint32)
+            self.style = numpy.zeros(capacity, dtype=numpy.int32)
+            self.alive = numpy.zeros(capacity, dtype=bool)
+        else:
+            zeros = array('d', [0.0]) * capacity
+            self.x = array('d', zeros)
+            self.y = array('d', zeros)
+            self.vx = array('d', zeros)
+            self.vy = array('d', zeros)
+            self.age = array('d', zeros)
+            self.lifetime = array('d', [math.inf]) * capacity
+            self.glyph = array('I', [0]) * capacity
+            self.style = array('i', [0]) * capacity
+            self.alive = bytearray(capacity)
+
+        # Free slots; dead slots keep an infinite lifetime so they never expire again
+        self._free = list(range(capacity - 1, -1, -1))
+        # No slot at or above this is alive, so the passes stop here
+        self._high = 0
+
+    def __len__(self):
+        """Number of live particles"""
+        return self.capacity - len(self._free)
+
+    def emit(self, x, y, vx=0.0, vy=0.0, lifetime=10.0, glyph='*', color='white'):
+        """Add a particle; returns its slot, or None when the system is full"""
+        if not self._free:
+            return None
+        slot = self._free.pop()
+        self.x[slot] = x
+        self.y[slot] = y
+        self.vx[slot] = vx
+        self.vy[slot] = vy
+        self.age[slot] = 0.0
+        self.lifetime[slot] = lifetime
+        self.glyph[slot] = ord(glyph)
+        self.style[slot] = self.style_table.resolve(color)
+        self.alive[slot] = 1
+        if slot >= self._high:
+            self._high = slot + 1
+        return slot
+
+    def burst(self, x, y, count, speed=1.0, lifetime=10.0, glyph='*', color='white',
+              direction=0.0, spread=2 * math.pi, rng=random):
+        """Emit up to count particles from one point in random directions
+
+        Directions are spread evenly at random over `spread` radians around
+        `direction`, speeds over (0, speed]. Uses the random module unless
+        another generator is passed, so seeding it makes bursts repeatable.
+        Returns how many particles were emitted.
+        """
+        count = min(count, len(self._free))
+        if count <= 0:
+            return 0
+        slots = self._free[-count:]
+        del self._free[-count:]
+        angles = [direction + (rng.random() - 0.5) * spread for i in range(count)]
+        speeds = [speed * (1.0 - rng.random()) for i in range(count)]
+        style = self.style_table.resolve(color)
+
+        if self.np is not None:
+            np = self.np
+            slots = np.array(slots)
+            angles = np.array(angles)
+            speeds = np.array(speeds)
+            self.x[slots] = x
+            self.y[slots] = y
+            self.vx[slots] = np.cos(angles) * speeds
+            self.vy[slots] = np.sin(angles) * speeds
+            self.age[slots] = 0.0
+            self.lifetime[slots] = lifetime
+            self.glyph[slots] = ord(glyph)
+            self.style[slots] = style
+            self.alive[slots] = True
+            high = int(slots.max()) + 1
+        else:
+            code = ord(glyph)
+            for slot, angle, slot_speed in zip(slots, angles, speeds):
+                self.x[slot] = x
+                self.y[slot] = y
+                self.vx[slot] = math.cos(angle) * slot_speed
+                self.vy[slot] = math.sin(angle) * slot_speed
+                self.age[slot] = 0.0
+                self.lifetime[slot] = lifetime
+                self.glyph[slot] = code
+                self.style[slot] = style
+                self.alive[slot] = 1
+            high = max(slots) + 1
+        if high > self._high:
+            self._high = high
+        return count
+
+    def kill(self, slot):
+        """Remove a live particle before its lifetime is up"""
+        if self.alive[slot]:
+            self.alive[slot] = 0
+            self.lifetime[slot] = math.inf
+            self._free.append(slot)
+
+    def clear(self):
+        """Remove every particle"""
+        for slot in range(self._high):
+            self.kill(slot)
+        self._high = 0
+
+    def update(self, dt=1.0):
+        """Advance every particle by dt and retire the ones past their lifetime"""
+        high = self._high
+        if not high:
+            return
+        if self.np is not None:
+            expired = self._update_numpy(high, dt)
+        else:
+            expired = self._update_arrays(high, dt)
+        # Lowest slots on top of the free list keep the live range packed
+        self._free.extend(reversed(expired))
+        # Let the passes skip trailing dead slots
+        alive = self.alive
+        while high and not alive[high - 1]:
+            high -= 1
+        self._high = high
+
+    def _update_numpy(self, high, dt):
+        """Step the first high slots with NumPy; returns the expired slots"""
+        vx = self.vx[:high]
+        vy = self.vy[:high]
+        if self.drag:
+            keep = max(0.0, 1.0 - self.drag * dt)
+            vx *= keep
+            vy *= keep
+        if self.gravity:
+            vy += self.gravity * dt
+        self.x[:high] += vx * dt
+        self.y[:high] += vy * dt
+        age = self.age[:high]
+        age += dt
+        expired = self.np.flatnonzero(age >= self.lifetime[:high])
+        self.alive[expired] = False
+        self.lifetime[expired] = math.inf
+        return expired.tolist()
+
+    def _update_arrays(self, high, dt):
+        """Step the first high slots with map() passes; returns the expired slots"""
+        add = operator.add
+        mul = operator.mul
+        vx = self.vx[:high]
+        vy = self.vy[:high]
+        if self.drag:
+            keep = max(0.0, 1.0 - self.drag * dt)
+            vx = array('d', map(mul, vx, repeat(keep)))
+            vy = array('d', map(mul, vy, repeat(keep)))
+        if self.gravity:
+            vy = array('d', map(add, vy, repeat(self.gravity * dt)))
+        self.vx[:high] = vx
+        self.vy[:high] = vy
+        if dt != 1:
+            vx = map(mul, vx, repeat(dt))
+            vy = map(mul, vy, repeat(dt))
+        self.x[:high] = array('d', map(add, self.x[:high], vx))
+        self.y[:high] = array('d', map(add, self.y[:high], vy))
+        age = array('d', map(add, self.age[:high], repeat(dt)))
+        self.age[:high] = age
+        expired = list(compress(range(high), map(operator.ge, age, self.lifetime[:high])))
+        for slot in expired:
+            self.alive[slot] = 0
+            self.lifetime[slot] = math.inf
+        return expired
+
+    def render(self, canvas):
+        """Draw every live particle into a canvas with one Canvas.points() call"""
+        high = self._high
+        if self.np is not None:
+            np = self.np
+            live = np.flatnonzero(self.alive[:high])
+            xs = np.rint(self.x[live])
+            ys = np.rint(self.y[live])
+            # Drop off-screen particles before leaving NumPy
+            top, left, bottom, right = canvas.clip_rect()
+            visible = live[(xs >= left) & (xs < right) & (ys >= top) & (ys < bottom)]
+            canvas.points(self.x[visible].tolist(), self.y[visible].tolist(),
+                          map(chr, self.glyph[visible].tolist()), self.style[visible].tolist())
+        else:
+            live = list(compress(range(high), self.alive))
+            canvas.points(map(self.x.__getitem__, live), map(self.y.__getitem__, live),
+                          map(chr, map(self.glyph.__getitem__, live)), map(self.style.__getitem__, live))
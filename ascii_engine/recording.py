@@ -0,0 +1,89 @@
+"""
+Recording frames as asciicast files
+
+An asciicast v2 file (https://docs.asciinema.org/manual/asciicast/v2/) is a
+JSON header line followed by one JSON line per chunk of terminal output with
+its time, so a recording plays back with `asciinema play` or any asciicast
+player at the speed it was rendered.
+
+Frames are stored the way they are sent to a terminal: the first frame
+clears the screen, later ones only rewrite the rows that changed. Times come
+from frame numbers and the frame rate, not the clock, so recording the same
+frames always produces the same file.
+"""
+
+import json
+
+from ascii_engine.rowhash import RowDiff
+
+CLEAR_SCREEN = '\x1b[2J'
+
+
+def encode_frame(rows, encode_row, row_count, clear=False):
+    """Terminal output that rewrites the given rows in place
+
+    encode_row(r) returns the text of row r including its escapes. With
+    clear=True the screen is cleared first; pass every row then.
+    """
+    parts = [CLEAR_SCREEN] if clear else []
+    for r in rows:
+        parts.append('\x1b[%d;1H' % (r + 1))
+        parts.append(encode_row(r))
+    # Park the cursor below the frame
+    parts.append('\x1b[%d;1H' % (row_count + 1))
+    return ''.join(parts)
+
+
+class FrameEncoder:
+    """Turns successive canvas frames into output that rewrites only the rows that changed"""
+
+    def __init__(self):
+        self.diff = RowDiff()
+        self.size = None
+
+    def encode(self, canvas):
+        """Output showing this frame after the previous one, or '' if nothing changed"""
+        # The first frame, and the first after a resize, redraws the whole screen
+        size = (canvas.rows, canvas.cols)
+        clear = size != self.size
+        self.size = size
+        changed = self.diff.changed(canvas.row_hashes())
+        rows = range(canvas.rows) if clear else changed
+        if not rows:
+            return ''
+        return encode_frame(rows, canvas.encode_row, canvas.rows, clear=clear)
+
+
+class Recorder:
+    """Writes canvas frames to an asciicast v2 file"""
+
+    def __init__(self, path, rows, cols, fps, title=None):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.fps = fps
+        self.encoder = FrameEncoder()
+        self.frames = 0
+        header = {'version': 2, 'width': cols, 'height': rows + 1}
+        if title:
+            header['title'] = title
+        self.file.write(json.dumps(header) + '\n')
+
+    def add(self, canvas, number=None):
+        """Record the canvas as frame number (default: the next one); unchanged frames write nothing"""
+        number = self.frames if number is None else number
+        output = self.encoder.encode(canvas)
+        if output:
+            self.write_event(number, output)
+        self.frames += 1
+
+    def write_event(self, number, output):
+        """Write already encoded output as shown at frame number"""
+        self.file.write(json.dumps([round(number / self.fps, 6), 'o', output]) + '\n')
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,54 @@
+"""
+Per-row hashes for skipping output that did not change
+
+Each finished frame gets one hash per row, covering its characters and
+style IDs. Anything that outputs frames (the terminal writer, the IDE
+preview, the sketch process, a recorder) keeps the hashes of what it last
+sent and compares them to skip identical frames entirely and unchanged rows
+individually. Hashes are only comparable within one process, since string
+hashing is randomized per interpreter.
+"""
+
+
+def row_hash(chars, styles):
+    """Hash one row of cells"""
+    return hash((tuple(chars), tuple(styles)))
+
+
+def row_hashes(chars_rows, styles_rows):
+    """Hash every row of a frame"""
+    return [hash((tuple(chars), tuple(styles))) for chars, styles in zip(chars_rows, styles_rows)]
+
+
+class RowDiff:
+    """Remembers the row hashes last output and reports which rows changed"""
+
+    def __init__(self):
+        self.hashes = None
+        self.stats = {
+            'frames': 0,
+            'frames_skipped': 0,
+            'rows': 0,
+            'rows_skipped': 0,
+        }
+
+    def changed(self, hashes):
+        """Return the indices of rows that differ from the last frame and remember this one"""
+        previous = self.hashes
+        if previous is None or len(previous) != len(hashes):
+            changed = list(range(len(hashes)))
+        else:
+            changed = [r for r, (old, new) in enumerate(zip(previous, hashes)) if old != new]
+        self.hashes = list(hashes)
+
+        stats = self.stats
+        stats['frames'] += 1
+        if not changed:
+            stats['frames_skipped'] += 1
+        stats['rows'] += len(hashes)
+        stats['rows_skipped'] += len(hashes) - len(changed)
+        return changed
+
+    def reset(self):
+        """Forget the last frame, e.g. after the screen was cleared"""
+        self.hashes = None
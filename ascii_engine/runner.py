@@ -0,0 +1,391 @@
+"""
+Command line sketch runner
+
+    python -m ascii_engine run sketch.py [--fps 30] [--frames N] [--size 50x150]
+                                         [--backend headless|ansi|curses]
+                                         [--record out.cast] [--profile out.prof]
+
+Runs a setup()/draw() sketch, the same kind the IDE runs, in this process.
+The headless backend shows nothing and runs frames back to back, for CI and
+benchmarks; ansi writes frames to the terminal in place and curses paints
+them in a curses screen, both paced to --fps. Without --frames the sketch
+runs until Ctrl+C (or q in curses).
+
+--record writes the frames to an asciicast file timed by frame number, and
+--profile writes cProfile stats covering the frame loop only, not loading
+the sketch or setup(), for pstats or any profile viewer. --seed reseeds
+random for setup() and every frame so runs can be repeated exactly.
+
+    python -m ascii_engine render sketch.py out.cast --frames N [--workers N]
+
+renders a recording offline without showing it. The frames are split into
+contiguous ranges rendered in parallel by worker processes and written back
+in order, so this only works for sketches that draw each frame from
+frame_count and random alone (see ascii_engine.sketch): state a sketch
+carries from one frame to the next starts over at every range. The output
+is the same file `run --backend headless --seed` records.
+"""
+
+import os
+import sys
+import time
+import argparse
+import functools
+import traceback
+import multiprocessing
+
+from ascii_engine.main import Canvas
+from ascii_engine.sketch import LiveSketch
+from ascii_engine.styles import STYLES
+from ascii_engine.rowhash import RowDiff
+from ascii_engine.recording import Recorder, FrameEncoder
+
+DEFAULT_SIZE = (50, 150)
+
+# Ranges per worker, so workers finishing early pick up more, and the fewest
+# frames worth a range of their own (each range re-runs setup())
+RANGES_PER_WORKER = 4
+MIN_RANGE_FRAMES = 30
+
+
+def parse_size(text):
+    """Parse a canvas size written as ROWSxCOLS"""
+    try:
+        rows, cols = (int(n) for n in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"size must look like 50x150, not {text!r}")
+    if rows <= 0 or cols <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive, not {text!r}")
+    return rows, cols
+
+
+def positive_number(text):
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, not {text!r}")
+    return value
+
+
+def positive_int(text):
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive whole number, not {text!r}")
+    return value
+
+
+class NotASketchError(Exception):
+    """The file ran but doesn't define draw(), e.g. a standalone script"""
+
+
+class HeadlessBackend:
+    """Shows nothing; frames run back to back"""
+
+    realtime = False
+
+    def __init__(self, size):
+        self.size = size or DEFAULT_SIZE
+
+    def poll_size(self):
+        return None
+
+    def present(self, canvas):
+        pass
+
+    def close(self):
+        pass
+
+
+class AnsiBackend:
+    """Writes frames to the terminal in place with Canvas.draw()"""
+
+    realtime = True
+
+    def __init__(self, size):
+        self.fixed = size is not None
+        self.size = size or self._terminal_size()
+
+    def _terminal_size(self):
+        # Leave the last row for the cursor, which is parked below the frame
+        try:
+            columns, lines = os.get_terminal_size(sys.stdout.fileno())
+        except (OSError, ValueError):
+            return DEFAULT_SIZE
+        return max(1, lines - 1), columns
+
+    def poll_size(self):
+        """The size the canvas should have now, following the terminal unless --size was given"""
+        return None if self.fixed else self._terminal_size()
+
+    def present(self, canvas):
+        canvas.draw(in_place=True)
+
+    def close(self):
+        pass
+
+
+class CursesBackend:
+    """Paints frames into a curses screen; q quits"""
+
+    realtime = True
+
+    def __init__(self, size):
+        import curses
+        from ascii_engine.curses_output import CursesStyleMap, paint_row
+        self.curses = curses
+        self.paint_row = paint_row
+        self.screen = curses.initscr()
+        try:
+            curses.noecho()
+            curses.cbreak()
+            self.screen.keypad(True)
+            self.screen.nodelay(True)
+            try:
+                curses.curs_set(0)
+            except curses.error:
+                pass  # Terminal can't hide the cursor
+            if curses.has_colors():
+                curses.start_color()
+                curses.use_default_colors()
+            self.style_map = CursesStyleMap(STYLES)
+        except BaseException:
+            curses.endwin()
+            raise
+        self.diff = RowDiff()
+        self.fixed = size is not None
+        self.size = size or self.screen.getmaxyx()
+
+    def poll_size(self):
+        """Handle pending keys; returns the new size after a terminal resize"""
+        curses = self.curses
+        size = None
+        while True:
+            key = self.screen.getch()
+            if key == -1:
+                return size
+            if key in (ord('q'), ord('Q')):
+                raise KeyboardInterrupt
+            if key == curses.KEY_RESIZE:
+                curses.update_lines_cols()
+                self.screen.clear()
+                self.diff.reset()
+                if not self.fixed:
+                    size = self.screen.getmaxyx()
+
+    def present(self, canvas):
+        rows, cols = self.screen.getmaxyx()
+        rows = min(rows, canvas.rows)
+        cols = min(cols, canvas.cols)
+        attr_for = self.style_map.attr
+        for row in self.diff.changed(canvas.row_hashes()[:rows]):
+            try:
+                self.paint_row(self.screen, row, 0, canvas.canvas[row][:cols], canvas.styles[row][:cols], attr_for)
+            except self.curses.error:
+                pass  # Writing the bottom-right cell moves the cursor off screen
+        self.screen.refresh()
+
+    def close(self):
+        self.curses.endwin()
+
+
+BACKENDS = {
+    'headless': HeadlessBackend,
+    'ansi': AnsiBackend,
+    'curses': CursesBackend,
+}
+
+
+def _load_sketch(code, path, canvas, seed):
+    sketch = LiveSketch(canvas, seed=seed, path=path)
+    sketch.load(code)
+    if sketch.draw_func is None:
+        raise NotASketchError(f"{path} is not a setup()/draw() sketch: it defines no draw() function")
+    return sketch
+
+
+def run_sketch(path, fps=30, frames=None, size=None, backend='ansi', record=None, profile=None, seed=None):
+    """Run a sketch file and return stats about the frames drawn
+
+    Errors in the sketch propagate. Returns a dict with the number of
+    frames, the seconds the frame loop took and the seconds spent in draw().
+    """
+    with open(path, encoding='utf-8') as f:
+        code = compile(f.read(), path, 'exec')
+
+    output = BACKENDS[backend](size)
+    recorder = None
+    profiler = None
+    try:
+        canvas = Canvas(*output.size)
+        sketch = _load_sketch(code, path, canvas, seed)
+        if record:
+            recorder = Recorder(record, canvas.rows, canvas.cols, fps, title=os.path.basename(path))
+        if profile:
+            import cProfile
+            profiler = cProfile.Profile()
+
+        interval = 1.0 / fps
+        number = 0
+        draw_seconds = 0.0
+        start = deadline = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            while frames is None or number < frames:
+                new_size = output.poll_size()
+                if new_size and new_size != (canvas.rows, canvas.cols):
+                    sketch.resize(*new_size)
+
+                begin = time.perf_counter()
+                sketch.draw_frame()
+                draw_seconds += time.perf_counter() - begin
+
+                output.present(canvas)
+                if recorder:
+                    recorder.add(canvas, number)
+                number += 1
+
+                if output.realtime:
+                    deadline += interval
+                    delay = deadline - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        deadline = time.perf_counter()  # Running late; don't rush to catch up
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(profile)
+        elapsed = time.perf_counter() - start
+    finally:
+        if recorder:
+            recorder.close()
+        output.close()
+
+    return {'frames': number, 'seconds': elapsed, 'draw_seconds': draw_seconds}
+
+
+def frame_ranges(frames, count):
+    """Split frames 0..frames-1 into at most count contiguous (start, stop) ranges"""
+    if frames <= 0:
+        return []
+    step = -(-frames // max(1, count))
+    return [(start, min(start + step, frames)) for start in range(0, frames, step)]
+
+
+def render_range(source, path, size, seed, frame_range):
+    """Encoded output of the frames in frame_range as (frame number, output) pairs
+
+    Frame start - 1 is drawn first without being kept, so the first frame
+    only rewrites the rows that changed, exactly as in a serial recording.
+    """
+    start, stop = frame_range
+    sketch = _load_sketch(compile(source, path, 'exec'), path, Canvas(*size), seed)
+    encoder = FrameEncoder()
+    if start:
+        sketch.draw_frame(start - 1)
+        encoder.encode(sketch.canvas)
+    events = []
+    for number in range(start, stop):
+        sketch.draw_frame(number)
+        output = encoder.encode(sketch.canvas)
+        if output:
+            events.append((number, output))
+    return events
+
+
+def render_sketch(path, output, frames, fps=30, size=None, seed=0, workers=None):
+    """Render frames of a deterministic sketch to an asciicast file using worker processes
+
+    Returns a dict with the number of frames, the seconds rendering took and
+    the number of workers used.
+    """
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    size = size or DEFAULT_SIZE
+    workers = max(1, min(workers or os.cpu_count() or 1, frames // MIN_RANGE_FRAMES or 1))
+    ranges = frame_ranges(frames, workers * RANGES_PER_WORKER if workers > 1 else 1)
+    render = functools.partial(render_range, source, path, size, seed)
+
+    start = time.perf_counter()
+    with Recorder(output, size[0], size[1], fps, title=os.path.basename(path)) as recorder:
+        if workers == 1:
+            chunks = map(render, ranges)
+            pool = None
+        else:
+            # Spawn like sketch processes do; imap hands results back in frame order
+            pool = multiprocessing.get_context('spawn').Pool(workers)
+            chunks = pool.imap(render, ranges)
+        try:
+            for events in chunks:
+                for number, text in events:
+                    recorder.write_event(number, text)
+        finally:
+            if pool:
+                pool.terminate()
+                pool.join()
+    elapsed = time.perf_counter() - start
+
+    return {'frames': frames, 'seconds': elapsed, 'workers': workers}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ascii_engine',
+                                     description="Run ASCII Engine sketches from the command line")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run a setup()/draw() sketch")
+    run.add_argument('sketch', help="sketch file, like the ones the IDE runs")
+    run.add_argument('--fps', type=positive_number, default=30,
+                     help="frame rate for display and recording (default 30)")
+    run.add_argument('--frames', type=positive_int, help="stop after this many frames")
+    run.add_argument('--size', type=parse_size,
+                     help="canvas size as ROWSxCOLS (default: the terminal, or 50x150 headless)")
+    run.add_argument('--backend', choices=sorted(BACKENDS), default='ansi',
+                     help="where frames go (default ansi)")
+    run.add_argument('--record', metavar='FILE', help="write the frames to an asciicast file")
+    run.add_argument('--profile', metavar='FILE', help="write cProfile stats of the frame loop")
+    run.add_argument('--seed', type=int, help="reseed random for setup() and every frame")
+
+    render = commands.add_parser('render', help="render a recording of a deterministic sketch in parallel")
+    render.add_argument('sketch', help="sketch that draws each frame from frame_count and random alone")
+    render.add_argument('output', help="asciicast file to write")
+    render.add_argument('--frames', type=positive_int, required=True, help="number of frames to render")
+    render.add_argument('--fps', type=positive_number, default=30, help="frame rate of the recording (default 30)")
+    render.add_argument('--size', type=parse_size, help="canvas size as ROWSxCOLS (default 50x150)")
+    render.add_argument('--seed', type=int, default=0, help="seed for random (default 0)")
+    render.add_argument('--workers', type=positive_int, help="worker processes (default: one per CPU)")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'render':
+            stats = render_sketch(args.sketch, args.output, args.frames, fps=args.fps, size=args.size,
+                                  seed=args.seed, workers=args.workers)
+        else:
+            stats = run_sketch(args.sketch, fps=args.fps, frames=args.frames, size=args.size,
+                               backend=args.backend, record=args.record, profile=args.profile,
+                               seed=args.seed)
+    except (OSError, NotASketchError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+    if args.command == 'render':
+        seconds = stats['seconds']
+        rate = stats['frames'] / seconds if seconds else 0.0
+        print(f"{stats['frames']} frames rendered in {seconds:.2f}s ({rate:.1f} fps) "
+              f"by {stats['workers']} worker(s) to {args.output}", file=sys.stderr)
+        return 0
+
+    frames = stats['frames']
+    seconds = stats['seconds']
+    rate = frames / seconds if seconds else 0.0
+    per_frame = stats['draw_seconds'] / frames * 1000 if frames else 0.0
+    print(f"{frames} frames in {seconds:.2f}s ({rate:.1f} fps), draw() {per_frame:.2f} ms per frame",
+          file=sys.stderr)
+    if args.profile:
+        print(f"Frame loop profile written to {args.profile}", file=sys.stderr)
+    return 0
@@ -0,0 +1,173 @@
+"""
+Sketch namespaces and hot reloading
+
+A sketch is Python source defining setup() and draw() (and optionally
+resized(rows, cols)) that draws into a global canvas. LiveSketch runs it in a
+fresh namespace and can hot-swap edited source into it while it runs: new
+functions replace the old ones while globals and the canvas are kept, and
+only a changed setup() forces a full restart.
+
+Sketches see the number of the frame being drawn as frame_count. Given a
+seed, random is reseeded from it before setup() and before every frame, so a
+sketch that draws from frame_count and random alone draws the same frame
+whichever frames came before it; that is what lets frame ranges be rendered
+in parallel.
+
+This module doesn't depend on multiprocessing, so sketches can also be run
+in-process, e.g. by the command line runner.
+"""
+
+import math
+import time
+import types
+import random
+import functools
+
+from ascii_engine.main import Canvas, COLORS
+from ascii_engine.world import WorldCanvas
+from ascii_engine.particles import ParticleSystem
+from ascii_engine.subcell import BrailleCanvas, HalfBlockCanvas
+from ascii_engine.styles import style
+from ascii_engine.colors import rgb, hsv
+
+
+def sketch_namespace(canvas, path=None):
+    """Globals a sketch runs with, loaded from path if given
+
+    __name__ isn't '__main__', so a script's `if __name__ == "__main__":`
+    block doesn't run.
+    """
+    namespace = {
+        '__name__': '__sketch__',
+        'canvas': canvas,
+        'Canvas': Canvas,
+        'WorldCanvas': WorldCanvas,
+        'ParticleSystem': ParticleSystem,
+        'BrailleCanvas': BrailleCanvas,
+        'HalfBlockCanvas': HalfBlockCanvas,
+        'COLORS': COLORS,
+        'style': style,
+        'rgb': rgb,
+        'hsv': hsv,
+        'randint': random.randint,
+        'math': math,
+        'time': time,
+        'frame_count': 0,
+    }
+    if path is not None:
+        namespace['__file__'] = path
+    return namespace
+
+
+# Globals of these types are treated as constants: an edited literal wins over live state
+CONSTANT_TYPES = (int, float, complex, str, bytes, bool, type(None), tuple, frozenset)
+
+
+@functools.lru_cache(maxsize=32)
+def compile_sketch(source):
+    """Compile sketch source, reusing the code object while the source is unchanged"""
+    return compile(source, '<sketch>', 'exec')
+
+
+def frame_seed(seed, number):
+    """Seed for random while drawing frame number of a run seeded with seed"""
+    return f'{seed}/{number}'
+
+
+def _function_code(module_code, name):
+    """Code object of a top-level function defined by module code, or None"""
+    if module_code is None:
+        return None
+    for const in module_code.co_consts:
+        if isinstance(const, types.CodeType) and const.co_name == name:
+            return const
+    return None
+
+
+def _fingerprint(code):
+    """What a function does, ignoring where in the file it sits"""
+    if code is None:
+        return None
+    consts = tuple(_fingerprint(c) if isinstance(c, types.CodeType) else c
+                   for c in code.co_consts)
+    return (code.co_code, consts, code.co_names, code.co_varnames, code.co_freevars)
+
+
+def _constants(namespace):
+    return {name: value for name, value in namespace.items()
+            if isinstance(value, CONSTANT_TYPES)}
+
+
+class LiveSketch:
+    """A sketch namespace that edited code can be swapped into while it runs"""
+
+    def __init__(self, canvas, seed=None, path=None):
+        self.canvas = canvas
+        self.seed = seed
+        self.path = path
+        self.namespace = None
+        self.module_code = None
+        self.loaded_constants = {}
+        self.frame_count = 0
+
+    @property
+    def draw_func(self):
+        draw = self.namespace.get('draw') if self.namespace else None
+        return draw if callable(draw) else None
+
+    def draw_frame(self, number=None):
+        """Clear the canvas and draw frame number (default: the one after the last)"""
+        if number is None:
+            number = self.frame_count
+        self.namespace['frame_count'] = number
+        if self.seed is not None:
+            random.seed(frame_seed(self.seed, number))
+        self.canvas.clear()
+        self.draw_func()
+        self.frame_count = number + 1
+
+    def resize(self, rows, cols):
+        """Resize the canvas and call the sketch's resized(rows, cols) if it has one"""
+        self.canvas.resize(rows, cols)
+        resized = self.namespace.get('resized') if self.namespace else None
+        if callable(resized):
+            resized(rows, cols)
+
+    def load(self, code):
+        """Fresh namespace, run the module and setup()"""
+        self.module_code = None
+        self.namespace = sketch_namespace(self.canvas, self.path)
+        self.frame_count = 0
+        self.canvas.clear()
+        if self.seed is not None:
+            random.seed(self.seed)
+        exec(code, self.namespace)
+        self.loaded_constants = _constants(self.namespace)
+        self.module_code = code
+
+        setup = self.namespace.get('setup')
+        if callable(setup):
+            setup()
+
+    def reload(self, code):
+        """Swap in new functions, keeping state; returns True if setup changed and forced a restart"""
+        if (self.module_code is None or
+                _fingerprint(_function_code(self.module_code, 'setup')) !=
+                _fingerprint(_function_code(code, 'setup'))):
+            self.load(code)
+            return True
+
+        # Re-run the module in the live namespace so functions and classes bind to it,
+        # then put back the state that the new source didn't explicitly change
+        live = dict(self.namespace)
+        exec(code, self.namespace)
+        constants = _constants(self.namespace)
+        for name, value in live.items():
+            if isinstance(value, (types.FunctionType, types.ModuleType, type)):
+                continue
+            if name in constants and constants[name] != self.loaded_constants.get(name, constants[name]):
+                continue  # The literal was edited
+            self.namespace[name] = value
+        self.loaded_constants = constants
+        self.module_code = code
+        return False
@@ -0,0 +1,432 @@
+"""
+Run a setup()/draw() sketch in a child process
+
+The sketch renders into its own Canvas in a separate interpreter, so a heavy
+draw() can't hold the editor's GIL and a sketch stuck in an infinite loop can
+always be killed. Finished frames are copied into a shared memory
+framebuffer that the parent maps read-only; a pipe carries frame-ready
+notifications, newly interned styles and errors.
+
+Edited source can be hot-swapped into a running sketch; the child runs it
+through ascii_engine.sketch.LiveSketch, which keeps globals and the canvas.
+
+A runaway sketch is caught per call, not by total running time: the child
+records in shared memory when it entered sketch code (setup(), draw(), a
+reload...), and the parent kills it if a single call runs longer than
+frame_timeout seconds. A healthy sketch can run for as long as it likes.
+"""
+
+import sys
+import time
+import signal
+import contextlib
+import struct
+import marshal
+import traceback
+import multiprocessing
+from array import array
+from itertools import chain
+from multiprocessing import shared_memory
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows; limits are skipped
+
+from ascii_engine.main import Canvas
+from ascii_engine.sketch import LiveSketch, compile_sketch, sketch_namespace
+from ascii_engine.styles import STYLES, StyleTable
+from ascii_engine.swapchain import Frame
+from ascii_engine.rowhash import RowDiff
+
+# Per-slot header: sequence, frame number, rows, cols (padded to 16 bytes),
+# followed by one 64-bit hash per row, the characters and the style IDs
+SLOT_HEADER = struct.Struct('<IIHH')
+SLOT_HEADER_SIZE = 16
+
+
+def _slot_size(rows, cols):
+    return SLOT_HEADER_SIZE + rows * 8 + rows * cols * 8
+
+# Longest a single call into sketch code may run before the sketch is killed
+DEFAULT_FRAME_TIMEOUT = 10.0
+DEFAULT_MEMORY_BYTES = 1024 * 1024 * 1024
+
+
+class SharedFrameBuffer:
+    """Two framebuffer slots in shared memory, each guarded by a sequence counter
+
+    The writer bumps a slot's sequence to an odd value before writing it and
+    to the next even value afterwards. A reader that sees the same even
+    sequence before and after copying the slot got a complete frame.
+    """
+
+    def __init__(self, shm, rows, cols, readonly=False):
+        self.shm = shm
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.slot_size = _slot_size(rows, cols)
+        self.buf = shm.buf.toreadonly() if readonly else shm.buf
+
+    @classmethod
+    def create(cls, rows, cols):
+        size = 2 * _slot_size(rows, cols)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        return cls(shm, rows, cols, readonly=True)
+
+    @classmethod
+    def attach(cls, name, rows, cols):
+        if sys.version_info >= (3, 13):
+            # The creating process owns the segment and unlinks it
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, rows, cols)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, canvas, number, hashes):
+        """Copy a finished canvas and its row hashes into the slot for this frame number"""
+        rows = min(canvas.rows, self.rows)
+        cols = min(canvas.cols, self.cols)
+        cells = rows * cols
+        base = (number % 2) * self.slot_size
+        buf = self.buf
+
+        seq = SLOT_HEADER.unpack_from(buf, base)[0] + 1
+        struct.pack_into('<I', buf, base, seq)
+
+        chars = ''.join(''.join(row[:cols]) for row in canvas.canvas[:rows]).encode('utf-32-le')
+        if len(chars) != cells * 4:
+            # Some cell holds more than one code point; keep the first of each
+            chars = ''.join(c[:1] or ' ' for row in canvas.canvas[:rows] for c in row[:cols]).encode('utf-32-le')
+        styles = array('I', chain.from_iterable(row[:cols] for row in canvas.styles[:rows])).tobytes()
+
+        data = base + SLOT_HEADER_SIZE
+        buf[data:data + rows * 8] = array('q', hashes[:rows]).tobytes()
+        data += self.rows * 8
+        buf[data:data + len(chars)] = chars
+        data += self.cells * 4
+        buf[data:data + len(styles)] = styles
+
+        SLOT_HEADER.pack_into(buf, base, seq + 1, number, rows, cols)
+
+    def read(self, number, frame):
+        """Copy the slot holding frame `number` into `frame`; False if it was overwritten
+
+        Rows whose hash matches the row already in `frame` are not copied.
+        """
+        base = (number % 2) * self.slot_size
+        buf = self.buf
+        seq, slot_number, rows, cols = SLOT_HEADER.unpack_from(buf, base)
+        if seq & 1 or slot_number != number:
+            return False
+
+        cells = rows * cols
+        data = base + SLOT_HEADER_SIZE
+        hashes = array('q')
+        hashes.frombytes(buf[data:data + rows * 8])
+        data += self.rows * 8
+        chars = bytes(buf[data:data + cells * 4])
+        data += self.cells * 4
+        styles = bytes(buf[data:data + cells * 4])
+        if SLOT_HEADER.unpack_from(buf, base)[0] != seq:
+            return False
+
+        text = chars.decode('utf-32-le')
+        style_ids = array('I')
+        style_ids.frombytes(styles)
+        frame.reshape(rows, cols)
+        old_hashes = frame.hashes
+        for r in range(rows):
+            if old_hashes[r] == hashes[r]:
+                continue
+            start = r * cols
+            frame.chars[r][:] = text[start:start + cols]
+            frame.styles[r][:] = style_ids[start:start + cols]
+        frame.hashes = hashes.tolist()
+        frame.number = number
+        return True
+
+    def close(self):
+        self.buf.release()
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _apply_limits(cpu_seconds, memory_bytes):
+    if resource is None:
+        return
+    if cpu_seconds:
+        # Soft limit delivers SIGXCPU so the parent can tell why the sketch died
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+
+@contextlib.contextmanager
+def _in_sketch_code(busy_since):
+    """Mark the time sketch code was entered, for the parent's watchdog"""
+    busy_since.value = time.monotonic()
+    try:
+        yield
+    finally:
+        busy_since.value = 0.0
+
+
+def _sketch_main(code_bytes, shm_name, rows, cols, conn, fps, cpu_seconds, memory_bytes, busy_since):
+    """Entry point of the child process"""
+    framebuffer = None
+
+    def report(e):
+        conn.send(('error', f"Error: {str(e) or type(e).__name__}\n{traceback.format_exc()}"))
+
+    try:
+        _apply_limits(cpu_seconds, memory_bytes)
+        framebuffer = SharedFrameBuffer.attach(shm_name, rows, cols)
+        canvas = Canvas(rows, cols)
+        sketch = LiveSketch(canvas)
+        sent_styles = 0
+        number = 0
+        # Frames identical to the last one written are neither copied nor announced
+        diff = RowDiff()
+
+        # After an error the sketch idles until a reload fixes it
+        failed = False
+        try:
+            with _in_sketch_code(busy_since):
+                sketch.load(marshal.loads(code_bytes))
+        except Exception as e:
+            report(e)
+            failed = True
+
+        while True:
+            draw_func = sketch.draw_func
+            if draw_func and not failed:
+                try:
+                    with _in_sketch_code(busy_since):
+                        sketch.draw_frame()
+                except Exception as e:
+                    report(e)
+                    failed = True
+                else:
+                    hashes = canvas.row_hashes()
+                    if diff.changed(hashes):
+                        number += 1
+                        framebuffer.write(canvas, number, hashes)
+
+                        # Styles are interned per process; ship new ones so IDs mean the same in the parent
+                        new_styles = STYLES.keys[sent_styles:]
+                        sent_styles += len(new_styles)
+                        conn.send(('frame', number, new_styles, diff.stats))
+
+            # Sleep until the next frame, waking early for commands
+            if conn.poll(None if failed or not draw_func else 1.0 / fps):
+                message = conn.recv()
+                if message[0] == 'stop':
+                    break
+                elif message[0] == 'fps':
+                    fps = message[1]
+                elif message[0] == 'resize':
+                    # Attach the new framebuffer before letting go of the old one
+                    _, rows, cols, shm_name = message
+                    old_framebuffer = framebuffer
+                    framebuffer = SharedFrameBuffer.attach(shm_name, rows, cols)
+                    old_framebuffer.close()
+                    diff.reset()
+                    conn.send(('resized', rows, cols))
+                    try:
+                        with _in_sketch_code(busy_since):
+                            sketch.resize(rows, cols)
+                    except Exception as e:
+                        report(e)
+                        failed = True
+                elif message[0] == 'reload':
+                    try:
+                        with _in_sketch_code(busy_since):
+                            restarted = sketch.reload(marshal.loads(message[1]))
+                    except Exception as e:
+                        report(e)
+                        failed = True
+                    else:
+                        failed = False
+                        conn.send(('reloaded', restarted))
+
+    except (EOFError, OSError):
+        pass  # The IDE went away
+    except Exception as e:
+        try:
+            report(e)
+        except (OSError, ValueError):
+            pass
+    finally:
+        if framebuffer:
+            framebuffer.close()
+
+
+class SketchProcess:
+    """Parent-side handle on a sketch running in a child process"""
+
+    def __init__(self, rows, cols, fps=5, cpu_seconds=None, memory_bytes=DEFAULT_MEMORY_BYTES,
+                 frame_timeout=DEFAULT_FRAME_TIMEOUT):
+        self.rows = rows
+        self.cols = cols
+        self.fps = fps
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.frame_timeout = frame_timeout
+        # monotonic() time the child entered sketch code, 0.0 while it isn't in it
+        self.busy_since = None
+        self.process = None
+        self.conn = None
+        self.framebuffer = None
+        # Framebuffers sent with resize requests the sketch hasn't confirmed yet
+        self.pending_framebuffers = []
+        self.frame = Frame(rows, cols)
+        self.styles = StyleTable()
+        self.error_message = None
+        self.restarts = 0
+        self.stopped = False
+        self.exited = False
+        # Frame and row counts from the sketch, as of its latest frame
+        self.stats = {}
+
+    def _compile(self, source):
+        try:
+            return compile_sketch(source)
+        except SyntaxError as e:
+            self.error_message = f"Error: {str(e)}\n{traceback.format_exc()}"
+            return None
+
+    def start(self, source):
+        code = self._compile(source)
+        if code is None:
+            return
+
+        # Spawn gives the sketch a clean interpreter with no curses or editor state
+        context = multiprocessing.get_context('spawn')
+        self.framebuffer = SharedFrameBuffer.create(self.rows, self.cols)
+        self.conn, child_conn = context.Pipe()
+        self.busy_since = context.Value('d', 0.0, lock=False)
+        self.process = context.Process(
+            target=_sketch_main,
+            args=(marshal.dumps(code), self.framebuffer.name, self.rows, self.cols, child_conn,
+                  self.fps, self.cpu_seconds, self.memory_bytes, self.busy_since),
+            daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def is_running(self):
+        return self.process is not None and not self.stopped and self.process.is_alive()
+
+    def reload(self, source):
+        """Hot-swap edited source into the running sketch; False if it doesn't compile"""
+        code = self._compile(source)
+        if code is None:
+            return False
+        self.conn.send(('reload', marshal.dumps(code)))
+        return True
+
+    def resize(self, rows, cols):
+        """Resize the running sketch's canvas without restarting it
+
+        The sketch gets a new shared framebuffer of the new size; frames
+        announced before it confirms the switch are still read from the old one.
+        """
+        self.rows = rows
+        self.cols = cols
+        if not self.is_running():
+            return
+        framebuffer = SharedFrameBuffer.create(rows, cols)
+        self.pending_framebuffers.append(framebuffer)
+        self.conn.send(('resize', rows, cols, framebuffer.name))
+
+    def set_fps(self, fps):
+        """Change the frame rate of the running sketch"""
+        self.fps = fps
+        if self.is_running():
+            self.conn.send(('fps', fps))
+
+    def fileno(self):
+        """Readable whenever the sketch has sent a notification"""
+        return self.conn.fileno()
+
+    def poll(self):
+        """Process pending notifications; True if a newer frame was copied in
+
+        Also kills the sketch if it has been stuck in one call for longer
+        than frame_timeout, so call this regularly even when nothing arrives.
+        """
+        if self.stopped or self.process is None:
+            return False
+
+        latest = None
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message[0] == 'frame':
+                    _, number, new_styles, self.stats = message
+                    for key in new_styles:
+                        self.styles.intern(*key)
+                    latest = number
+                elif message[0] == 'resized':
+                    old_framebuffer = self.framebuffer
+                    self.framebuffer = self.pending_framebuffers.pop(0)
+                    old_framebuffer.close()
+                    old_framebuffer.unlink()
+                    # The frame read from the old framebuffer is stale
+                    latest = None
+                elif message[0] == 'reloaded':
+                    self.error_message = None
+                    if message[1]:
+                        self.restarts += 1
+                elif message[0] == 'error':
+                    self.error_message = message[1]
+        except (EOFError, OSError):
+            # The pipe stays readable at EOF; callers should stop waiting on it
+            self.exited = True
+            self._check_exit()
+        self._check_watchdog()
+
+        # A torn read means the sketch already moved on; its next notification will catch up
+        return latest is not None and self.framebuffer.read(latest, self.frame)
+
+    def _check_watchdog(self):
+        started = self.busy_since.value
+        if (not self.frame_timeout or not started or self.exited
+                or time.monotonic() - started <= self.frame_timeout):
+            return
+        self.process.kill()
+        self.process.join()
+        self.exited = True
+        self.error_message = (f"Sketch stopped: a single call into it ran for more than "
+                              f"{self.frame_timeout:g}s (an infinite loop?)")
+
+    def _check_exit(self):
+        if self.error_message or self.process.is_alive():
+            return
+        self.process.join()
+        code = self.process.exitcode
+        if hasattr(signal, 'SIGXCPU') and code == -signal.SIGXCPU:
+            self.error_message = f"Sketch stopped: exceeded its CPU limit of {self.cpu_seconds}s"
+        else:
+            self.error_message = f"Sketch process exited unexpectedly (exit code {code})"
+
+    def stop(self):
+        """Kill the sketch immediately, however busy it is"""
+        if self.stopped or not self.process:
+            return
+        self.stopped = True
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        for framebuffer in [self.framebuffer] + self.pending_framebuffers:
+            framebuffer.close()
+            framebuffer.unlink()
+        self.pending_framebuffers = []
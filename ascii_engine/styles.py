@@ -0,0 +1,140 @@
+"""
+Style registry for the ASCII Engine
+
+Every (foreground, background, attributes) combination is interned once as a
+small integer ID with its ANSI escape sequence precomputed for the active
+color mode. The canvas stores one ID per cell and the encoders emit the
+cached sequences, so drawing never builds escape strings or looks colors up
+per cell.
+"""
+
+import threading
+
+from ascii_engine.colors import parse_color, sgr_color_codes, detect_color_mode
+
+RESET = '\u001b[0m'
+
+ATTR_CODES = {
+    'bold': 1,
+    'dim': 2,
+    'italic': 3,
+    'underline': 4,
+    'blink': 5,
+    'reverse': 7,
+    'strikethrough': 9,
+}
+
+# Style 0 is always the terminal default (no color, no attributes)
+DEFAULT_STYLE = 0
+
+
+def _normalize_attrs(attrs):
+    """Turn None, a single name or an iterable of names into a sorted tuple"""
+    if not attrs:
+        return ()
+    if isinstance(attrs, str):
+        attrs = (attrs,)
+    for attr in attrs:
+        if attr not in ATTR_CODES:
+            raise ValueError(f"Unknown text attribute: {attr!r}")
+    return tuple(sorted(set(attrs)))
+
+
+class StyleTable:
+    """Interns style keys as integer IDs with cached escape sequences"""
+
+    def __init__(self, color_mode=None):
+        self.color_mode = detect_color_mode() if color_mode is None else color_mode
+        self._ids = {}
+        self._resolved = {}
+        self._lock = threading.Lock()
+        self.keys = []
+        self.escapes = []
+        self.escape_bytes = []
+        self.intern()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def intern(self, fg=None, bg=None, attrs=()):
+        """Return the ID for a style, registering it on first use"""
+        key = (parse_color(fg), parse_color(bg), _normalize_attrs(attrs))
+        style_id = self._ids.get(key)
+        if style_id is not None:
+            return style_id
+
+        with self._lock:
+            style_id = self._ids.get(key)
+            if style_id is None:
+                escape = self._build_escape(key)
+                style_id = len(self.keys)
+                # Publish the escape before the ID so readers never see a gap
+                self.keys.append(key)
+                self.escapes.append(escape)
+                self.escape_bytes.append(escape.encode('utf-8'))
+                self._ids[key] = style_id
+        return style_id
+
+    def resolve(self, color):
+        """Map a drawing API color argument (style ID or color spec) to an ID"""
+        if type(color) is int:
+            return color
+        if type(color) is list:
+            color = tuple(color)
+        style_id = self._resolved.get(color)
+        if style_id is None:
+            style_id = self.intern(fg=color)
+            self._resolved[color] = style_id
+        return style_id
+
+    def set_color_mode(self, color_mode):
+        """Re-encode every interned style for a terminal with different color support"""
+        with self._lock:
+            self.color_mode = color_mode
+            for style_id, key in enumerate(self.keys):
+                escape = self._build_escape(key)
+                self.escapes[style_id] = escape
+                self.escape_bytes[style_id] = escape.encode('utf-8')
+
+    def _build_escape(self, key):
+        fg, bg, attrs = key
+        if fg is None and bg is None and not attrs:
+            return RESET
+
+        # Leading 0 resets whatever the previous cell left behind
+        codes = ['0']
+        codes.extend(str(ATTR_CODES[attr]) for attr in attrs)
+        if fg is not None:
+            codes.extend(sgr_color_codes(fg, self.color_mode))
+        if bg is not None:
+            codes.extend(sgr_color_codes(bg, self.color_mode, background=True))
+        return f"\u001b[{';'.join(codes)}m"
+
+
+def encode_cells(chars, styles, escapes):
+    """Encode one row of cells, emitting a cached escape only where the style changes"""
+    reset = escapes[DEFAULT_STYLE]
+    parts = []
+    current = DEFAULT_STYLE
+    active = reset
+    for char, style_id in zip(chars, styles):
+        if style_id != current:
+            # Styles can share an escape once downsampled to the terminal palette
+            escape = escapes[style_id]
+            if escape != active:
+                parts.append(escape)
+                active = escape
+            current = style_id
+        parts.append(char)
+    if active != reset:
+        parts.append(reset)
+    return ''.join(parts)
+
+
+# Shared registry; interning is append-only, so sketches can't clobber each other
+STYLES = StyleTable()
+
+
+def style(fg=None, bg=None, attrs=()):
+    """Intern a style in the shared registry and return its ID"""
+    return STYLES.intern(fg, bg, attrs)
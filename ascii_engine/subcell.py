@@ -0,0 +1,207 @@
+"""
+Sub-cell canvases: several pixels per character cell
+
+Both canvases have the full drawing API of Canvas, but rows, cols and every
+coordinate passed to a primitive are in pixels smaller than a terminal cell.
+render() packs the pixels into characters of an ordinary cell Canvas, which
+is then drawn, presented or handed to the IDE like any other canvas.
+
+BrailleCanvas maps a 2 x 4 block of pixels onto one Unicode braille
+character, for 8x the resolution of plain cells. Its buffer holds one byte
+per cell, one bit per dot, and a cell takes the color drawn into it last.
+
+HalfBlockCanvas maps a 1 x 2 block onto the upper and lower half block
+characters. Each pixel keeps its own color: the upper one becomes the
+foreground and the lower one the background of the cell.
+"""
+
+from ascii_engine.main import Canvas
+from ascii_engine.styles import DEFAULT_STYLE
+
+# Bit of each braille dot, indexed [row within cell][column within cell]
+BRAILLE_BITS = ((0x01, 0x08), (0x02, 0x10), (0x04, 0x20), (0x40, 0x80))
+
+UPPER_HALF = '▀'
+LOWER_HALF = '▄'
+FULL_BLOCK = '█'
+
+
+class SubCellCanvas(Canvas):
+    """Base for canvases of cell_cols x cell_rows blocks of pixels"""
+
+    cell_width = 1
+    cell_height = 1
+
+    def __init__(self, rows, cols):
+        # No character grid; rows and cols are in pixels and cells live in the subclass buffer
+        super().__init__(0, 0)
+        self.screen = Canvas(rows, cols)
+        # draw() goes through the screen, so its row diff and stats are the ones in use
+        self.output_diff = self.screen.output_diff
+        self.stats = self.screen.stats
+        self._allocate(rows, cols)
+
+    def _allocate(self, rows, cols):
+        self.rows = rows * self.cell_height
+        self.cols = cols * self.cell_width
+
+    def set_pixel(self, row, col, char, color='white'):
+        """Set a single pixel; a blank char clears it"""
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            self._plot(row, col, char, self.style_table.resolve(color))
+
+    def _write(self, row, col, text, style):
+        # One pixel per character; big_text() is the way to draw readable text here
+        for offset, char in enumerate(text):
+            self._plot(row, col + offset, char, style)
+
+    def draw(self, in_place=False):
+        """Print the packed cells, see Canvas.draw()"""
+        self.render().draw(in_place)
+
+    def row_hashes(self):
+        return self.render().row_hashes()
+
+    def encode_row(self, r):
+        return self.screen.encode_row(r)
+
+    def resize(self, rows, cols):
+        """Resize to rows x cols cells; the pixels are cleared"""
+        if rows * self.cell_height == self.rows and cols * self.cell_width == self.cols:
+            return
+        self.screen.resize(rows, cols)
+        self._allocate(rows, cols)
+
+
+class BrailleCanvas(SubCellCanvas):
+    """A canvas of (rows * 4) x (cols * 2) dots shown as rows x cols braille cells"""
+
+    cell_width = 2
+    cell_height = 4
+
+    # Character for every dot pattern; an empty cell is a plain blank
+    chars = [' '] + [chr(0x2800 + bits) for bits in range(1, 256)]
+
+    def _allocate(self, rows, cols):
+        super()._allocate(rows, cols)
+        self.dots = [bytearray(cols) for r in range(rows)]
+        self.cell_styles = [[DEFAULT_STYLE] * cols for r in range(rows)]
+
+    def _plot(self, row, col, char, style):
+        bit = BRAILLE_BITS[row & 3][col & 1]
+        cells = self.dots[row >> 2]
+        if char == self.blank:
+            cells[col >> 1] &= ~bit
+        else:
+            cells[col >> 1] |= bit
+            self.cell_styles[row >> 2][col >> 1] = style
+
+    def _span(self, row, start, end, char, style):
+        left_bit, right_bit = BRAILLE_BITS[row & 3]
+        cells = self.dots[row >> 2]
+        styles = self.cell_styles[row >> 2]
+        first = start >> 1
+        last = (end - 1) >> 1
+        erase = char == self.blank
+        for cell in range(first, last + 1):
+            bits = left_bit | right_bit
+            if cell == first and start & 1:
+                bits = right_bit
+            if cell == last and end & 1:
+                bits &= left_bit
+            if erase:
+                cells[cell] &= ~bits
+            else:
+                cells[cell] |= bits
+                styles[cell] = style
+
+    def get_pixel(self, row, col):
+        """True if the dot at (row, col) is set"""
+        return bool(self.dots[row >> 2][col >> 1] & BRAILLE_BITS[row & 3][col & 1])
+
+    def render(self, target=None):
+        """Pack the dots into braille characters of a cell canvas and return it
+
+        The target defaults to the canvas's own screen; pass the sketch's
+        canvas to show the dots in the IDE preview.
+        """
+        target = self.screen if target is None else target
+        chars = self.chars
+        rows = min(len(self.dots), target.rows)
+        cols = min(self.cols >> 1, target.cols)
+        for r in range(rows):
+            target.canvas[r][:cols] = map(chars.__getitem__, self.dots[r][:cols])
+            target.styles[r][:cols] = self.cell_styles[r][:cols]
+        return target
+
+    def clear(self):
+        empty = bytes(self.cols >> 1)
+        default_row = [DEFAULT_STYLE] * (self.cols >> 1)
+        for cells, styles in zip(self.dots, self.cell_styles):
+            cells[:] = empty
+            styles[:] = default_row
+
+
+class HalfBlockCanvas(SubCellCanvas):
+    """A canvas of (rows * 2) x cols pixels shown as rows x cols half-block cells"""
+
+    cell_height = 2
+
+    def _allocate(self, rows, cols):
+        super()._allocate(rows, cols)
+        # Style ID of every pixel, None where nothing is drawn
+        self.pixels = [[None] * cols for r in range(rows * 2)]
+        # (upper style, lower style) -> (character, cell style)
+        self._cells = {(None, None): (self.blank, DEFAULT_STYLE)}
+
+    def _plot(self, row, col, char, style):
+        self.pixels[row][col] = None if char == self.blank else style
+
+    def _span(self, row, start, end, char, style):
+        value = None if char == self.blank else style
+        self.pixels[row][start:end] = [value] * (end - start)
+
+    def get_pixel(self, row, col):
+        """The style ID of the pixel at (row, col), or None if it is empty"""
+        return self.pixels[row][col]
+
+    def _cell(self, pair):
+        """Work out the character and style for one pair of pixel styles"""
+        upper, lower = pair
+        if lower is None:
+            cell = (UPPER_HALF, upper)
+        elif upper is None:
+            cell = (LOWER_HALF, lower)
+        elif upper == lower:
+            cell = (FULL_BLOCK, upper)
+        else:
+            # Upper pixel in the foreground, lower pixel's color behind it
+            keys = self.style_table.keys
+            fg, bg, attrs = keys[upper]
+            cell = (UPPER_HALF, self.style_table.intern(fg, keys[lower][0], attrs))
+        self._cells[pair] = cell
+        return cell
+
+    def render(self, target=None):
+        """Pack pixel pairs into half-block characters of a cell canvas and return it
+
+        The target defaults to the canvas's own screen; pass the sketch's
+        canvas to show the pixels in the IDE preview.
+        """
+        target = self.screen if target is None else target
+        cells = self._cells
+        make_cell = self._cell
+        pixels = self.pixels
+        rows = min(len(pixels) // 2, target.rows)
+        cols = min(self.cols, target.cols)
+        for r in range(rows):
+            packed = [cells.get(pair) or make_cell(pair)
+                      for pair in zip(pixels[2 * r][:cols], pixels[2 * r + 1][:cols])]
+            target.canvas[r][:cols] = [cell[0] for cell in packed]
+            target.styles[r][:cols] = [cell[1] for cell in packed]
+        return target
+
+    def clear(self):
+        empty_row = [None] * self.cols
+        for row in self.pixels:
+            row[:] = empty_row
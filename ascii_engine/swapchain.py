@@ -0,0 +1,108 @@
+"""
+Swap chain for handing finished frames from a producer thread to readers
+
+The producer renders into a Canvas and calls present() when a frame is
+complete. The cells are copied into a back buffer and the buffers are
+swapped, so readers calling acquire() always see the last complete frame and
+never a half-cleared or half-drawn one. Three buffers are rotated (back,
+ready, front): the lock only guards swapping references, so the producer
+never waits for a reader to finish with a frame.
+"""
+
+import threading
+
+from ascii_engine.styles import STYLES, DEFAULT_STYLE, encode_cells
+from ascii_engine.rowhash import RowDiff
+from ascii_engine.terminal import stdout_writer, reset_stdout_writer
+
+
+class Frame:
+    """A complete framebuffer: one character and one style ID per cell"""
+
+    def __init__(self, rows, cols, blank=' '):
+        self.number = 0
+        self.rows = None
+        self.cols = None
+        self.reshape(rows, cols, blank)
+
+    def reshape(self, rows, cols, blank=' '):
+        """Reallocate the cell grids if the frame size differs"""
+        if self.rows == rows and self.cols == cols:
+            return
+        self.rows = rows
+        self.cols = cols
+        self.chars = [[blank] * cols for r in range(rows)]
+        self.styles = [[DEFAULT_STYLE] * cols for r in range(rows)]
+        # Row hashes are None until the rows have been filled in
+        self.hashes = [None] * rows
+
+    def copy_from(self, canvas, hashes=None):
+        """Copy the cells of a canvas, reallocating if its size changed"""
+        self.reshape(canvas.rows, canvas.cols, canvas.blank)
+        for r in range(self.rows):
+            self.chars[r][:] = canvas.canvas[r]
+            self.styles[r][:] = canvas.styles[r]
+        self.hashes = list(hashes) if hashes is not None else canvas.row_hashes()
+
+    def encode_row(self, r, style_table=STYLES):
+        return encode_cells(self.chars[r], self.styles[r], style_table.escapes)
+
+    def draw(self, style_table=STYLES, in_place=False):
+        """Print the frame, like Canvas.draw(), or rewrite it in place on a terminal"""
+        writer = stdout_writer() if in_place else None
+        if writer is not None:
+            writer.write_rows(range(self.rows), lambda r: self.encode_row(r, style_table), self.rows)
+            return
+        reset_stdout_writer()
+        output = [self.encode_row(r, style_table) for r in range(self.rows)]
+        print('\n'.join(output), flush=True)
+
+
+class SwapChain:
+    """Triple-buffered hand-off of complete frames between threads"""
+
+    def __init__(self, rows, cols):
+        self._back = Frame(rows, cols)
+        self._ready = Frame(rows, cols)
+        self._front = Frame(rows, cols)
+        self._fresh = False
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self.frames_presented = 0
+        self._diff = RowDiff()
+        self.stats = self._diff.stats
+
+    def present(self, canvas):
+        """Publish the canvas contents as the newest complete frame
+
+        Returns False without waking readers if the frame is identical to the
+        last one presented.
+        """
+        hashes = canvas.row_hashes()
+        if not self._diff.changed(hashes):
+            return False
+        back = self._back
+        back.copy_from(canvas, hashes)
+        back.number = self.frames_presented + 1
+        with self._lock:
+            self._back, self._ready = self._ready, back
+            self._fresh = True
+            self.frames_presented = back.number
+            self._frame_ready.set()
+        return True
+
+    def acquire(self):
+        """Return the latest complete frame; it stays untouched until the next acquire()"""
+        with self._lock:
+            if self._fresh:
+                self._front, self._ready = self._ready, self._front
+                self._fresh = False
+                self._frame_ready.clear()
+        return self._front
+
+    def has_new_frame(self):
+        return self._fresh
+
+    def wait_for_frame(self, timeout=None):
+        """Block a reader until a frame newer than the last acquired one exists"""
+        return self._frame_ready.wait(timeout)
@@ -0,0 +1,128 @@
+"""
+Direct frame output to the terminal for the ASCII Engine
+
+Canvas.draw() prints each frame by default, which scrolls like any other
+output. Drawing with in_place=True uses the writer here instead: rows are
+written in place with cursor addressing, so the picture stays put and only
+rows that changed need to be sent. That is only safe when nothing else is
+printed between frames.
+
+Frames are assembled in one reused bytearray and sent with a single
+os.write() on the terminal's file descriptor, bypassing print() and the text
+layer of sys.stdout. Each row is still encoded to UTF-8 on its own and
+copied in, as str has no way to encode into an existing buffer. Terminals
+that support synchronized output (DEC private mode 2026) get each frame
+wrapped in begin/end markers and display it atomically.
+"""
+
+import os
+import sys
+
+SYNC_BEGIN = b'\x1b[?2026h'
+SYNC_END = b'\x1b[?2026l'
+CLEAR_SCREEN = b'\x1b[2J'
+
+# Terminals known to implement synchronized output
+SYNC_TERM_PROGRAMS = ('iTerm.app', 'WezTerm', 'vscode', 'ghostty', 'contour', 'rio', 'tabby')
+SYNC_TERMS = ('kitty', 'foot', 'alacritty', 'wezterm', 'ghostty', 'contour', 'rio')
+
+
+def detect_synchronized_output(environ=None):
+    """Guess from the environment whether the terminal supports DEC mode 2026
+
+    ASCII_ENGINE_SYNC_OUTPUT=1 or 0 overrides the guess.
+    """
+    environ = os.environ if environ is None else environ
+    override = environ.get('ASCII_ENGINE_SYNC_OUTPUT')
+    if override is not None:
+        return override.strip().lower() not in ('', '0', 'no', 'false', 'off')
+    if environ.get('TERM_PROGRAM') in SYNC_TERM_PROGRAMS:
+        return True
+    term = environ.get('TERM', '')
+    return any(name in term for name in SYNC_TERMS)
+
+
+class TerminalWriter:
+    """Writes frames to a terminal in place with one write() per frame"""
+
+    def __init__(self, fd, synchronized=None):
+        self.fd = fd
+        self.synchronized = detect_synchronized_output() if synchronized is None else synchronized
+        self.started = False
+        self._buffer = bytearray(64 * 1024)
+        self._length = 0
+        self.stats = {'frames': 0, 'bytes': 0}
+
+    def _append(self, data):
+        end = self._length + len(data)
+        if end > len(self._buffer):
+            # Grow geometrically so steady-state frames never reallocate
+            self._buffer.extend(bytes(max(end, 2 * len(self._buffer)) - len(self._buffer)))
+        self._buffer[self._length:end] = data
+        self._length = end
+
+    def write_rows(self, rows, encode_row, row_count):
+        """Write the given rows of a frame in place
+
+        encode_row(r) returns the text of row r including its escapes. The
+        first frame clears the screen and writes every row; an empty list of
+        rows writes nothing at all.
+        """
+        if not self.started:
+            rows = range(row_count)
+        elif not rows:
+            return
+
+        self._length = 0
+        if self.synchronized:
+            self._append(SYNC_BEGIN)
+        if not self.started:
+            self._append(CLEAR_SCREEN)
+            self.started = True
+        for r in rows:
+            self._append(b'\x1b[%d;1H' % (r + 1))
+            self._append(encode_row(r).encode('utf-8'))
+        # Park the cursor below the frame so other output doesn't land on it
+        self._append(b'\x1b[%d;1H' % (row_count + 1))
+        if self.synchronized:
+            self._append(SYNC_END)
+        self.flush()
+
+    def flush(self):
+        with memoryview(self._buffer) as view:
+            written = 0
+            while written < self._length:
+                written += os.write(self.fd, view[written:self._length])
+        self.stats['frames'] += 1
+        self.stats['bytes'] += self._length
+        self._length = 0
+
+    def reset(self):
+        """Clear the screen and write every row again on the next frame"""
+        self.started = False
+
+
+_stdout_writer = None
+
+
+def stdout_writer():
+    """The shared writer for sys.stdout, or None when it isn't a terminal"""
+    global _stdout_writer
+    stream = sys.stdout
+    try:
+        if not stream.isatty():
+            return None
+        fd = stream.fileno()
+    except (AttributeError, ValueError, OSError):
+        return None
+    if _stdout_writer is None or _stdout_writer.fd != fd:
+        _stdout_writer = TerminalWriter(fd)
+    # Text printed before the frame must reach the terminal first
+    stream.flush()
+    return _stdout_writer
+
+
+def reset_stdout_writer():
+    """Make the shared writer redraw everything, e.g. after other output scrolled the terminal"""
+    if _stdout_writer is not None:
+        _stdout_writer.reset()
@@ -0,0 +1,200 @@
+"""
+World-space canvas larger than the screen
+
+A WorldCanvas has the drawing API of Canvas, but its cells live in fixed-size
+square tiles that are allocated the first time something is drawn into them,
+so a 10,000 x 10,000 map costs memory only where it has content. A Camera
+selects the part of the world that gets presented: render() copies the
+visible cells into an ordinary screen-sized Canvas, which is then drawn,
+presented or handed to the IDE like any other canvas.
+
+By default drawing is culled to the camera, so primitives whose bounding box
+lies outside it are rejected before rasterization and off-screen tiles are
+never allocated; this suits sketches that redraw the scene every frame. Set
+cull=False to keep everything drawn anywhere in the world, e.g. a static map
+drawn once in setup() and then panned across.
+"""
+
+from ascii_engine.main import Canvas
+from ascii_engine.styles import DEFAULT_STYLE
+
+DEFAULT_TILE_SIZE = 64
+
+
+class Camera:
+    """A view of rows x cols cells whose top-left corner is at (row, col) in the world"""
+
+    def __init__(self, world_rows, world_cols, rows, cols, row=0, col=0):
+        self.world_rows = world_rows
+        self.world_cols = world_cols
+        self.rows = rows
+        self.cols = cols
+        self.row = 0
+        self.col = 0
+        self.move_to(row, col)
+
+    def move_to(self, row, col):
+        """Put the top-left corner at (row, col), keeping the view inside the world"""
+        self.row = max(0, min(int(row), self.world_rows - self.rows))
+        self.col = max(0, min(int(col), self.world_cols - self.cols))
+
+    def pan(self, rows, cols):
+        self.move_to(self.row + rows, self.col + cols)
+
+    def center_on(self, row, col):
+        self.move_to(row - self.rows // 2, col - self.cols // 2)
+
+    def resize(self, rows, cols):
+        """Change the size of the view, e.g. to follow the terminal"""
+        self.rows = rows
+        self.cols = cols
+        self.move_to(self.row, self.col)
+
+    def bounds(self):
+        """The visible area as (top, left, bottom, right), bottom and right exclusive"""
+        return (self.row, self.col,
+                min(self.row + self.rows, self.world_rows), min(self.col + self.cols, self.world_cols))
+
+
+class WorldCanvas(Canvas):
+    """A sparse canvas of world_rows x world_cols cells stored in tiles"""
+
+    def __init__(self, rows, cols, view_rows=50, view_cols=150, tile_size=DEFAULT_TILE_SIZE, cull=True):
+        # No dense grid; rows and cols are the world size and cells live in tiles
+        super().__init__(0, 0)
+        self.rows = rows
+        self.cols = cols
+        self.tile_size = tile_size
+        self.cull = cull
+        self.camera = Camera(rows, cols, view_rows, view_cols)
+        self.screen = Canvas(view_rows, view_cols)
+        # (tile row, tile col) -> (character rows, style rows)
+        self._tiles = {}
+        # Tiles dropped by clear(), reused instead of allocating new ones
+        self._free_tiles = []
+
+    def clip_rect(self):
+        if self.cull:
+            return self.camera.bounds()
+        return 0, 0, self.rows, self.cols
+
+    def _tile(self, tile_row, tile_col):
+        """The tile at the given tile coordinates, allocating it on first use"""
+        key = (tile_row, tile_col)
+        tile = self._tiles.get(key)
+        if tile is None:
+            size = self.tile_size
+            if self._free_tiles:
+                tile = self._free_tiles.pop()
+                for chars, styles in zip(*tile):
+                    chars[:] = [self.blank] * size
+                    styles[:] = [DEFAULT_STYLE] * size
+            else:
+                tile = ([[self.blank] * size for r in range(size)],
+                        [[DEFAULT_STYLE] * size for r in range(size)])
+            self._tiles[key] = tile
+        return tile
+
+    @property
+    def tile_count(self):
+        """Number of tiles currently allocated"""
+        return len(self._tiles)
+
+    def set_pixel(self, row, col, char, color='white'):
+        """Set a single cell in world coordinates"""
+        top, left, bottom, right = self.clip_rect()
+        if top <= row < bottom and left <= col < right:
+            self._plot(row, col, char, self.style_table.resolve(color))
+
+    def _plot(self, row, col, char, style):
+        tile_row, r = divmod(row, self.tile_size)
+        tile_col, c = divmod(col, self.tile_size)
+        chars, styles = self._tile(tile_row, tile_col)
+        chars[r][c] = char
+        styles[r][c] = style
+
+    def _span(self, row, start, end, char, style):
+        # Split the span at tile boundaries
+        size = self.tile_size
+        tile_row, r = divmod(row, size)
+        while start < end:
+            tile_col, c = divmod(start, size)
+            stop = min(end, start + size - c)
+            chars, styles = self._tile(tile_row, tile_col)
+            count = stop - start
+            chars[r][c:c + count] = [char] * count
+            styles[r][c:c + count] = [style] * count
+            start = stop
+
+    def _write(self, row, col, text, style):
+        # Split the text at tile boundaries
+        size = self.tile_size
+        tile_row, r = divmod(row, size)
+        end = col + len(text)
+        start = col
+        while start < end:
+            tile_col, c = divmod(start, size)
+            stop = min(end, start + size - c)
+            chars, styles = self._tile(tile_row, tile_col)
+            count = stop - start
+            chars[r][c:c + count] = text[start - col:stop - col]
+            styles[r][c:c + count] = [style] * count
+            start = stop
+
+    def get_pixel(self, row, col):
+        """The (character, style ID) of a cell in world coordinates"""
+        tile_row, r = divmod(row, self.tile_size)
+        tile_col, c = divmod(col, self.tile_size)
+        tile = self._tiles.get((tile_row, tile_col))
+        if tile is None:
+            return self.blank, DEFAULT_STYLE
+        return tile[0][r][c], tile[1][r][c]
+
+    def render(self, target=None):
+        """Copy what the camera sees into a screen canvas and return it
+
+        The target defaults to the world's own screen canvas; pass the
+        sketch's canvas to show the view in the IDE preview. Cells are copied
+        a tile-wide slice at a time and missing tiles are left blank.
+        """
+        target = self.screen if target is None else target
+        target.clear()
+        top, left, bottom, right = self.camera.bounds()
+        bottom = min(bottom, top + target.rows)
+        right = min(right, left + target.cols)
+        size = self.tile_size
+        tiles = self._tiles
+        for row in range(top, bottom):
+            tile_row, r = divmod(row, size)
+            out_chars = target.canvas[row - top]
+            out_styles = target.styles[row - top]
+            col = left
+            while col < right:
+                tile_col, c = divmod(col, size)
+                end = min(right, col + size - c)
+                tile = tiles.get((tile_row, tile_col))
+                if tile is not None:
+                    out_chars[col - left:end - left] = tile[0][r][c:c + end - col]
+                    out_styles[col - left:end - left] = tile[1][r][c:c + end - col]
+                col = end
+        return target
+
+    def draw(self, in_place=False):
+        """Print what the camera sees, see Canvas.draw()"""
+        self.render().draw(in_place)
+
+    def row_hashes(self):
+        return self.render().row_hashes()
+
+    def encode_row(self, r):
+        return self.screen.encode_row(r)
+
+    def resize(self, rows, cols):
+        """Resize the view (not the world), e.g. when the terminal changes size"""
+        self.camera.resize(rows, cols)
+        self.screen.resize(rows, cols)
+
+    def clear(self):
+        """Blank the whole world; tiles are kept for reuse"""
+        self._free_tiles.extend(self._tiles.values())
+        self._tiles.clear()
@@ -5,15 +5,501 @@ Split-screen editor with live preview using curses
 """
 
 import curses
-import threading
 import time
 import sys
 import os
-import traceback
-import importlib
-import tempfile
-from pathlib import Path
-from ascii_engine.main import Canvas, COLORS
+import random
+import select
+import signal
+import re
+from bisect import bisect_left
+import ascii_engine
+from ascii_engine.styles import STYLES
+from ascii_engine.curses_output import CursesStyleMap, style_runs, paint_row
+from ascii_engine.rowhash import RowDiff
+
+
+class _Source:
+    """An immutable chunk of text that pieces point into, with its newline offsets"""
+    __slots__ = ('text', 'newlines')
+    
+    def __init__(self, text):
+        self.text = text
+        newlines = []
+        i = text.find('\n')
+        while i >= 0:
+            newlines.append(i)
+            i = text.find('\n', i + 1)
+        self.newlines = newlines
+
+class _Piece:
+    """Treap node: a span of a source plus length and newline totals for its subtree"""
+    __slots__ = ('source', 'start', 'length', 'newlines', 'priority', 'left', 'right', 'size', 'lines')
+    
+    def __init__(self, source, start, length, newlines, priority, left, right):
+        self.source = source
+        self.start = start
+        self.length = length
+        self.newlines = newlines
+        self.priority = priority
+        self.left = left
+        self.right = right
+        self.size = length + (left.size if left else 0) + (right.size if right else 0)
+        self.lines = newlines + (left.lines if left else 0) + (right.lines if right else 0)
+
+def _new_piece(source, start, length):
+    nl = source.newlines
+    newlines = bisect_left(nl, start + length) - bisect_left(nl, start)
+    return _Piece(source, start, length, newlines, random.random(), None, None)
+
+def _with_children(node, left, right):
+    # Nodes are never mutated, so every old root stays a valid snapshot
+    return _Piece(node.source, node.start, node.length, node.newlines, node.priority, left, right)
+
+def _merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.priority > b.priority:
+        return _with_children(a, a.left, _merge(a.right, b))
+    return _with_children(b, _merge(a, b.left), b.right)
+
+def _split(node, offset):
+    """Split a tree into the text before offset and the text from offset on"""
+    if node is None:
+        return None, None
+    left_size = node.left.size if node.left else 0
+    if offset <= left_size:
+        a, b = _split(node.left, offset)
+        return a, _with_children(node, b, node.right)
+    offset -= left_size
+    if offset >= node.length:
+        a, b = _split(node.right, offset - node.length)
+        return _with_children(node, node.left, a), b
+    head = _new_piece(node.source, node.start, offset)
+    tail = _new_piece(node.source, node.start + offset, node.length - offset)
+    return _merge(node.left, head), _merge(tail, node.right)
+
+def _collect(node, start, end, base, out):
+    """Append the text in [start, end) of the subtree at base offset to out"""
+    while node is not None:
+        left_size = node.left.size if node.left else 0
+        node_start = base + left_size
+        node_end = node_start + node.length
+        if start < node_start:
+            _collect(node.left, start, end, base, out)
+        if start < node_end and end > node_start:
+            a = max(start, node_start) - node_start + node.start
+            b = min(end, node_end) - node_start + node.start
+            out.append(node.source.text[a:b])
+        if end <= node_end:
+            return
+        base = node_end
+        node = node.right
+
+class PieceTable:
+    """Text buffer for the editor: a balanced tree of pieces with an undo log
+    
+    Edits split and join pieces of immutable source strings in O(log n) instead
+    of rebuilding lines, and every node tracks the newlines below it so lines
+    are found by offset or number in O(log n) too. Edits are recorded as
+    (offset, removed, inserted) operations; runs of typing or deleting are
+    coalesced into one undo entry until close_undo_entry() is called.
+    """
+    
+    MAX_UNDO = 1000
+    # Typing extends the last inserted piece up to this size instead of adding one per key
+    MAX_TYPING_RUN = 256
+    
+    def __init__(self, text=''):
+        self.root = _new_piece(_Source(text), 0, len(text)) if text else None
+        self._undo = []
+        self._redo = []
+        self._coalesce = False
+        self._typing = None
+        self._text = text
+        # Called with the start and end offsets of the new text after every
+        # edit, including undo and redo
+        self.listeners = []
+        
+    def __len__(self):
+        return self.root.size if self.root else 0
+        
+    def line_count(self):
+        return (self.root.lines if self.root else 0) + 1
+        
+    def text(self):
+        """The whole buffer as a string, cached until the next edit"""
+        if self._text is None:
+            out = []
+            _collect(self.root, 0, len(self), 0, out)
+            self._text = ''.join(out)
+        return self._text
+        
+    def _newline_offset(self, k):
+        """Offset of the k-th newline (1-based)"""
+        node = self.root
+        base = 0
+        while node is not None:
+            left_lines = node.left.lines if node.left else 0
+            if k <= left_lines:
+                node = node.left
+                continue
+            k -= left_lines
+            left_size = node.left.size if node.left else 0
+            if k <= node.newlines:
+                nl = node.source.newlines
+                i = bisect_left(nl, node.start) + k - 1
+                return base + left_size + nl[i] - node.start
+            k -= node.newlines
+            base += left_size + node.length
+            node = node.right
+        raise IndexError('newline out of range')
+        
+    def _line_bounds(self, index):
+        if not 0 <= index < self.line_count():
+            raise IndexError('line index out of range')
+        start = self._newline_offset(index) + 1 if index else 0
+        end = self._newline_offset(index + 1) if index + 1 < self.line_count() else len(self)
+        return start, end
+        
+    def line(self, index):
+        start, end = self._line_bounds(index)
+        out = []
+        _collect(self.root, start, end, 0, out)
+        return ''.join(out)
+        
+    def offset(self, line, col):
+        start, end = self._line_bounds(line)
+        return start + min(col, end - start)
+        
+    def position(self, offset):
+        """Convert a character offset to (line, col)"""
+        node = self.root
+        line = 0
+        remaining = offset
+        while node is not None:
+            left_size = node.left.size if node.left else 0
+            if remaining < left_size:
+                node = node.left
+                continue
+            left_lines = node.left.lines if node.left else 0
+            remaining -= left_size
+            if remaining <= node.length:
+                nl = node.source.newlines
+                line += left_lines + bisect_left(nl, node.start + remaining) - bisect_left(nl, node.start)
+                break
+            line += left_lines + node.newlines
+            remaining -= node.length
+            node = node.right
+        start = self._newline_offset(line) + 1 if line else 0
+        return line, offset - start
+        
+    def insert(self, line, col, text):
+        """Insert text at a line and column; returns the position after it"""
+        offset = self.offset(line, col)
+        self.replace(offset, 0, text)
+        return self.position(offset + len(text))
+        
+    def delete(self, line, col, count=1):
+        """Delete count characters (newlines included) from a position; returns them"""
+        return self.replace(self.offset(line, col), count, '')
+        
+    def replace(self, offset, length, text):
+        """Replace length characters at offset with text, recording it for undo"""
+        length = max(0, min(length, len(self) - offset))
+        removed = ''
+        if length:
+            out = []
+            _collect(self.root, offset, offset + length, 0, out)
+            removed = ''.join(out)
+        if not removed and not text:
+            return ''
+        self._edit(offset, length, text)
+        self._record(offset, removed, text)
+        self._redo.clear()
+        return removed
+        
+    def _edit(self, offset, length, text):
+        end = offset + len(text)
+        left, right = _split(self.root, offset)
+        if length:
+            right = _split(right, length)[1]
+        typing = self._typing
+        self._typing = None
+        if text:
+            start = offset
+            if not length and typing and typing[0] == offset and len(typing[1]) < self.MAX_TYPING_RUN:
+                # Replace the piece typed just before this point with one extended by text
+                start = offset - len(typing[1])
+                left = _split(left, start)[0]
+                text = typing[1] + text
+            left = _merge(left, _new_piece(_Source(text), 0, len(text)))
+            self._typing = (start + len(text), text)
+        self.root = _merge(left, right)
+        self._text = None
+        for listener in self.listeners:
+            listener(offset, end)
+        
+    def _record(self, offset, removed, inserted):
+        entry = self._undo[-1] if self._coalesce and self._undo else None
+        if entry is not None and '\n' not in removed + inserted:
+            last_offset, last_removed, last_inserted = entry[-1]
+            if not removed and not last_removed and '\n' not in last_inserted and last_offset + len(last_inserted) == offset:
+                entry[-1] = (last_offset, '', last_inserted + inserted)
+                return
+            if not inserted and not last_inserted and '\n' not in last_removed:
+                if offset + len(removed) == last_offset:  # Backspace
+                    entry[-1] = (offset, removed + last_removed, '')
+                    return
+                if offset == last_offset:  # Delete
+                    entry[-1] = (offset, last_removed + removed, '')
+                    return
+        self._undo.append([(offset, removed, inserted)])
+        if len(self._undo) > self.MAX_UNDO:
+            del self._undo[0]
+        self._coalesce = True
+        
+    def close_undo_entry(self):
+        """Start a new undo entry for the next edit, e.g. after the cursor moves"""
+        self._coalesce = False
+        
+    def undo(self):
+        """Revert the last undo entry; returns the cursor position for it, or None"""
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        for offset, removed, inserted in reversed(entry):
+            self._edit(offset, len(inserted), removed)
+        self._redo.append(entry)
+        self._coalesce = False
+        offset, removed, inserted = entry[0]
+        return self.position(offset + len(removed))
+        
+    def redo(self):
+        """Reapply the last undone entry; returns the cursor position for it, or None"""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        for offset, removed, inserted in entry:
+            self._edit(offset, len(removed), inserted)
+        self._undo.append(entry)
+        self._coalesce = False
+        offset, removed, inserted = entry[-1]
+        return self.position(offset + len(inserted))
+
+# Color pairs used by the editor for each kind of token
+PAIR_TEXT = 1
+PAIR_KEYWORD = 2
+PAIR_NUMBER = 3
+PAIR_STRING = 4
+PAIR_COMMENT = 4
+PAIR_CURSOR = 6
+
+KEYWORDS = frozenset(['def', 'class', 'if', 'else', 'elif', 'for', 'while', 'return', 'import', 'from', 'pass'])
+
+_TOKEN_RE = re.compile(r"""
+    (?P<comment>\#.*)
+  | (?P<triple>\"\"\"|\'\'\')
+  | (?P<string>"[^"]*"?|'[^']*'?)
+  | (?P<word>[^\W\d]\w*)
+  | (?P<number>\d[\d.]*)
+""", re.VERBOSE)
+
+def lex_line(line, state=None):
+    """Split a line into (start, end, pair) runs covering all of it
+    
+    state is the triple quote of a string left open by the previous lines, or
+    None; the state at the end of this line is returned with the runs.
+    """
+    runs = []
+    
+    def add(start, end, pair):
+        if runs and runs[-1][2] == pair and runs[-1][1] == start:
+            runs[-1] = (runs[-1][0], end, pair)
+        else:
+            runs.append((start, end, pair))
+    
+    pos = 0
+    if state:
+        close = line.find(state)
+        if close < 0:
+            return ([(0, len(line), PAIR_STRING)] if line else []), state
+        pos = close + 3
+        add(0, pos, PAIR_STRING)
+        
+    while True:
+        match = _TOKEN_RE.search(line, pos)
+        if not match:
+            break
+        start, end = match.span()
+        kind = match.lastgroup
+        if kind == 'triple':
+            close = line.find(match.group(), end)
+            if close < 0:
+                add(pos, start, PAIR_TEXT)
+                add(start, len(line), PAIR_STRING)
+                return runs, match.group()
+            end = close + 3
+            pair = PAIR_STRING
+        elif kind == 'word':
+            pair = PAIR_KEYWORD if match.group() in KEYWORDS else PAIR_TEXT
+        else:
+            pair = {'comment': PAIR_COMMENT, 'string': PAIR_STRING, 'number': PAIR_NUMBER}[kind]
+        add(pos, start, PAIR_TEXT)
+        add(start, end, pair)
+        pos = end
+        
+    add(pos, len(line), PAIR_TEXT)
+    return [run for run in runs if run[0] < run[1]], None
+
+class SyntaxHighlighter:
+    """Caches highlight runs per line, keyed by line content and lexer state
+    
+    The lexer state entering each line (an open triple-quoted string or not)
+    is kept for the lines lexed so far. An edit only drops the states after
+    the edited line, and lines whose content and entry state are unchanged
+    are answered from the cache without lexing.
+    """
+    
+    CACHE_SIZE = 4096
+    
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.states = [None]
+        self.cache = {}
+        buffer.listeners.append(self.invalidate)
+        
+    def invalidate(self, offset, end=None):
+        line = self.buffer.position(offset)[0]
+        del self.states[line + 1:]
+        
+    def lex(self, line, state):
+        key = (line, state)
+        result = self.cache.get(key)
+        if result is None:
+            if len(self.cache) >= self.CACHE_SIZE:
+                self.cache.clear()
+            result = self.cache[key] = lex_line(line, state)
+        return result
+        
+    def _extend_states(self, index):
+        """Find entry states up to a line, lexing only lines with triple quotes"""
+        states = self.states
+        first = len(states) - 1
+        # Jumping far ahead: one split of the cached text beats a lookup per line
+        lines = self.buffer.text().split('\n') if index - first > 256 else None
+        state = states[first]
+        for i in range(first, index):
+            line = lines[i] if lines else self.buffer.line(i)
+            if '"""' in line or "'''" in line:
+                state = lex_line(line, state)[1]
+            states.append(state)
+        
+    def line_runs(self, index):
+        """Return the text of a line and its (start, end, pair) runs"""
+        states = self.states
+        if len(states) <= index:
+            self._extend_states(index)
+        line = self.buffer.line(index)
+        return line, self.lex(line, states[index])[0]
+
+# Terminals wrap pasted text in these when bracketed paste mode is enabled
+PASTE_START = tuple(b'\x1b[200~')
+PASTE_END = tuple(b'\x1b[201~')
+
+def decode_paste(keys):
+    text = bytes(key for key in keys if 0 <= key < 256).decode('utf-8', 'replace')
+    return text.replace('\r\n', '\n').replace('\r', '\n').expandtabs(4)
+
+def _find_paste_end(keys, start):
+    try:
+        i = keys.index(27, start)
+        while tuple(keys[i:i + 6]) != PASTE_END:
+            i = keys.index(27, i + 1)
+        return i
+    except ValueError:
+        return -1
+
+def parse_keys(keys, final=False):
+    """Group drained key codes into events, each bracketed paste becoming one str
+    
+    Returns None if the keys stop inside a paste or its start marker and more
+    input should be read first, unless final is set. A lone ESC at the end is
+    a key press (it quits), not the start of a marker: only ESC [ waits.
+    """
+    events = []
+    i = 0
+    while i < len(keys):
+        if keys[i] == 27:
+            head = tuple(keys[i:i + 6])
+            if head == PASTE_START:
+                end = _find_paste_end(keys, i + 6)
+                if end < 0:
+                    if not final:
+                        return None
+                    end = len(keys)
+                events.append(decode_paste(keys[i + 6:end]))
+                i = end + 6
+                continue
+            if not final and 2 <= len(head) < 6 and PASTE_START[:len(head)] == head:
+                return None
+        events.append(keys[i])
+        i += 1
+    return events
+
+# How long to wait for the rest of a paste cut off by a read
+PASTE_WAIT = 0.05
+
+def collect_events(drain, wait=PASTE_WAIT):
+    """Read pending keys with drain(wait) and group them with parse_keys()
+    
+    drain(seconds) returns the keys available, waiting up to that long for
+    the first. More input is only waited for while a paste is incomplete.
+    """
+    keys = drain(0)
+    events = parse_keys(keys)
+    while events is None:
+        # The rest of a paste is still on its way
+        more = drain(wait)
+        keys.extend(more)
+        events = parse_keys(keys, final=not more)
+    return events
+
+class LineDamage:
+    """Buffer lines changed since the editor last painted them
+    
+    An edit that keeps the line count damages only the lines it touched; one
+    that adds or removes lines damages everything from its first line down,
+    since the lines below moved.
+    """
+    
+    def __init__(self, line_count):
+        self.line_count = line_count
+        self.lines = set()
+        self.from_line = None  # Every line from here down
+        
+    def mark(self, first, last, line_count):
+        """Record an edit of lines first..last that left line_count lines"""
+        if line_count != self.line_count:
+            self.line_count = line_count
+            if self.from_line is None or first < self.from_line:
+                self.from_line = first
+        else:
+            self.lines.update(range(first, last + 1))
+            
+    def rows(self, scroll_y, height, extra_lines=()):
+        """Sorted window rows showing damaged lines (or extra_lines) when scrolled to scroll_y"""
+        lines = set(self.lines)
+        lines.update(extra_lines)
+        if self.from_line is not None:
+            lines.update(range(max(self.from_line, scroll_y), scroll_y + height))
+        return sorted(line - scroll_y for line in lines if 0 <= line - scroll_y < height)
+        
+    def clear(self):
+        self.lines.clear()
+        self.from_line = None
 
 class CodeEditor:
     def __init__(self, stdscr, y, x, height, width):
@@ -22,20 +508,24 @@ class CodeEditor:
         self.x = x
         self.height = height
         self.width = width
-        self.lines = ["# ASCII Engine Sketch", "# Define your setup() and draw() functions", "", "def setup():", "    pass", "", "def draw():", "    # Your animation code here", "    pass"]
+        self.buffer = PieceTable('\n'.join(["# ASCII Engine Sketch", "# Define your setup() and draw() functions", "", "def setup():", "    pass", "", "def draw():", "    # Your animation code here", "    pass"]))
         self.cursor_y = 8
         self.cursor_x = 4
         self.scroll_y = 0
         self.current_file = None
-        self.cursor_blink_counter = 0
         
         # Create a window for the editor
         self.win = curses.newwin(height, width, y, x)
         self.win.keypad(True)
         
-        # Buffer tracking for efficient updates
+        # Damage tracking: only buffer lines that changed since the last paint
+        # are repainted; needs_redraw repaints the whole window
         self.needs_redraw = True
-        self.last_cursor_pos = (0, 0)
+        self.painted_scroll = None
+        self.painted_cursor = None
+        self.painted_cursor_visible = None
+        self.blink_start = time.monotonic()
+        self.watch_buffer()
         
         # Initialize colors
         curses.init_pair(1, curses.COLOR_WHITE, curses.COLOR_BLACK)
@@ -45,153 +535,163 @@ class CodeEditor:
         curses.init_pair(5, curses.COLOR_RED, curses.COLOR_BLACK)
         curses.init_pair(6, curses.COLOR_BLACK, curses.COLOR_WHITE)  # For cursor
         
-    def draw_editor(self):
-        # Update cursor blink counter
-        self.cursor_blink_counter = (self.cursor_blink_counter + 1) % 10
-        cursor_visible = self.cursor_blink_counter < 7  # Visible for 7/10 frames
+    def resize(self, y, x, height, width):
+        """Move the editor to a new area of the screen after a terminal resize"""
+        self.y = y
+        self.x = x
+        self.height = height
+        self.width = width
+        self.win = curses.newwin(height, width, y, x)
+        self.win.keypad(True)
+        self.needs_redraw = True
+        self.adjust_scroll()
         
-        # Only redraw if needed or for cursor blinking
-        current_cursor_pos = (self.cursor_y, self.cursor_x)
-        if not self.needs_redraw and current_cursor_pos == self.last_cursor_pos and cursor_visible:
-            return
+    def watch_buffer(self):
+        """Track damage and highlighting for the current buffer"""
+        self.highlighter = SyntaxHighlighter(self.buffer)
+        self.damage = LineDamage(self.buffer.line_count())
+        self.buffer.listeners.append(self.damage_text)
+        self.needs_redraw = True
+        
+    def damage_text(self, offset, end):
+        first = self.buffer.position(offset)[0]
+        line_count = self.buffer.line_count()
+        # When lines moved, everything from first down is damaged anyway
+        last = first if line_count != self.damage.line_count else self.buffer.position(end)[0]
+        self.damage.mark(first, last, line_count)
             
+    def cursor_visible(self, now=None):
+        """Blink phase: visible for 0.7s, hidden for 0.3s, restarting on each key"""
+        now = time.monotonic() if now is None else now
+        return (now - self.blink_start) % 1.0 < 0.7
+        
+    def next_blink(self, now):
+        """Time at which the cursor next shows or hides"""
+        phase = (now - self.blink_start) % 1.0
+        return now + (0.7 - phase if phase < 0.7 else 1.0 - phase)
+        
+    def draw_editor(self):
+        cursor_visible = self.cursor_visible()
+        cursor = (self.cursor_y, self.cursor_x)
+        visible_height = self.height - 2
+        
         try:
-            self.win.erase()
-            self.win.border()
-            
-            # Title
-            title = f" Code Editor {f'- {self.current_file}' if self.current_file else ''} "
-            self.win.addstr(0, 2, title, curses.color_pair(2))
-            
-            # Line numbers and content
-            visible_height = self.height - 2
-            for i in range(visible_height):
-                line_idx = self.scroll_y + i
-                if line_idx >= len(self.lines):
-                    break
-                    
-                y_pos = i + 1
+            if self.needs_redraw:
+                self.win.erase()
+                self.win.border()
                 
-                # Line number
-                line_num = f"{line_idx + 1:3d} "
-                self.win.addstr(y_pos, 1, line_num, curses.color_pair(3))
+                # Title
+                title = f" Code Editor {f'- {self.current_file}' if self.current_file else ''} "
+                self.win.addstr(0, 2, title, curses.color_pair(2))
                 
-                # Line content with basic syntax highlighting
-                line = self.lines[line_idx]
-                if len(line) > self.width - 6:
-                    line = line[:self.width - 9] + "..."
-                    
-                self.highlight_syntax(y_pos, 5, line, line_idx == self.cursor_y, cursor_visible)
+            if self.needs_redraw or self.scroll_y != self.painted_scroll:
+                rows = range(visible_height)
+            else:
+                # Unpaint the old cursor, paint the new one
+                moved = (self.painted_cursor[0], self.cursor_y) if cursor != self.painted_cursor else ()
+                rows = self.damage.rows(self.scroll_y, visible_height, moved)
+                
+            for row in rows:
+                self.paint_line(row + 1, self.scroll_y + row, cursor_visible)
+                
+            if cursor_visible != self.painted_cursor_visible and self.cursor_y - self.scroll_y not in rows:
+                # Blinking only touches the cursor cell
+                self.paint_cursor(cursor_visible)
+            elif not rows:
+                return
                 
             self.win.noutrefresh()  # Use noutrefresh for better performance
             self.needs_redraw = False
-            self.last_cursor_pos = current_cursor_pos
+            self.damage.clear()
+            self.painted_scroll = self.scroll_y
+            self.painted_cursor = cursor
+            self.painted_cursor_visible = cursor_visible
             
         except curses.error:
             pass  # Ignore curses errors
+            
+    def paint_line(self, y, line_idx, cursor_visible):
+        """Repaint one editor row completely, including its line number"""
+        if line_idx >= self.buffer.line_count():
+            self.win.addnstr(y, 1, ' ' * (self.width - 2), self.width - 2)
+            return
+        # Line number
+        line_num = f"{line_idx + 1:3d} "
+        self.win.addstr(y, 1, line_num, curses.color_pair(3))
         
-    def highlight_syntax(self, y, x, line, is_cursor_line=False, cursor_visible=True):
-        """Basic Python syntax highlighting with cursor support"""
-        keywords = ['def', 'class', 'if', 'else', 'elif', 'for', 'while', 'return', 'import', 'from', 'pass']
-        
-        i = 0
-        cursor_drawn = False
+        # Line content with basic syntax highlighting
+        self.highlight_syntax(y, 5, line_idx, line_idx == self.cursor_y, cursor_visible)
         
-        while i < len(line) and x + i < self.width - 2:
-            char = line[i]
-            color = curses.color_pair(1)  # Default white
-            
-            # Check if this is the cursor position
-            is_cursor_pos = is_cursor_line and i == self.cursor_x and cursor_visible
+    def highlight_syntax(self, y, x, line_idx, is_cursor_line=False, cursor_visible=True):
+        """Paint a line with one addnstr per highlighted run, plus the cursor cell"""
+        line, runs = self.highlighter.line_runs(line_idx)
+        visible = self.width - 2 - x
+        limit = len(line)
+        if limit > visible:
+            limit = visible - 3  # Leave room for the ellipsis
             
-            # Comments
-            if char == '#':
-                remaining = line[i:]
-                for j, ch in enumerate(remaining):
-                    if x + i + j >= self.width - 2:
-                        break
-                    ch_color = curses.color_pair(6) if (is_cursor_line and i + j == self.cursor_x and cursor_visible) else curses.color_pair(4)
-                    self.win.addstr(y, x + i + j, ch, ch_color)
+        for start, end, pair in runs:
+            if start >= limit:
                 break
-                
-            # Strings
-            elif char in ['"', "'"]:
-                quote = char
-                string_start = i
-                i += 1
-                while i < len(line) and line[i] != quote:
-                    i += 1
-                if i < len(line):
-                    i += 1
-                string_content = line[string_start:i]
-                for j, ch in enumerate(string_content):
-                    if x + string_start + j >= self.width - 2:
-                        break
-                    ch_color = curses.color_pair(6) if (is_cursor_line and string_start + j == self.cursor_x and cursor_visible) else curses.color_pair(4)
-                    self.win.addstr(y, x + string_start + j, ch, ch_color)
-                continue
-                
-            # Keywords
-            elif char.isalpha() or char == '_':
-                word_start = i
-                while i < len(line) and (line[i].isalnum() or line[i] == '_'):
-                    i += 1
-                word = line[word_start:i]
-                if word in keywords:
-                    base_color = curses.color_pair(2)
-                else:
-                    base_color = curses.color_pair(1)
-                    
-                for j, ch in enumerate(word):
-                    if x + word_start + j >= self.width - 2:
-                        break
-                    ch_color = curses.color_pair(6) if (is_cursor_line and word_start + j == self.cursor_x and cursor_visible) else base_color
-                    self.win.addstr(y, x + word_start + j, ch, ch_color)
-                continue
-                
-            # Numbers
-            elif char.isdigit():
-                num_start = i
-                while i < len(line) and (line[i].isdigit() or line[i] == '.'):
-                    i += 1
-                number = line[num_start:i]
-                for j, ch in enumerate(number):
-                    if x + num_start + j >= self.width - 2:
-                        break
-                    ch_color = curses.color_pair(6) if (is_cursor_line and num_start + j == self.cursor_x and cursor_visible) else curses.color_pair(3)
-                    self.win.addstr(y, x + num_start + j, ch, ch_color)
-                continue
-                
-            # Regular characters
-            else:
-                if x + i < self.width - 2:
-                    char_color = curses.color_pair(6) if is_cursor_pos else color
-                    self.win.addstr(y, x + i, char, char_color)
-                i += 1
-                
-        # Draw cursor at end of line if that's where it is
-        if is_cursor_line and self.cursor_x >= len(line) and x + len(line) < self.width - 2 and cursor_visible:
-            self.win.addstr(y, x + len(line), ' ', curses.color_pair(6))
+            end = min(end, limit)
+            self.win.addnstr(y, x + start, line[start:end], end - start, curses.color_pair(pair))
+        if limit < len(line):
+            self.win.addnstr(y, x + limit, "...", visible - limit, curses.color_pair(PAIR_TEXT))
+        elif limit < visible:
+            # Blank out whatever the row held before
+            self.win.addnstr(y, x + limit, ' ' * (visible - limit), visible - limit)
+            
+        if is_cursor_line and cursor_visible:
+            self.paint_cursor(True)
+            
+    def paint_cursor(self, cursor_visible):
+        """Paint the cell under the cursor, inverted or with its normal color"""
+        row = self.cursor_y - self.scroll_y + 1
+        x = 5
+        visible = self.width - 2 - x
+        if not 0 < row < self.height - 1 or self.cursor_x >= visible:
+            return
+        line, runs = self.highlighter.line_runs(self.cursor_y)
+        limit = len(line) if len(line) <= visible else visible - 3
+        if self.cursor_x < limit:
+            char = line[self.cursor_x]
+            pair = next(run[2] for run in runs if run[0] <= self.cursor_x < run[1])
+        elif limit < len(line):
+            char, pair = '.', PAIR_TEXT  # Inside the ellipsis
+        else:
+            char, pair = ' ', 0
+        if cursor_visible:
+            pair = PAIR_CURSOR
+        self.win.addnstr(row, x + self.cursor_x, char, 1, curses.color_pair(pair))
                 
     def handle_key(self, key):
-        self.needs_redraw = True  # Mark that we need to redraw
+        # Keep the cursor solid while typing
+        self.blink_start = time.monotonic()
+        
+        if key in (curses.KEY_UP, curses.KEY_DOWN, curses.KEY_LEFT, curses.KEY_RIGHT, curses.KEY_HOME, curses.KEY_END):
+            # Typing after moving the cursor starts a new undo step
+            self.buffer.close_undo_entry()
         
         if key == curses.KEY_UP and self.cursor_y > 0:
             self.cursor_y -= 1
-            self.cursor_x = min(self.cursor_x, len(self.lines[self.cursor_y]))
+            self.cursor_x = min(self.cursor_x, len(self.buffer.line(self.cursor_y)))
             self.adjust_scroll()
-        elif key == curses.KEY_DOWN and self.cursor_y < len(self.lines) - 1:
+        elif key == curses.KEY_DOWN and self.cursor_y < self.buffer.line_count() - 1:
             self.cursor_y += 1
-            self.cursor_x = min(self.cursor_x, len(self.lines[self.cursor_y]))
+            self.cursor_x = min(self.cursor_x, len(self.buffer.line(self.cursor_y)))
             self.adjust_scroll()
         elif key == curses.KEY_LEFT and self.cursor_x > 0:
             self.cursor_x -= 1
-        elif key == curses.KEY_RIGHT and self.cursor_x < len(self.lines[self.cursor_y]):
+        elif key == curses.KEY_RIGHT and self.cursor_x < len(self.buffer.line(self.cursor_y)):
             self.cursor_x += 1
         elif key == curses.KEY_HOME:
             self.cursor_x = 0
         elif key == curses.KEY_END:
-            self.cursor_x = len(self.lines[self.cursor_y])
+            self.cursor_x = len(self.buffer.line(self.cursor_y))
+        elif key == 26:  # Ctrl+Z
+            self.undo()
+        elif key == 25:  # Ctrl+Y
+            self.redo()
         elif key == ord('\n') or key == curses.KEY_ENTER:
             self.insert_newline()
         elif key == curses.KEY_BACKSPACE or key == 127:
@@ -202,47 +702,49 @@ class CodeEditor:
             self.insert_char(chr(key))
             
     def insert_char(self, char):
-        line = self.lines[self.cursor_y]
-        self.lines[self.cursor_y] = line[:self.cursor_x] + char + line[self.cursor_x:]
+        self.buffer.insert(self.cursor_y, self.cursor_x, char)
         self.cursor_x += 1
         
     def insert_newline(self):
-        current_line = self.lines[self.cursor_y]
-        left_part = current_line[:self.cursor_x]
-        right_part = current_line[self.cursor_x:]
-        
-        self.lines[self.cursor_y] = left_part
-        self.lines.insert(self.cursor_y + 1, right_part)
-        
+        self.buffer.insert(self.cursor_y, self.cursor_x, '\n')
         self.cursor_y += 1
         self.cursor_x = 0
         self.adjust_scroll()
         
     def handle_backspace(self):
         if self.cursor_x > 0:
-            line = self.lines[self.cursor_y]
-            self.lines[self.cursor_y] = line[:self.cursor_x-1] + line[self.cursor_x:]
+            self.buffer.delete(self.cursor_y, self.cursor_x - 1)
             self.cursor_x -= 1
         elif self.cursor_y > 0:
             # Join with previous line
-            current_line = self.lines[self.cursor_y]
-            previous_line = self.lines[self.cursor_y - 1]
-            self.cursor_x = len(previous_line)
-            self.lines[self.cursor_y - 1] = previous_line + current_line
-            del self.lines[self.cursor_y]
+            self.cursor_x = len(self.buffer.line(self.cursor_y - 1))
+            self.buffer.delete(self.cursor_y - 1, self.cursor_x)
             self.cursor_y -= 1
             self.adjust_scroll()
             
     def handle_delete(self):
-        if self.cursor_x < len(self.lines[self.cursor_y]):
-            line = self.lines[self.cursor_y]
-            self.lines[self.cursor_y] = line[:self.cursor_x] + line[self.cursor_x+1:]
-        elif self.cursor_y < len(self.lines) - 1:
-            # Join with next line
-            current_line = self.lines[self.cursor_y]
-            next_line = self.lines[self.cursor_y + 1]
-            self.lines[self.cursor_y] = current_line + next_line
-            del self.lines[self.cursor_y + 1]
+        # Deleting past the end of a line joins it with the next one
+        self.buffer.delete(self.cursor_y, self.cursor_x)
+        
+    def insert_text(self, text):
+        """Insert a block of text, such as a paste, as one edit and one undo step"""
+        self.blink_start = time.monotonic()
+        self.buffer.close_undo_entry()
+        self.cursor_y, self.cursor_x = self.buffer.insert(self.cursor_y, self.cursor_x, text)
+        self.buffer.close_undo_entry()
+        self.adjust_scroll()
+        
+    def undo(self):
+        position = self.buffer.undo()
+        if position:
+            self.cursor_y, self.cursor_x = position
+            self.adjust_scroll()
+            
+    def redo(self):
+        position = self.buffer.redo()
+        if position:
+            self.cursor_y, self.cursor_x = position
+            self.adjust_scroll()
             
     def adjust_scroll(self):
         visible_height = self.height - 2
@@ -252,7 +754,7 @@ class CodeEditor:
             self.scroll_y = self.cursor_y - visible_height + 1
             
     def get_code(self):
-        return '\n'.join(self.lines)
+        return self.buffer.text()
         
     def save_file(self, filename):
         try:
@@ -267,7 +769,8 @@ class CodeEditor:
         try:
             with open(filename, 'r') as f:
                 content = f.read()
-            self.lines = content.split('\n')
+            self.buffer = PieceTable(content)
+            self.watch_buffer()
             self.cursor_y = 0
             self.cursor_x = 0
             self.scroll_y = 0
@@ -277,16 +780,23 @@ class CodeEditor:
             return False
 
 class LivePreview:
+    # The frame rate adapts to how long painting a frame takes
+    MIN_FPS = 5
+    MAX_FPS = 30
+    # Share of the IDE's time that painting frames may use
+    PAINT_BUDGET = 0.25
+    
     def __init__(self, stdscr, y, x, height, width):
         self.stdscr = stdscr
         self.y = y
         self.x = x
         self.height = height
         self.width = width
-        self.canvas = None
+        self.sketch = None
         self.running = False
         self.error_message = None
-        self.fps = 5  # Reduce FPS to reduce flickering
+        self.fps = self.MIN_FPS  # Start low, adapt_fps() raises it if painting is cheap
+        self.paint_cost = None
         self.frame_count = 0
         
         # Create window for preview
@@ -296,77 +806,114 @@ class LivePreview:
         self.canvas_height = height - 3
         self.canvas_width = width - 2
         
-        # Buffer for current display content
-        self.display_buffer = []
+        # Row hashes as last painted, so unchanged rows are skipped on refresh
+        self.row_diff = RowDiff()
+        self.stats = self.row_diff.stats
+        self.painted_mode = None
+        self.style_map = CursesStyleMap(STYLES)
+        self.needs_redraw = True
+        
+    def resize(self, y, x, height, width):
+        """Move the preview after a terminal resize; a running sketch is resized, not restarted"""
+        self.y = y
+        self.x = x
+        self.height = height
+        self.width = width
+        self.win = curses.newwin(height, width, y, x)
+        self.canvas_height = height - 3
+        self.canvas_width = width - 2
+        if self.sketch:
+            self.sketch.resize(self.canvas_height, self.canvas_width)
+        self.painted_mode = None
         self.needs_redraw = True
         
     def start_preview(self, code):
+        self.stop_preview()
         self.running = True
         self.error_message = None
+        self.frame_count = 0
         
-        # Create canvas
-        self.canvas = Canvas(self.canvas_height, self.canvas_width)
+        # The sketch runs in its own process and renders into shared memory;
+        # multiprocessing is only imported the first time a sketch starts
+        self.sketch = ascii_engine.SketchProcess(self.canvas_height, self.canvas_width, fps=self.fps)
+        self.sketch.start(code)
+        # Style maps share one set of color pairs, so this can't redefine pairs in use
+        self.style_map = CursesStyleMap(self.sketch.styles)
+        self.painted_mode = None
+        self.needs_redraw = True
         
-        # Execute code in thread
-        self.preview_thread = threading.Thread(target=self._run_preview, args=(code,))
-        self.preview_thread.daemon = True
-        self.preview_thread.start()
+    def reload_preview(self, code):
+        """Hot-swap edited code into the running sketch, starting it if needed"""
+        if self.sketch and self.sketch.is_running():
+            self.sketch.reload(code)
+            self.needs_redraw = True
+        else:
+            self.start_preview(code)
         
     def stop_preview(self):
         self.running = False
-        
-    def _run_preview(self, code):
-        try:
-            # Create execution namespace
-            namespace = {
-                'canvas': self.canvas,
-                'Canvas': Canvas,
-                'COLORS': COLORS,
-                'randint': __import__('random').randint,
-                'math': __import__('math'),
-                'time': __import__('time')
-            }
-            
-            # Execute user code
-            exec(code, namespace)
+        if self.sketch:
+            self.sketch.stop()
             
-            # Get setup and draw functions
-            setup_func = namespace.get('setup')
-            draw_func = namespace.get('draw')
+    def wakeup_fd(self):
+        """File descriptor that becomes readable when the sketch has news, or None"""
+        if self.sketch and not self.sketch.stopped and not self.sketch.exited and self.sketch.process:
+            return self.sketch.fileno()
+        return None
+        
+    def adapt_fps(self, paint_seconds):
+        """Pick a frame rate that keeps frame painting within PAINT_BUDGET"""
+        if self.paint_cost is None:
+            self.paint_cost = paint_seconds
+        else:
+            self.paint_cost = 0.8 * self.paint_cost + 0.2 * paint_seconds
+        fps = int(self.PAINT_BUDGET / max(self.paint_cost, 1e-4))
+        fps = max(self.MIN_FPS, min(self.MAX_FPS, fps))
+        # Only tell the sketch about real changes, not jitter
+        if abs(fps - self.fps) >= max(2, self.fps // 5) and self.sketch:
+            self.fps = fps
+            self.sketch.set_fps(fps)
             
-            # Run setup once
-            if setup_func and callable(setup_func):
-                setup_func()
-                
-            # Animation loop
-            while self.running:
-                if draw_func and callable(draw_func):
-                    self.canvas.clear()
-                    draw_func()
-                    self.frame_count += 1
-                    self.needs_redraw = True
-                    
-                time.sleep(1.0 / self.fps)
-                
-        except Exception as e:
-            self.error_message = f"Error: {str(e)}\n{traceback.format_exc()}"
+    def poll_sketch(self):
+        """Pick up frames and errors the sketch process has sent"""
+        if not self.sketch:
+            return
+        if self.sketch.poll():
+            self.frame_count = self.sketch.frame.number
+            self.needs_redraw = True
+        # Errors clear again once a reload fixes them
+        if self.sketch.error_message != self.error_message:
+            self.error_message = self.sketch.error_message
             self.needs_redraw = True
             
     def draw_preview(self):
+        self.poll_sketch()
+        
         # Only redraw if needed
         if not self.needs_redraw:
             return
             
         try:
-            # Clear and redraw border
-            self.win.erase()
+            if self.error_message:
+                mode = 'error'
+            elif self.sketch:
+                mode = 'canvas'
+            else:
+                mode = 'idle'
+                
+            # Canvas rows overwrite themselves; only erase when switching what is shown
+            if mode != 'canvas' or mode != self.painted_mode:
+                self.win.erase()
+                self.row_diff.reset()
+            self.painted_mode = mode
+            
             self.win.border()
             
             # Title
             title = f" Live Preview ({self.frame_count}) "
             self.win.addstr(0, 2, title, curses.color_pair(2))
             
-            if self.error_message:
+            if mode == 'error':
                 # Show error message
                 lines = self.error_message.split('\n')
                 for i, line in enumerate(lines[:self.height - 3]):
@@ -376,19 +923,13 @@ class LivePreview:
                         self.win.addstr(i + 1, 1, line, curses.color_pair(5))
                     except:
                         pass
-            elif self.canvas:
-                # Render canvas content efficiently
+            elif mode == 'canvas':
+                started = time.perf_counter()
                 try:
-                    for row in range(min(self.canvas_height, self.canvas.rows)):
-                        canvas_line = ''.join(self.canvas.canvas[row])
-                        # Strip ANSI codes for curses display
-                        display_line = self._strip_ansi(canvas_line)
-                        if len(display_line) > self.canvas_width:
-                            display_line = display_line[:self.canvas_width]
-                        if display_line.strip():  # Only draw non-empty lines
-                            self.win.addstr(row + 1, 1, display_line)
+                    self._paint_canvas()
                 except curses.error:
                     pass  # Ignore cursor positioning errors
+                self.adapt_fps(time.perf_counter() - started)
             else:
                 # Show waiting message
                 msg = "Press F5 to run code"
@@ -401,11 +942,17 @@ class LivePreview:
         except curses.error:
             pass  # Ignore any curses errors
         
-    def _strip_ansi(self, text):
-        """Remove ANSI escape codes for curses display"""
-        import re
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        return ansi_escape.sub('', text)
+    def _paint_canvas(self):
+        """Paint changed rows of the latest complete frame, one addnstr per style run"""
+        frame = self.sketch.frame
+        rows = min(self.canvas_height, frame.rows)
+        width = min(self.canvas_width, frame.cols)
+        attr_for = self.style_map.attr
+        
+        for row in self.row_diff.changed(frame.hashes[:rows]):
+            chars = frame.chars[row][:width]
+            styles = frame.styles[row][:width]
+            paint_row(self.win, row + 1, 1, chars, styles, attr_for)
 
 class ASCIIEngineIDE:
     def __init__(self, stdscr):
@@ -417,24 +964,49 @@ class ASCIIEngineIDE:
         curses.start_color()
         curses.use_default_colors()
         stdscr.keypad(True)
+        # ESC quits; don't let curses hold it for a second looking for an escape sequence
+        if 'ESCDELAY' not in os.environ and hasattr(curses, 'set_escdelay'):
+            curses.set_escdelay(25)
         stdscr.timeout(100)
+        # Raw mode so Ctrl+Z, Ctrl+S and Ctrl+Q reach the IDE instead of the tty
+        curses.raw()
         
         # Calculate split layout
-        editor_width = int(self.width * 0.6)
-        preview_width = self.width - editor_width
+        editor_width, preview_width = self.layout()
         
         # Create components
         self.editor = CodeEditor(stdscr, 0, 0, self.height - 2, editor_width)
         self.preview = LivePreview(stdscr, 0, editor_width, self.height - 2, preview_width)
         
-        # Status bar
-        self.status_y = self.height - 2
+        # Set by the SIGWINCH handler, picked up by the main loop
+        self.resize_pending = False
         
         self.running = True
         
+    def layout(self):
+        """Split the screen between editor and preview; returns their widths"""
+        # Keep windows valid on absurdly small terminals
+        self.height = max(self.height, 6)
+        self.width = max(self.width, 20)
+        self.status_y = self.height - 2
+        editor_width = int(self.width * 0.6)
+        return editor_width, self.width - editor_width
+        
+    def handle_resize(self):
+        """Re-lay out the windows for the terminal's new size"""
+        self.resize_pending = False
+        size = os.get_terminal_size(sys.stdout.fileno())
+        curses.resizeterm(size.lines, size.columns)
+        self.height, self.width = self.stdscr.getmaxyx()
+        editor_width, preview_width = self.layout()
+        self.editor.resize(0, 0, self.height - 2, editor_width)
+        self.preview.resize(0, editor_width, self.height - 2, preview_width)
+        self.stdscr.clear()
+        self.stdscr.noutrefresh()
+        
     def draw_status_bar(self):
         try:
-            status_line = " F5: Run | Ctrl+S: Save | Ctrl+O: Open | Ctrl+Q: Quit "
+            status_line = " F5: Run | Ctrl+R: Restart | Ctrl+Z/Y: Undo/Redo | Ctrl+S: Save | Ctrl+O: Open | Ctrl+Q: Quit "
             self.stdscr.addstr(self.status_y, 0, status_line.ljust(self.width), curses.color_pair(2))
             self.stdscr.addstr(self.status_y + 1, 0, f" Cursor: {self.editor.cursor_y+1}:{self.editor.cursor_x+1} ".ljust(self.width))
             self.stdscr.noutrefresh()  # Use noutrefresh for better performance
@@ -443,21 +1015,21 @@ class ASCIIEngineIDE:
         
     def handle_shortcuts(self, key):
         if key == 5:  # Ctrl+E (run code)
-            code = self.editor.get_code()
-            self.preview.stop_preview()
-            self.preview.start_preview(code)
+            self.preview.reload_preview(self.editor.get_code())
+        elif key == 18:  # Ctrl+R (full restart)
+            self.preview.start_preview(self.editor.get_code())
         elif key == 19:  # Ctrl+S (save)
             self.save_dialog()
         elif key == 15:  # Ctrl+O (open)
             self.open_dialog()
         elif key == 17:  # Ctrl+Q (quit)
             self.running = False
+        elif key == 3:  # Ctrl+C (quit)
+            self.running = False
         elif key == 27:  # ESC (quit)
             self.running = False
         elif key == curses.KEY_F5:  # F5 (run)
-            code = self.editor.get_code()
-            self.preview.stop_preview()
-            self.preview.start_preview(code)
+            self.preview.reload_preview(self.editor.get_code())
             
     def save_dialog(self):
         # Simple save - in a full implementation this would show a file dialog
@@ -473,32 +1045,47 @@ class ASCIIEngineIDE:
     def run(self):
         # Initialize curses settings for better performance
         curses.curs_set(1)
-        self.stdscr.nodelay(1)  # Non-blocking input
-        self.stdscr.timeout(50)  # 50ms timeout for getch
+        self.stdscr.nodelay(1)  # Non-blocking input; select() does the waiting
+        self.stdscr.timeout(0)
+        stdin = sys.stdin.fileno()
         
-        last_update = time.time()
+        # SIGWINCH wakes select() through a pipe so resizes are handled at once
+        wakeup_read, wakeup_write = os.pipe()
+        os.set_blocking(wakeup_read, False)
+        os.set_blocking(wakeup_write, False)
+        old_wakeup = signal.set_wakeup_fd(wakeup_write)
+        old_handler = signal.signal(signal.SIGWINCH, self.on_sigwinch)
+        
+        # Bracketed paste, so pastes arrive as one block instead of keystrokes
+        sys.stdout.write('\x1b[?2004h')
+        sys.stdout.flush()
+        self.update_display()
         
         while self.running:
             try:
-                current_time = time.time()
-                
-                # Handle input
-                key = self.stdscr.getch()
+                # Sleep until a key, a frame from the sketch or the next cursor blink
+                now = time.monotonic()
+                timeout = max(0.0, self.editor.next_blink(now) - now)
+                fds = [stdin, wakeup_read]
+                sketch_fd = self.preview.wakeup_fd()
+                if sketch_fd is not None:
+                    fds.append(sketch_fd)
+                readable = select.select(fds, [], [], timeout)[0]
+                if wakeup_read in readable:
+                    os.read(wakeup_read, 512)
+                if self.resize_pending:
+                    self.handle_resize()
                 
-                if key == -1:  # No key pressed
-                    # Update display periodically for cursor blinking
-                    if current_time - last_update > 0.1:  # 100ms
-                        self.editor.needs_redraw = True  # Force redraw for cursor blink
-                        self.update_display()
-                        last_update = current_time
-                elif key in [5, 19, 15, 17, 27, curses.KEY_F5]:  # Shortcuts
-                    self.handle_shortcuts(key)
-                    self.update_display()
-                    last_update = current_time
-                else:
-                    self.editor.handle_key(key)
-                    self.update_display()
-                    last_update = current_time
+                # Handle every pending key before drawing once
+                for event in self.read_events():
+                    if isinstance(event, str):
+                        self.editor.insert_text(event)
+                    else:
+                        self.handle_key(event)
+                    if not self.running:
+                        break
+                    
+                self.update_display()
                 
             except KeyboardInterrupt:
                 break
@@ -506,8 +1093,39 @@ class ASCIIEngineIDE:
                 # In a real implementation, log this error
                 pass
                 
+        sys.stdout.write('\x1b[?2004l')
+        sys.stdout.flush()
+        # None means curses had installed its own handler from C
+        signal.signal(signal.SIGWINCH, old_handler if old_handler is not None else signal.SIG_DFL)
+        signal.set_wakeup_fd(old_wakeup)
+        os.close(wakeup_read)
+        os.close(wakeup_write)
         self.preview.stop_preview()
         
+    def on_sigwinch(self, signum, frame):
+        self.resize_pending = True
+        
+    def drain_keys(self, wait=0):
+        """Read every key curses has pending, waiting up to wait seconds for the first"""
+        keys = []
+        self.stdscr.timeout(int(wait * 1000))
+        key = self.stdscr.getch()
+        self.stdscr.timeout(0)
+        while key != -1:
+            keys.append(key)
+            key = self.stdscr.getch()
+        return keys
+        
+    def read_events(self):
+        """Pending keys, with each bracketed paste collected into a single str"""
+        return collect_events(self.drain_keys)
+        
+    def handle_key(self, key):
+        if key in [3, 5, 18, 19, 15, 17, 27, curses.KEY_F5]:  # Shortcuts
+            self.handle_shortcuts(key)
+        else:
+            self.editor.handle_key(key)
+        
     def update_display(self):
         """Update display using double buffering"""
         try:
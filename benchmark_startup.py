@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the ASCII Engine
+
+Times each step on the way to a first frame in fresh interpreters, since
+that is what launching a sketch costs: importing the package, importing the
+IDE, drawing and encoding a first frame, and getting a first frame back
+from a sketch process. Times are medians over several runs with the bare
+interpreter startup subtracted.
+
+    python benchmark_startup.py [--repeat N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CASES = [
+    ('import ascii_engine', "import ascii_engine"),
+    ('import ascii_ide', "import ascii_ide"),
+    ('first canvas frame', """
+import ascii_engine
+canvas = ascii_engine.Canvas(50, 150)
+canvas.circle(75, 25, 10, color='yellow')
+canvas.text(2, 1, 'first frame')
+frame = [canvas.encode_row(r) for r in range(canvas.rows)]
+"""),
+    ('first sketch process frame', """
+import time
+import ascii_engine
+sketch = ascii_engine.SketchProcess(50, 150, fps=30)
+sketch.start("def draw():\\n    canvas.circle(75, 25, 10, color='yellow')\\n")
+try:
+    while not sketch.poll():
+        time.sleep(0.001)
+finally:
+    sketch.stop()
+"""),
+]
+
+
+def run(code):
+    """Wall time in seconds of a fresh interpreter running code"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=HERE, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help="runs per case (default 10)")
+    args = parser.parse_args()
+
+    baseline = statistics.median(run('pass') for i in range(args.repeat))
+    print(f"{'interpreter startup':<30} {baseline * 1000:8.1f} ms")
+    for name, code in CASES:
+        elapsed = statistics.median(run(code) for i in range(args.repeat))
+        print(f"{name:<30} {(elapsed - baseline) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
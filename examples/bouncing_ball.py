@@ -7,6 +7,7 @@ ball_y = 15
 vel_x = 2
 vel_y = 1
 radius = 3
+trail = ParticleSystem(2000, drag=0.1)
 
 def setup():
     global ball_x, ball_y, vel_x, vel_y
@@ -30,5 +31,10 @@ def draw():
     ball_x = max(radius, min(canvas.cols - radius, ball_x))
     ball_y = max(radius, min(canvas.rows - radius, ball_y))
     
+    # Leave a fading trail of sparks behind the ball
+    trail.burst(ball_x, ball_y, 20, speed=0.5, lifetime=12, glyph='.', color='bright_yellow')
+    trail.update()
+    trail.render(canvas)
+    
     # Draw ball
     canvas.circle(ball_x, ball_y, radius, filled=True, color='yellow')
\ No newline at end of file
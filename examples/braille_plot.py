@@ -0,0 +1,29 @@
+# Braille Plot
+# Smooth curves drawn with 2 x 4 braille dots per character cell
+
+plot = BrailleCanvas(canvas.rows, canvas.cols)
+frame = 0
+
+def setup():
+    pass
+
+def resized(rows, cols):
+    plot.resize(rows, cols)
+
+def draw():
+    global frame
+    plot.clear()
+    middle = plot.rows // 2
+    
+    # Axes
+    plot.line(0, middle, plot.cols - 1, middle, color='white')
+    
+    # Two waves sampled at every dot column
+    for amplitude, speed, color in ((0.4, 0.05, 'cyan'), (0.2, 0.11, 'magenta')):
+        points = [(x, middle + amplitude * plot.rows * math.sin((x + frame) * speed))
+                  for x in range(plot.cols)]
+        plot.polyline(points, color=color)
+    
+    plot.circle(plot.cols // 2, middle, plot.rows // 4, filled=False, color='yellow')
+    plot.render(canvas)
+    frame += 1
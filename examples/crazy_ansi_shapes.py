@@ -7,44 +7,7 @@ from random import randint, choice
 # Add parent directory to path to import ascii_engine
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from ascii_engine.main import Canvas, COLORS
-
-def add_ansi_effects():
-    """Add additional ANSI effects and colors to the existing color palette"""
-    effects = {
-        # Bright colors
-        'bright_black': '\033[90m',
-        'bright_red': '\033[91m',
-        'bright_green': '\033[92m',
-        'bright_yellow': '\033[93m',
-        'bright_blue': '\033[94m',
-        'bright_magenta': '\033[95m',
-        'bright_cyan': '\033[96m',
-        'bright_white': '\033[97m',
-        
-        # Background colors
-        'bg_black': '\033[40m',
-        'bg_red': '\033[41m',
-        'bg_green': '\033[42m',
-        'bg_yellow': '\033[43m',
-        'bg_blue': '\033[44m',
-        'bg_magenta': '\033[45m',
-        'bg_cyan': '\033[46m',
-        'bg_white': '\033[47m',
-        
-        # Text effects
-        'bold': '\033[1m',
-        'dim': '\033[2m',
-        'italic': '\033[3m',
-        'underline': '\033[4m',
-        'blink': '\033[5m',
-        'reverse': '\033[7m',
-        'strikethrough': '\033[9m',
-    }
-    
-    # Add to global COLORS dict
-    COLORS.update(effects)
-    return effects
+from ascii_engine.main import Canvas
 
 class CrazyCanvas(Canvas):
     """Extended Canvas with crazy ANSI character support"""
@@ -70,46 +33,36 @@ class CrazyCanvas(Canvas):
             '※', '§', '¶', '†', '‡', '•', '‰', '′', '″', '‴',
             '℀', '℁', '℃', '℉', '℗', '℘', '℞', '℟', '℠', '℡',
         ]
-        
-        # Add ANSI effects
-        add_ansi_effects()
+    
+    def crazy_style(self, color='white', effect=None, bg_color=None):
+        """Intern a foreground/effect/background combination as a style ID"""
+        return self.style_table.intern(fg=color, bg=bg_color, attrs=effect)
     
     def set_crazy_pixel(self, row, col, char=None, color='white', effect=None, bg_color=None):
         """Set a pixel with crazy ANSI effects"""
+        self._put_crazy_pixel(row, col, char, self.crazy_style(color, effect, bg_color))
+    
+    def _put_crazy_pixel(self, row, col, char, style):
+        """Set a pixel with an already interned style"""
         if 0 <= row < self.rows and 0 <= col < self.cols:
             if char is None:
                 char = choice(self.crazy_chars)
-            
-            # Build ANSI sequence
-            ansi_sequence = ""
-            
-            # Add effect
-            if effect and effect in COLORS:
-                ansi_sequence += COLORS[effect]
-            
-            # Add background color
-            if bg_color and f'bg_{bg_color}' in COLORS:
-                ansi_sequence += COLORS[f'bg_{bg_color}']
-            
-            # Add foreground color
-            if color in COLORS:
-                ansi_sequence += COLORS[color]
-            
-            # Add character and reset
-            colored_char = f"{ansi_sequence}{char}{COLORS['reset']}"
-            self.canvas[row][col] = colored_char
+            self.canvas[row][col] = char
+            self.styles[row][col] = style
     
     def crazy_circle(self, center_x, center_y, radius, filled=True, char=None, color='white', effect=None, bg_color=None):
         """Draw a circle with crazy ANSI effects"""
         if radius <= 0:
             return
         
+        style = self.crazy_style(color, effect, bg_color)
+        
         # Use midpoint circle algorithm
         x = 0
         y = radius
         d = 1 - radius
         
-        self._draw_crazy_circle_points(center_x, center_y, x, y, filled, char, color, effect, bg_color)
+        self._draw_crazy_circle_points(center_x, center_y, x, y, filled, char, style)
         
         while x < y:
             if d < 0:
@@ -118,19 +71,19 @@ class CrazyCanvas(Canvas):
                 d += 2 * (x - y) + 5
                 y -= 1
             x += 1
-            self._draw_crazy_circle_points(center_x, center_y, x, y, filled, char, color, effect, bg_color)
+            self._draw_crazy_circle_points(center_x, center_y, x, y, filled, char, style)
     
-    def _draw_crazy_circle_points(self, cx, cy, x, y, filled, char, color, effect, bg_color):
+    def _draw_crazy_circle_points(self, cx, cy, x, y, filled, char, style):
         """Draw crazy circle points"""
         if filled:
             # Fill horizontal lines for filled circle
             for py in [cy + y, cy - y, cy + x, cy - x]:
                 if py == cy + y or py == cy - y:
                     for px in range(cx - x, cx + x + 1):
-                        self.set_crazy_pixel(py, px, char, color, effect, bg_color)
+                        self._put_crazy_pixel(py, px, char, style)
                 elif py == cy + x or py == cy - x:
                     for px in range(cx - y, cx + y + 1):
-                        self.set_crazy_pixel(py, px, char, color, effect, bg_color)
+                        self._put_crazy_pixel(py, px, char, style)
         else:
             # Just draw the outline points
             points = [
@@ -140,29 +93,32 @@ class CrazyCanvas(Canvas):
                 (cx + y, cy - x), (cx - y, cy - x)
             ]
             for px, py in points:
-                self.set_crazy_pixel(py, px, char, color, effect, bg_color)
+                self._put_crazy_pixel(py, px, char, style)
     
     def crazy_rect(self, x, y, width, height, filled=True, char=None, color='white', effect=None, bg_color=None):
         """Draw a rectangle with crazy ANSI effects"""
         if width <= 0 or height <= 0:
             return
         
+        style = self.crazy_style(color, effect, bg_color)
+        
         if filled:
             # Fill the entire rectangle
             for row in range(y, y + height):
                 for col in range(x, x + width):
-                    self.set_crazy_pixel(row, col, char, color, effect, bg_color)
+                    self._put_crazy_pixel(row, col, char, style)
         else:
             # Draw just the outline
             for col in range(x, x + width):
-                self.set_crazy_pixel(y, col, char, color, effect, bg_color)  # Top
-                self.set_crazy_pixel(y + height - 1, col, char, color, effect, bg_color)  # Bottom
+                self._put_crazy_pixel(y, col, char, style)  # Top
+                self._put_crazy_pixel(y + height - 1, col, char, style)  # Bottom
             for row in range(y, y + height):
-                self.set_crazy_pixel(row, x, char, color, effect, bg_color)  # Left
-                self.set_crazy_pixel(row, x + width - 1, char, color, effect, bg_color)  # Right
+                self._put_crazy_pixel(row, x, char, style)  # Left
+                self._put_crazy_pixel(row, x + width - 1, char, style)  # Right
     
     def crazy_line(self, x1, y1, x2, y2, char=None, color='white', effect=None, bg_color=None):
         """Draw a line with crazy ANSI effects using Bresenham's algorithm"""
+        style = self.crazy_style(color, effect, bg_color)
         dx = abs(x2 - x1)
         dy = abs(y2 - y1)
         sx = 1 if x1 < x2 else -1
@@ -172,7 +128,7 @@ class CrazyCanvas(Canvas):
         x, y = x1, y1
         
         while True:
-            self.set_crazy_pixel(y, x, char, color, effect, bg_color)
+            self._put_crazy_pixel(y, x, char, style)
             
             if x == x2 and y == y2:
                 break
@@ -191,13 +147,14 @@ class CrazyCanvas(Canvas):
         """Draw text with rainbow colors"""
         colors = ['red', 'bright_red', 'yellow', 'bright_yellow', 'green', 'bright_green', 
                  'cyan', 'bright_cyan', 'blue', 'bright_blue', 'magenta', 'bright_magenta']
+        styles = [self.crazy_style(color, 'bold') for color in colors]
         
         for i, char in enumerate(text):
-            color = colors[i % len(colors)]
+            style = styles[i % len(styles)]
             if direction == 'horizontal':
-                self.set_crazy_pixel(y, x + i, char, color, 'bold')
+                self._put_crazy_pixel(y, x + i, char, style)
             else:  # vertical
-                self.set_crazy_pixel(y + i, x, char, color, 'bold')
+                self._put_crazy_pixel(y + i, x, char, style)
 
 def demo_crazy_shapes():
     """Demonstrate crazy ANSI shapes"""
@@ -262,7 +219,7 @@ def demo_crazy_shapes():
             for dy in [-1, 0, 1]:
                 if dx != 0 or dy != 0:
                     deco_char = choice(['·', '∘', '•', '‧'])
-                    canvas.set_crazy_pixel(y + dy, x + dx, deco_char, 'dim')
+                    canvas.set_crazy_pixel(y + dy, x + dx, deco_char, effect='dim')
     
     canvas.draw()
     time.sleep(3)
@@ -305,7 +262,7 @@ def demo_crazy_shapes():
                 if (row + col) % 2 == 0:
                     canvas.set_crazy_pixel(y, x, suit, suit_colors[suit_idx], 'blink', 'black')
                 else:
-                    canvas.set_crazy_pixel(y, x, choice(['·', '∘']), 'dim')
+                    canvas.set_crazy_pixel(y, x, choice(['·', '∘']), effect='dim')
     
     canvas.draw()
     time.sleep(3)
@@ -0,0 +1,24 @@
+# Fireworks
+# Thousands of particles moved and drawn as whole arrays by a ParticleSystem
+
+colors = ['bright_red', 'bright_yellow', 'bright_cyan', 'bright_magenta', 'bright_green', 'white']
+sparks = ParticleSystem(30000, gravity=0.03, drag=0.02)
+embers = ParticleSystem(30000, gravity=0.01, drag=0.05)
+
+def setup():
+    sparks.clear()
+    embers.clear()
+
+def draw():
+    # Launch a new rocket now and then
+    if randint(0, 6) == 0:
+        x = randint(10, canvas.cols - 10)
+        y = randint(3, canvas.rows // 2)
+        color = colors[randint(0, len(colors) - 1)]
+        sparks.burst(x, y, 1500, speed=1.2, lifetime=randint(25, 45), glyph='*', color=color)
+        embers.burst(x, y, 800, speed=0.6, lifetime=70, glyph='.', color='yellow')
+
+    sparks.update()
+    embers.update()
+    embers.render(canvas)
+    sparks.render(canvas)
@@ -3,7 +3,7 @@
 Gradient Circles Example - ASCII Engine
 
 Creates radial gradient patterns using concentric circles emanating from the center.
-Demonstrates circle drawing with color gradients and animation effects.
+Demonstrates circle drawing with HSV color gradients and animation effects.
 """
 
 import os
@@ -15,6 +15,11 @@ from random import randint, choice
 # Add parent directory to path to import ascii_engine
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from ascii_engine.main import Canvas
+from ascii_engine.colors import hsv
+
+def rainbow(steps, saturation=1.0, value=1.0):
+    """Evenly spaced hues around the color wheel"""
+    return [hsv(i / steps, saturation, value) for i in range(steps)]
 
 def create_radial_gradient(canvas, center_x=None, center_y=None, max_radius=None, animate=False):
     """Create concentric circles with color gradient from center outward"""
@@ -29,8 +34,8 @@ def create_radial_gradient(canvas, center_x=None, center_y=None, max_radius=None
     if max_radius is None:
         max_radius = max(canvas.cols, canvas.rows)
     
-    # Color gradient from center outward
-    colors = ['white', 'yellow', 'red', 'magenta', 'blue', 'cyan', 'green']
+    # Smooth color gradient from center outward
+    colors = rainbow(36)
     
     if not animate:
         # Static gradient
@@ -71,7 +76,7 @@ def create_expanding_circles(canvas, center_x=None, center_y=None):
         center_y = canvas.rows // 2
     
     max_radius = max(canvas.cols, canvas.rows)
-    colors = ['white', 'yellow', 'red', 'magenta', 'blue', 'cyan', 'green']
+    colors = rainbow(8)
     
     frame = 0
     while True:
@@ -96,7 +101,7 @@ def create_spiral_gradient(canvas, center_x=None, center_y=None):
     if center_y is None:
         center_y = canvas.rows // 2
     
-    colors = ['red', 'yellow', 'green', 'cyan', 'blue', 'magenta', 'white']
+    colors = rainbow(40, saturation=0.8)
     
     frame = 0
     while True:
@@ -8,6 +8,7 @@ from random import randint, choice
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from ascii_engine.main import Canvas
+from ascii_engine.colors import hsv
 
 class MidiDemoCanvas(Canvas):
     """Demo version without MIDI dependency"""
@@ -17,12 +18,8 @@ class MidiDemoCanvas(Canvas):
         self.shapes = []
         self.max_shapes = 15
         
-        # Note to color mapping
-        self.note_colors = {
-            0: 'red', 1: 'magenta', 2: 'yellow', 3: 'white',
-            4: 'green', 5: 'cyan', 6: 'blue', 7: 'red',
-            8: 'magenta', 9: 'yellow', 10: 'green', 11: 'cyan'
-        }
+        # Note to color mapping, one hue per pitch class
+        self.note_colors = {note: hsv(note / 12) for note in range(12)}
         
         self.shape_types = ['circle', 'rect', 'line', 'triangle', 'star']
         
@@ -82,11 +79,12 @@ class MidiDemoCanvas(Canvas):
                             points[2][0], points[2][1], 
                             filled=True, color=color)
             elif shape_type == 'star':
+                points = []
                 for angle in range(0, 360, 30):
                     radius = size if angle % 60 == 0 else size // 2
-                    end_x = x + int(radius * math.cos(math.radians(angle)))
-                    end_y = y + int(radius * math.sin(math.radians(angle)))
-                    self.line(x, y, end_x, end_y, color=color)
+                    points.append((x + int(radius * math.cos(math.radians(angle))),
+                                   y + int(radius * math.sin(math.radians(angle)))))
+                self.polygon(points, filled=True, color=color)
         except:
             pass
     
@@ -126,18 +124,12 @@ def run_demo():
             canvas.draw_shapes()
             
             # Draw info
-            title = "MIDI REACTIVE SHAPES - DEMO"
-            for i, char in enumerate(title[:canvas.cols-4]):
-                canvas.set_pixel(1, i + 2, char, 'white')
-            
-            info = f"Notes: {notes_played}  Shapes: {len(canvas.shapes)}"
-            for i, char in enumerate(info[:canvas.cols-4]):
-                canvas.set_pixel(3, i + 2, char, 'yellow')
+            canvas.text(2, 1, "MIDI REACTIVE SHAPES - DEMO", 'white')
+            canvas.text(2, 3, f"Notes: {notes_played}  Shapes: {len(canvas.shapes)}", 'yellow')
             
             # Color legend
-            legend = "Colors: C=Red D=Yellow E=Green F=Cyan G=Blue A=Magenta"
-            for i, char in enumerate(legend[:canvas.cols-4]):
-                canvas.set_pixel(canvas.rows-2, i + 2, char, 'cyan')
+            legend = "Colors: one hue per note, C=Red D=Yellow E=Green F#=Cyan A=Violet"
+            canvas.text(2, canvas.rows - 2, legend, 'cyan')
             
             canvas.draw()
             time.sleep(1/15)  # 15 FPS
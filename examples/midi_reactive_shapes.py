@@ -9,6 +9,8 @@ from random import randint, choice
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from ascii_engine.main import Canvas
+from ascii_engine.colors import hsv
+from ascii_engine.swapchain import SwapChain
 
 try:
     import mido
@@ -31,21 +33,8 @@ class MidiReactiveCanvas(Canvas):
         self.shape_decay = 0.1 # How fast shapes fade
         
         # MIDI note to color mapping (12-tone chromatic scale)
-        # Using only standard ANSI colors available in the Canvas
-        self.note_colors = {
-            0: 'red',        # C
-            1: 'magenta',    # C#
-            2: 'yellow',     # D
-            3: 'white',      # D#
-            4: 'green',      # E
-            5: 'cyan',       # F
-            6: 'blue',       # F#
-            7: 'red',        # G
-            8: 'magenta',    # G#
-            9: 'yellow',     # A
-            10: 'green',     # A#
-            11: 'cyan'       # B
-        }
+        # Each pitch class gets its own hue, starting with C at red
+        self.note_colors = {note: hsv(note / 12) for note in range(12)}
         
         # Extended colors for higher contrast (using only available colors)
         self.extended_colors = [
@@ -95,18 +84,12 @@ class MidiReactiveCanvas(Canvas):
     
     def update_shapes(self):
         """Update all active shapes (aging, fading)"""
-        shapes_to_remove = []
-        
-        for i, shape in enumerate(self.midi_shapes):
+        for shape in self.midi_shapes:
             shape['age'] += 1
-            
-            # Mark for removal if too old
-            if shape['age'] > shape['max_age']:
-                shapes_to_remove.append(i)
         
-        # Remove old shapes (in reverse order to maintain indices)
-        for i in reversed(shapes_to_remove):
-            self.midi_shapes.pop(i)
+        # Keep the shapes that are still young enough in one pass
+        self.midi_shapes = [shape for shape in self.midi_shapes
+                            if shape['age'] <= shape['max_age']]
     
     def draw_midi_shape(self, shape):
         """Draw a single MIDI-triggered shape"""
@@ -156,12 +139,13 @@ class MidiReactiveCanvas(Canvas):
                                 filled=True, color=color)
             
             elif shape_type == 'star':
-                # Draw star pattern with lines
+                # Six-pointed star outline, alternating outer and inner radius
+                points = []
                 for angle in range(0, 360, 30):
                     radius = size if angle % 60 == 0 else size // 2
-                    end_x = x + int(radius * math.cos(math.radians(angle)))
-                    end_y = y + int(radius * math.sin(math.radians(angle)))
-                    self.line(x, y, end_x, end_y, color=color)
+                    points.append((x + int(radius * math.cos(math.radians(angle))),
+                                   y + int(radius * math.sin(math.radians(angle)))))
+                self.polygon(points, filled=True, color=color)
         
         except Exception as e:
             # Skip drawing if coordinates are out of bounds
@@ -184,6 +168,7 @@ class MidiVisualizer:
     
     def __init__(self):
         self.canvas = MidiReactiveCanvas(50, 150)
+        self.swap_chain = SwapChain(self.canvas.rows, self.canvas.cols)
         self.running = False
         self.midi_input = None
         self.stats = {
@@ -278,6 +263,12 @@ class MidiVisualizer:
         except Exception as e:
             print(f"MIDI listener error: {e}")
     
+    def display_thread(self):
+        """Thread function that prints the latest complete frame"""
+        while self.running:
+            if self.swap_chain.wait_for_frame(timeout=0.1):
+                self.swap_chain.acquire().draw()
+    
     def draw_ui(self):
         """Draw user interface information"""
         # Draw stats in top-left corner
@@ -295,31 +286,21 @@ class MidiVisualizer:
             ])
         
         for i, line in enumerate(info_lines):
-            for j, char in enumerate(line[:20]):  # Limit to 20 chars
-                if i < self.canvas.rows - 2 and j < self.canvas.cols - 2:
-                    self.canvas.set_pixel(i + 1, j + 1, char, 'white')
+            self.canvas.text(1, i + 1, line[:20])  # Limit to 20 chars
         
         # Draw color legend
         legend_y = self.canvas.rows - 8
         legend_x = 2
         
-        legend_title = "Note Colors:"
-        for i, char in enumerate(legend_title):
-            if legend_x + i < self.canvas.cols - 2:
-                self.canvas.set_pixel(legend_y, legend_x + i, char, 'white')
+        self.canvas.text(legend_x, legend_y, "Note Colors:")
         
         note_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
         for i, (note_name, color) in enumerate(zip(note_names, self.canvas.note_colors.values())):
             y = legend_y + 1 + i // 6
             x = legend_x + (i % 6) * 12
             
-            if y < self.canvas.rows - 1 and x + 8 < self.canvas.cols - 2:
-                display_text = f"{note_name}:●"
-                for j, char in enumerate(display_text):
-                    if char == '●':
-                        self.canvas.set_pixel(y, x + j, char, color)
-                    else:
-                        self.canvas.set_pixel(y, x + j, char, 'white')
+            end = self.canvas.text(x, y, f"{note_name}:")
+            self.canvas.text(end, y, '●', color)
     
     def run(self):
         """Main application loop"""
@@ -352,6 +333,10 @@ class MidiVisualizer:
             midi_thread = threading.Thread(target=self.midi_listener_thread, daemon=True)
             midi_thread.start()
             
+            # Terminal output runs on its own thread so a slow terminal can't stall rendering
+            output_thread = threading.Thread(target=self.display_thread, daemon=True)
+            output_thread.start()
+            
             # Main visualization loop
             frame_count = 0
             while self.running:
@@ -367,8 +352,8 @@ class MidiVisualizer:
                 # Draw UI
                 self.draw_ui()
                 
-                # Draw canvas
-                self.canvas.draw()
+                # Hand the finished frame to the display thread
+                self.swap_chain.present(self.canvas)
                 
                 # Control frame rate
                 time.sleep(1/30)  # 30 FPS
@@ -418,10 +403,7 @@ def demo_without_midi():
             canvas.draw_shapes()
             
             # Draw title
-            title = "MIDI REACTIVE SHAPES - DEMO MODE"
-            for i, char in enumerate(title):
-                if i < canvas.cols - 2:
-                    canvas.set_pixel(1, i + 1, char, 'bright_yellow')
+            canvas.text(1, 1, "MIDI REACTIVE SHAPES - DEMO MODE", 'bright_yellow')
             
             # Draw canvas
             canvas.draw()
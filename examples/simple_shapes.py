@@ -7,14 +7,12 @@ def setup():
 def draw():
     # Draw some random shapes each frame
     
-    # Random circles
-    for i in range(3):
-        x = randint(10, canvas.cols - 10)
-        y = randint(5, canvas.rows - 5)
-        radius = randint(2, 6)
-        colors = ['red', 'green', 'blue', 'yellow', 'cyan', 'magenta']
-        color = colors[randint(0, len(colors) - 1)]
-        canvas.circle(x, y, radius, filled=True, color=color)
+    # Random circles, drawn in one batched call
+    colors = ['red', 'green', 'blue', 'yellow', 'cyan', 'magenta']
+    xs = [randint(10, canvas.cols - 10) for i in range(3)]
+    ys = [randint(5, canvas.rows - 5) for i in range(3)]
+    radii = [randint(2, 6) for i in range(3)]
+    canvas.circles(xs, ys, radii, [colors[randint(0, len(colors) - 1)] for i in range(3)])
     
     # Random rectangles
     for i in range(2):
@@ -1,13 +1,12 @@
 # Animated Spiral
 import math
 
-angle = 0
-
 def setup():
     pass
 
 def draw():
-    global angle
+    # Everything follows from the frame number, so this can be rendered offline in parallel
+    angle = frame_count * 0.05
     
     center_x = canvas.cols // 2
     center_y = canvas.rows // 2
@@ -23,6 +22,4 @@ def draw():
         if 0 <= x < canvas.cols and 0 <= y < canvas.rows:
             colors = ['red', 'yellow', 'green', 'cyan', 'blue', 'magenta']
             color = colors[i % len(colors)]
-            canvas.set_pixel(y, x, '●', color)
-    
-    angle += 0.05
\ No newline at end of file
+            canvas.set_pixel(y, x, '●', color)
\ No newline at end of file
@@ -2,28 +2,36 @@
 """
 ASCII Engine IDE Launcher
 Provides better error handling and terminal compatibility
+
+The checks only look at the terminal's file descriptors and environment, so
+the launcher never initializes curses itself (the IDE does that once) and
+never waits for input before the IDE comes up.
 """
 
 import os
 import sys
-import curses
 
-def check_terminal():
-    """Check if terminal supports curses"""
+MIN_ROWS, MIN_COLS = 24, 80
+
+
+def terminal_size():
+    """The terminal size as (columns, lines), or None if this isn't an interactive terminal"""
+    if not (sys.stdin.isatty() and sys.stdout.isatty()):
+        return None
+    if os.name == 'posix' and os.environ.get('TERM', 'dumb') == 'dumb':
+        return None
     try:
-        # Try to initialize curses
-        stdscr = curses.initscr()
-        curses.endwin()
-        return True
-    except:
-        return False
+        return os.get_terminal_size(sys.stdout.fileno())
+    except OSError:
+        return None
 
 def main():
     print("ASCII Engine IDE")
     print("================")
-    
+
     # Check terminal compatibility
-    if not check_terminal():
+    size = terminal_size()
+    if size is None:
         print("❌ Error: Your terminal doesn't support curses")
         print("\nTry running in:")
         print("- Terminal.app (macOS)")
@@ -36,28 +44,17 @@ def main():
         print("- VS Code integrated terminal")
         print("- PyCharm terminal")
         return 1
-    
-    # Check terminal size
-    try:
-        rows, cols = os.popen('stty size', 'r').read().split()
-        rows, cols = int(rows), int(cols)
-        
-        if rows < 24 or cols < 80:
-            print(f"⚠️  Warning: Terminal size is {cols}x{rows}")
-            print("   Recommended minimum: 80x24 characters")
-            print("   For best experience: 120x40 characters")
-            
-            response = input("\nContinue anyway? (y/n): ")
-            if response.lower() != 'y':
-                return 0
-    except:
-        pass
-    
+
+    # Check terminal size; the IDE re-lays out when the terminal is resized
+    cols, rows = size
+    if rows < MIN_ROWS or cols < MIN_COLS:
+        print(f"⚠️  Warning: Terminal size is {cols}x{rows}")
+        print(f"   Recommended minimum: {MIN_COLS}x{MIN_ROWS} characters")
+        print("   For best experience: 120x40 characters")
+
     print("\n🚀 Starting ASCII Engine IDE...")
     print("   Use F5 to run code, Ctrl+Q to quit")
-    print("   Press any key to continue...")
-    input()
-    
+
     # Import and run IDE
     try:
         from ascii_ide import main as ide_main
@@ -67,8 +64,8 @@ def main():
     except Exception as e:
         print(f"\n❌ Error starting IDE: {e}")
         return 1
-        
+
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
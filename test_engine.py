@@ -0,0 +1,859 @@
+#!/usr/bin/env python3
+"""
+Test script for ASCII Engine rendering internals
+Tests styles, framebuffers and encoders without a terminal
+"""
+
+import os
+import sys
+import time
+import random
+import subprocess
+from array import array
+sys.path.append('.')
+
+from ascii_engine.main import Canvas
+from ascii_engine.styles import StyleTable, STYLES, RESET
+from ascii_engine.swapchain import SwapChain
+from ascii_engine.world import WorldCanvas
+from ascii_engine.particles import ParticleSystem, load_numpy
+from ascii_engine.subcell import BrailleCanvas, HalfBlockCanvas
+from ascii_engine.sketch_process import SketchProcess
+from ascii_engine.colors import (parse_color, hsv, Quantizer, QUANTIZE_256,
+                                 COLOR_16, COLOR_256, COLOR_TRUECOLOR)
+
+def test_style_interning():
+    print("Testing style interning...")
+    
+    table = StyleTable()
+    bold_red = table.intern('red', None, 'bold')
+    same = table.intern(fg='red', attrs=['bold'])
+    other = table.intern('red', 'blue', ('bold',))
+    
+    print(f"✓ Same style reuses ID: {bold_red == same}")
+    print(f"✓ Different background gets new ID: {other != bold_red}")
+    print(f"✓ Escape precomputed: {table.escapes[bold_red]!r}")
+    
+    return (bold_red == same and other != bold_red
+            and table.escapes[bold_red] == '\u001b[0;1;31m'
+            and table.escapes[0] == RESET)
+
+def test_styled_canvas_encoding():
+    print("\nTesting styled canvas encoding...")
+    
+    canvas = Canvas(3, 6)
+    warning = STYLES.intern('yellow', 'red', 'bold')
+    canvas.rect(0, 0, 3, 1, color=warning)
+    canvas.set_pixel(0, 3, '*', 'yellow')
+    row = canvas.encode_row(0)
+    expected = (STYLES.escapes[warning] + '███' + STYLES.escapes[STYLES.resolve('yellow')]
+                + '*' + RESET + '  ')
+    
+    print(f"✓ Cells store characters only: {canvas.canvas[0][:4]}")
+    print(f"✓ Escapes emitted once per run: {row == expected}")
+    
+    canvas.clear()
+    cleared = canvas.encode_row(0) == ' ' * 6
+    print(f"✓ Clear resets styles: {cleared}")
+    
+    return row == expected and cleared
+
+def test_rgb_color_modes():
+    print("\nTesting RGB colors and palette downsampling...")
+    
+    orange = parse_color('#f80')
+    table = StyleTable(COLOR_TRUECOLOR)
+    style_id = table.intern(orange)
+    truecolor = table.escapes[style_id]
+    table.set_color_mode(COLOR_256)
+    palette = table.escapes[style_id]
+    table.set_color_mode(COLOR_16)
+    basic = table.escapes[style_id]
+    
+    print(f"✓ Hex parsed: {orange}")
+    print(f"✓ Escapes per mode: {truecolor!r} {palette!r} {basic!r}")
+    
+    calls = []
+    def nearest(color):
+        calls.append(color)
+        return 7
+    quantizer = Quantizer(nearest)
+    quantizer.index((200, 10, 10))
+    quantizer.index((201, 12, 9))
+    print(f"✓ Lookup table reused for nearby colors: {len(calls) == 1}")
+    
+    return (orange == (255, 136, 0)
+            and truecolor == '\u001b[0;38;2;255;136;0m'
+            and palette == '\u001b[0;38;5;208m'
+            and basic.startswith('\u001b[0;3')
+            and len(calls) == 1
+            and QUANTIZE_256.index(hsv(0)) == 196)
+
+def test_swap_chain_hands_off_complete_frames():
+    print("\nTesting swap chain...")
+    
+    canvas = Canvas(2, 4)
+    chain = SwapChain(2, 4)
+    
+    canvas.set_pixel(0, 0, 'A', 'red')
+    chain.present(canvas)
+    first = chain.acquire()
+    
+    # Producer keeps drawing; the acquired frame must not change underneath
+    canvas.clear()
+    canvas.set_pixel(1, 1, 'B')
+    untouched = first.chars[0][0] == 'A' and first.chars[1][1] == ' '
+    print(f"✓ Acquired frame stable while producer draws: {untouched}")
+    
+    chain.present(canvas)
+    canvas.set_pixel(0, 3, 'C')
+    chain.present(canvas)
+    latest = chain.acquire()
+    print(f"✓ Reader skips to newest frame: {latest.number}")
+    print(f"✓ No new frame after acquire: {not chain.has_new_frame()}")
+    
+    # An unchanged frame is not published again
+    skipped = not chain.present(canvas) and not chain.has_new_frame()
+    print(f"✓ Identical frame skipped: {skipped} ({chain.stats['frames_skipped']} skipped)")
+    
+    return (first.number == 1 and untouched and latest.number == 3
+            and latest.chars[1][1] == 'B' and latest.chars[0][3] == 'C'
+            and skipped and chain.stats['frames_skipped'] == 1)
+
+def wait_for_frame(sketch, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if sketch.poll():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_sketch_process_shared_framebuffer():
+    print("\nTesting sketch process and shared framebuffer...")
+    
+    sketch = SketchProcess(4, 12, fps=30)
+    sketch.start("""
+def draw():
+    canvas.rect(0, 0, 3, 2, color=(255, 0, 0))
+    canvas.set_pixel(3, 11, 'Z', 'bright_green')
+""")
+    try:
+        got_frame = wait_for_frame(sketch)
+        frame = sketch.frame
+        red = sketch.styles.keys[frame.styles[0][0]]
+        print(f"✓ Frame received from child process: {got_frame}")
+        print(f"✓ Cells copied: {''.join(frame.chars[0])!r} {frame.chars[3][11]!r}")
+        print(f"✓ Styles mirrored from child: {red}")
+    finally:
+        sketch.stop()
+    
+    stuck = SketchProcess(4, 12)
+    stuck.start("def draw():\n    while True:\n        pass\n")
+    time.sleep(0.3)
+    stuck.stop()
+    killed = not stuck.process.is_alive()
+    print(f"✓ Infinite loop killed on stop: {killed}")
+    
+    # The watchdog limits single calls, not how long a sketch runs
+    healthy = SketchProcess(4, 12, fps=60, frame_timeout=0.4)
+    healthy.start("def draw():\n    canvas.text(0, 0, str(frame_count))\n")
+    try:
+        deadline = time.time() + 1.5
+        while time.time() < deadline:
+            healthy.poll()
+            time.sleep(0.02)
+        outlived = healthy.is_running() and healthy.error_message is None and healthy.frame.number > 10
+    finally:
+        healthy.stop()
+    print(f"✓ Sketch keeps running past the per-call budget: {outlived} ({healthy.frame.number} frames)")
+    
+    runaway = SketchProcess(4, 12, frame_timeout=0.4)
+    runaway.start("def draw():\n    while True:\n        pass\n")
+    try:
+        deadline = time.time() + 10
+        while time.time() < deadline and runaway.error_message is None:
+            runaway.poll()
+            time.sleep(0.02)
+        watchdog = (not runaway.process.is_alive() and runaway.exited
+                    and 'more than 0.4s' in (runaway.error_message or ''))
+    finally:
+        runaway.stop()
+    print(f"✓ Runaway draw() killed by the watchdog: {watchdog}")
+    no_cpu_cap = SketchProcess(4, 12).cpu_seconds is None
+    print(f"✓ No cap on total CPU time by default: {no_cpu_cap}")
+    
+    return (got_frame and frame.chars[0][:3] == ['█'] * 3 and frame.chars[3][11] == 'Z'
+            and red == ((255, 0, 0), None, ()) and killed and outlived and watchdog and no_cpu_cap)
+
+def test_hot_reload_keeps_state():
+    print("\nTesting hot reload...")
+    
+    source = """
+x = 0
+
+def setup():
+    pass
+
+def draw():
+    global x
+    x += 1
+    canvas.set_pixel(0, 0, 'A')
+"""
+    sketch = SketchProcess(2, 8, fps=30)
+    sketch.start(source)
+    try:
+        wait_for_frame(sketch)
+        before = sketch.frame.number
+        
+        # New draw() body, same setup(): swapped in place
+        sketch.reload(source.replace("'A'", "str(x % 10)"))
+        deadline = time.time() + 10
+        while time.time() < deadline and sketch.frame.chars[0][0] == 'A':
+            wait_for_frame(sketch)
+        kept_running = (sketch.frame.chars[0][0] != 'A' and sketch.frame.number > before
+                        and sketch.restarts == 0)
+        print(f"✓ New draw() running without restart: {kept_running}")
+        
+        # Changed setup(): full restart
+        sketch.reload(source.replace("pass", "canvas.clear()"))
+        deadline = time.time() + 10
+        while time.time() < deadline and sketch.restarts == 0:
+            wait_for_frame(sketch, timeout=0.1)
+        print(f"✓ Changed setup() restarts: {sketch.restarts == 1}")
+        
+        sketch.reload("def draw(:\n")
+        syntax_error = sketch.error_message is not None and sketch.is_running()
+        print(f"✓ Syntax error reported, sketch kept alive: {syntax_error}")
+    finally:
+        sketch.stop()
+    
+    return kept_running and sketch.restarts == 1 and syntax_error
+
+def test_identical_frames_skipped():
+    print("\nTesting identical frame skipping...")
+    
+    import io
+    import contextlib
+    import ascii_engine.terminal as terminal
+    
+    # Printed output (pipes, logs) gets every frame, identical or not
+    canvas = Canvas(3, 6)
+    canvas.rect(0, 0, 2, 2, color='red')
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        canvas.draw()
+        first = out.tell()
+        canvas.draw()
+    every = first > 0 and out.tell() == 2 * first
+    print(f"✓ Printing emits every frame: {every}")
+    
+    # Drawing in place on a terminal sends nothing for an unchanged canvas
+    class FakeTerminal(io.StringIO):
+        def isatty(self):
+            return True
+        def fileno(self):
+            return write_fd
+    
+    read_fd, write_fd = os.pipe()
+    try:
+        with contextlib.redirect_stdout(FakeTerminal()):
+            canvas.draw(in_place=True)
+            canvas.draw(in_place=True)
+        frames_written = terminal._stdout_writer.stats['frames']
+    finally:
+        terminal._stdout_writer = None
+        os.close(read_fd)
+        os.close(write_fd)
+    silent = frames_written == 1 and canvas.stats['frames_skipped'] == 1
+    print(f"✓ Unchanged canvas drawn in place sends nothing: {silent}")
+    
+    # Static frames are neither copied nor announced by the sketch process
+    sketch = SketchProcess(2, 8, fps=30)
+    sketch.start("""
+x = 0
+def draw():
+    global x
+    x += 1
+    canvas.set_pixel(0, 0, str(x // 5 % 10))
+""")
+    try:
+        wait_for_frame(sketch)
+        wait_for_frame(sketch)
+        stats = sketch.stats
+        counted = stats.get('frames_skipped', 0) >= 3 and stats['rows_skipped'] >= stats['frames_skipped'] * 2
+        print(f"✓ Sketch skipped unchanged frames: {counted} ({stats})")
+    finally:
+        sketch.stop()
+    
+    return every and silent and counted
+
+def test_terminal_writer():
+    print("\nTesting terminal writer...")
+    
+    import os
+    from ascii_engine.terminal import TerminalWriter, detect_synchronized_output
+    
+    read_fd, write_fd = os.pipe()
+    try:
+        writer = TerminalWriter(write_fd, synchronized=True)
+        canvas = Canvas(2, 3)
+        canvas.set_pixel(0, 0, 'A', 0)
+        writer.write_rows([], canvas.encode_row, canvas.rows)
+        canvas.set_pixel(1, 2, 'B', 0)
+        writer.write_rows([1], canvas.encode_row, canvas.rows)
+        writer.write_rows([], canvas.encode_row, canvas.rows)
+        output = os.read(read_fd, 4096)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+    
+    first, second = output.split(b'\x1b[?2026l')[:2]
+    full = first.startswith(b'\x1b[?2026h\x1b[2J') and b'\x1b[1;1HA' in first
+    in_place = second == b'\x1b[?2026h\x1b[2;1H  B\x1b[3;1H'
+    print(f"✓ First frame clears and writes every row: {full}")
+    print(f"✓ Later frames rewrite changed rows only: {in_place}")
+    print(f"✓ One write per frame, none when unchanged: {writer.stats['frames'] == 2}")
+    
+    # Canvas.draw() prints whole frames unless asked to draw in place
+    import io
+    import ascii_engine.terminal as terminal
+    
+    class FakeTerminal(io.StringIO):
+        def isatty(self):
+            return True
+        def fileno(self):
+            return write_fd
+    
+    read_fd, write_fd = os.pipe()
+    stdout = sys.stdout
+    try:
+        sys.stdout = printed = FakeTerminal()
+        canvas = Canvas(2, 3)
+        canvas.set_pixel(0, 0, 'A', 0)
+        canvas.draw()
+        canvas.set_pixel(1, 1, 'B', 0)
+        canvas.draw(in_place=True)
+        canvas.set_pixel(1, 2, 'C', 0)
+        canvas.draw()
+        written = os.read(read_fd, 4096)
+    finally:
+        sys.stdout = stdout
+        terminal._stdout_writer = None
+        os.close(read_fd)
+        os.close(write_fd)
+    printed = printed.getvalue()
+    opt_in = (printed.count('\n') == 4 and 'A' in printed and ' BC' in printed
+              and b'\x1b[2J' in written and b'C' not in written)
+    print(f"✓ draw() prints frames, draw(in_place=True) rewrites them: {opt_in}")
+    
+    detected = (detect_synchronized_output({'TERM': 'xterm-kitty'})
+                and not detect_synchronized_output({'TERM': 'xterm-256color'})
+                and not detect_synchronized_output({'TERM': 'foot', 'ASCII_ENGINE_SYNC_OUTPUT': '0'}))
+    print(f"✓ Synchronized output detection: {detected}")
+    return full and in_place and writer.stats['frames'] == 2 and opt_in and detected
+
+def test_resize_without_restart():
+    print("\nTesting canvas and sketch resize...")
+    
+    canvas = Canvas(3, 4)
+    canvas.set_pixel(1, 1, 'A', 'red')
+    canvas.resize(2, 6)
+    kept = canvas.canvas[1][1] == 'A' and len(canvas.canvas) == 2 and len(canvas.styles[1]) == 6
+    dropped_row = canvas._spare_rows[0][-1]
+    canvas.resize(5, 3)
+    reused = any(row is dropped_row for row in canvas.canvas)
+    shape_ok = len(canvas.canvas) == 5 and all(len(row) == 3 for row in canvas.canvas + canvas.styles)
+    print(f"✓ Cells kept across resize: {kept}")
+    print(f"✓ Dropped rows reused when growing: {reused and shape_ok}")
+    
+    sketch = SketchProcess(4, 10, fps=30)
+    sketch.start("""
+size = None
+def resized(rows, cols):
+    global size
+    size = (rows, cols)
+def draw():
+    canvas.set_pixel(canvas.rows - 1, canvas.cols - 1, 'R' if size else 'S')
+""")
+    try:
+        wait_for_frame(sketch)
+        sketch.resize(6, 20)
+        deadline = time.time() + 10
+        while time.time() < deadline and sketch.frame.rows != 6:
+            wait_for_frame(sketch, timeout=0.1)
+        frame = sketch.frame
+        resized = (frame.rows, frame.cols) == (6, 20) and frame.chars[5][19] == 'R'
+        print(f"✓ Sketch resized in place: {resized and sketch.restarts == 0}")
+    finally:
+        sketch.stop()
+    
+    return kept and reused and shape_ok and resized and sketch.restarts == 0
+
+def test_world_canvas():
+    print("\nTesting sparse world canvas...")
+    
+    world = WorldCanvas(10000, 10000, view_rows=20, view_cols=40, tile_size=32)
+    world.camera.move_to(5000, 5000)
+    world.circle(5010, 5010, 4, color=0)
+    world.rect(100, 100, 50, 50, color=0)  # Far outside the camera
+    world.line(0, 0, 20, 20, color=0)
+    culled = world.tile_count <= 2 and world.get_pixel(100, 100)[0] == world.blank
+    screen = world.render()
+    visible = screen.canvas[10][10] == world.fill_char and (screen.rows, screen.cols) == (20, 40)
+    print(f"✓ Off-camera primitives culled: {culled}")
+    print(f"✓ Camera view rendered: {visible}")
+    
+    static = WorldCanvas(10000, 10000, view_rows=20, view_cols=40, cull=False)
+    static.set_pixel(9999, 9999, 'X', 0)
+    static.set_pixel(0, 0, 'Y', 0)
+    static.camera.move_to(20000, 20000)  # Clamped to the bottom-right corner
+    corner = static.render().canvas[19][39]
+    kept = static.tile_count == 2 and corner == 'X'
+    print(f"✓ Unculled world keeps far tiles: {kept}")
+    
+    static.clear()
+    static.set_pixel(5, 5, 'Z', 0)
+    reused = static.tile_count == 1 and static.get_pixel(0, 0)[0] == static.blank
+    print(f"✓ Cleared tiles reused blank: {reused}")
+    
+    return culled and visible and kept and reused
+
+def reference_line(canvas, x1, y1, x2, y2, char):
+    """Unclipped Bresenham walk, checking every point"""
+    dx, dy = abs(x2 - x1), abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    err = dx - dy
+    while True:
+        if 0 <= y1 < canvas.rows and 0 <= x1 < canvas.cols:
+            canvas.canvas[y1][x1] = char
+        if x1 == x2 and y1 == y2:
+            return
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x1 += sx
+        if e2 < dx:
+            err += dx
+            y1 += sy
+
+def test_analytic_clipping():
+    print("\nTesting analytic clipping...")
+    
+    rng = random.Random(41)
+    mismatches = 0
+    for i in range(500):
+        coords = [rng.randint(-300, 300) for j in range(4)]
+        clipped = Canvas(20, 40)
+        reference = Canvas(20, 40)
+        clipped.line(*coords, color=0)
+        reference_line(reference, *coords, clipped.line_char)
+        mismatches += clipped.canvas != reference.canvas
+    print(f"✓ Clipped lines match the full Bresenham walk: {mismatches == 0}")
+    
+    canvas = Canvas(20, 40)
+    canvas.line(-100000, 5, 100000, 5, color=0)
+    canvas.circle(20, 10, 500, filled=True, color=0)
+    canvas.triangle(-1000, -1000, 1000, -1000, 0, 1000, filled=True, color=0)
+    huge = all(row == [canvas.triangle_char] * 40 for row in canvas.canvas) and len(canvas.canvas) == 20
+    print(f"✓ Huge shapes clipped to the canvas: {huge}")
+    
+    return mismatches == 0 and huge
+
+def test_polyline():
+    print("\nTesting polyline...")
+    
+    points = [(2, 2), (30, 2), (30, 15), (5, 18), (-10, 40)]
+    chained = Canvas(20, 40)
+    for (x1, y1), (x2, y2) in zip(points + points[:1], points[1:] + points[:1]):
+        chained.line(x1, y1, x2, y2, color=0)
+    pairs = Canvas(20, 40)
+    pairs.polyline(points, closed=True, color=0)
+    flat = Canvas(20, 40)
+    flat.polyline(array('i', [v for point in points for v in point]), closed=True, color=0)
+    same = pairs.canvas == chained.canvas and flat.canvas == chained.canvas
+    print(f"✓ Polyline matches chained lines: {same}")
+    
+    single = Canvas(5, 5)
+    single.polyline([(2, 3)], color=0)
+    point = single.canvas[3][2] == single.line_char
+    print(f"✓ Single point drawn: {point}")
+    
+    return same and point
+
+def test_polygon_fill():
+    print("\nTesting polygon fill...")
+    
+    square = Canvas(8, 12)
+    square.polygon([(1, 1), (8, 1), (8, 5), (1, 5)], color=0)
+    filled = sum(row.count(square.polygon_fill_char) for row in square.canvas)
+    print(f"✓ Square filled with its outline: {filled == 8 * 5}")
+    
+    # Pentagram: the centre is a hole under even-odd but filled under nonzero
+    star = [(10, 0), (16, 18), (0, 7), (20, 7), (4, 18)]
+    results = {}
+    for rule in ('evenodd', 'nonzero'):
+        canvas = Canvas(20, 21)
+        canvas.polygon(star, rule=rule, color=0)
+        results[rule] = canvas.canvas[10][10]
+    rules = results['evenodd'] == ' ' and results['nonzero'] == canvas.polygon_fill_char
+    print(f"✓ Even-odd and nonzero rules: {rules}")
+    
+    # Flat coordinates, clipped
+    clipped = Canvas(10, 10)
+    clipped.polygon([-50, -50, 50, -50, 50, 50, -50, 50], color=0)
+    full = all(row == [clipped.polygon_fill_char] * 10 for row in clipped.canvas)
+    print(f"✓ Oversized polygon clipped: {full}")
+    
+    triangle = Canvas(10, 10)
+    triangle.triangle(0, 0, 9, 9, 0, 9, filled=True, color=0)
+    # Exact crossings: row y covers columns 0..y
+    exact = all(''.join(triangle.canvas[y]).rstrip() == triangle.triangle_char * (y + 1) for y in range(10))
+    print(f"✓ Triangle fill steps edges exactly: {exact}")
+    
+    return filled == 8 * 5 and rules and full and exact
+
+def test_batched_shapes():
+    print("\nTesting batched shape calls...")
+    
+    rng = random.Random(44)
+    count = 200
+    xs = [rng.randint(-10, 50) for i in range(count)]
+    ys = [rng.randint(-5, 25) for i in range(count)]
+    sizes = [rng.randint(0, 8) for i in range(count)]
+    styles = [STYLES.intern(fg=rng.choice(['red', 'green', 'blue'])) for i in range(count)]
+    
+    heights = [size // 2 for size in sizes]
+    ends_x = [x + size * 3 for x, size in zip(xs, sizes)]
+    ends_y = [y - size for y, size in zip(ys, sizes)]
+    
+    matches = True
+    for filled in (True, False):
+        single = [Canvas(20, 40) for i in range(3)]
+        batched = [Canvas(20, 40) for i in range(3)]
+        for x, y, size, height, end_x, end_y, style in zip(xs, ys, sizes, heights, ends_x, ends_y, styles):
+            single[0].circle(x, y, size, filled=filled, color=style)
+            single[1].rect(x, y, size, height, filled=filled, color=style)
+            single[2].line(x, y, end_x, end_y, color=style)
+        batched[0].circles(xs, ys, sizes, styles, filled=filled)
+        batched[1].rects(xs, ys, sizes, heights, styles, filled=filled)
+        batched[2].lines(xs, ys, ends_x, ends_y, styles)
+        for one, many in zip(single, batched):
+            matches = matches and one.canvas == many.canvas and one.styles == many.styles
+    print(f"✓ Batched shapes match single calls: {matches}")
+    
+    # Shapes are drawn in order, so later ones end up on top
+    ordered = Canvas(5, 5)
+    ordered.circles(array('i', [2, 2]), array('i', [2, 2]), array('i', [2, 1]), ['red', 'blue'])
+    on_top = ordered.styles[2][2] == STYLES.resolve('blue') and ordered.styles[2][0] == STYLES.resolve('red')
+    print(f"✓ Draw order kept: {on_top}")
+    
+    return matches and on_top
+
+def test_particles():
+    print("\nTesting particle system...")
+    
+    numpy = load_numpy()
+    ok = True
+    for use_numpy in ([False, True] if numpy is not None else [False]):
+        particles = ParticleSystem(100, gravity=0.5, use_numpy=use_numpy)
+        first = particles.emit(2, 3, vx=1, lifetime=2, glyph='o', color='red')
+        particles.emit(-5, 0, lifetime=1)
+        particles.update()
+        moved = particles.x[first] == 3 and particles.vy[first] == 0.5 and particles.y[first] == 3.5
+        expired = len(particles) == 1
+        
+        # The slot of the expired particle is handed out again
+        reused = particles.emit(0, 0, lifetime=5) == 1
+        full = particles.burst(10, 10, 500, rng=random.Random(45)) == 98 and particles.emit(0, 0) is None
+        
+        canvas = Canvas(10, 10)
+        particles.clear()
+        particles.emit(2.4, 1.6, glyph='o', color='red')
+        particles.emit(50, 1, glyph='x')
+        particles.render(canvas)
+        drawn = (canvas.canvas[2][2] == 'o' and canvas.styles[2][2] == STYLES.resolve('red')
+                 and sum(row.count(canvas.blank) for row in canvas.canvas) == 99)
+        
+        kind = 'NumPy' if use_numpy else 'array'
+        print(f"✓ {kind} particles move: {moved}")
+        print(f"✓ {kind} particles expire: {expired}")
+        print(f"✓ {kind} dead slots reused: {reused and full}")
+        print(f"✓ {kind} particles rendered and clipped: {drawn}")
+        ok = ok and moved and expired and reused and full and drawn
+    
+    if numpy is not None:
+        # Both storage back ends simulate identically
+        results = []
+        for use_numpy in (False, True):
+            particles = ParticleSystem(1000, gravity=0.1, drag=0.05, use_numpy=use_numpy)
+            particles.burst(20, 20, 1000, speed=2, lifetime=8, rng=random.Random(46))
+            for step in range(5):
+                particles.update(0.5)
+            results.append((list(particles.x), list(particles.y), len(particles)))
+        same = results[0] == results[1]
+        print(f"✓ NumPy and array back ends agree: {same}")
+        ok = ok and same
+    
+    return ok
+
+def test_subcell_canvases():
+    print("\nTesting braille and half-block canvases...")
+    
+    braille = BrailleCanvas(2, 3)
+    sizes = (braille.rows, braille.cols) == (8, 6)
+    braille.line(0, 0, 5, 0, color='red')   # Top dot row of every cell
+    braille.set_pixel(7, 1, '*')            # Bottom right dot of the second row's first cell
+    braille.set_pixel(100, 100, '*')        # Outside, ignored
+    screen = braille.render()
+    dots = (screen.canvas[0] == ['\u2809'] * 3 and screen.canvas[1] == ['\u2880', ' ', ' ']
+            and screen.styles[0][1] == STYLES.resolve('red'))
+    
+    # Spans set and erase exactly the dots a pixel at a time would
+    rng = random.Random(46)
+    spans_match = True
+    for i in range(300):
+        row = rng.randrange(braille.rows)
+        start = rng.randrange(braille.cols)
+        end = rng.randrange(start, braille.cols + 1)
+        char = rng.choice(['#', braille.blank])
+        spans, plots = BrailleCanvas(2, 3), BrailleCanvas(2, 3)
+        spans.rect(0, 0, 6, 8)
+        plots.rect(0, 0, 6, 8)
+        spans._span(row, start, end, char, 1)
+        for col in range(start, end):
+            plots._plot(row, col, char, 1)
+        spans_match = spans_match and spans.dots == plots.dots
+    
+    half = HalfBlockCanvas(2, 4)
+    half.rect(0, 0, 4, 1, color='red')      # Upper pixels of the first row
+    half.rect(0, 1, 2, 2, color='blue')     # Lower pixels of the first row, upper of the second
+    half.set_pixel(0, 3, ' ')               # Erase one red pixel
+    screen = half.render()
+    red_on_blue = STYLES.intern('red', 'blue')
+    halves = (screen.canvas[0] == ['▀', '▀', '▀', ' '] and screen.canvas[1] == ['▀', '▀', ' ', ' ']
+              and screen.styles[0][:3] == [red_on_blue, red_on_blue, STYLES.resolve('red')])
+    
+    # The packed cells go to any canvas, e.g. the sketch's
+    target = Canvas(2, 4)
+    half.render(target)
+    copied = target.canvas == screen.canvas and half.row_hashes() == screen.row_hashes()
+    
+    print(f"✓ Pixel size is 2 x 4 per cell: {sizes}")
+    print(f"✓ Braille dots packed into cells: {dots}")
+    print(f"✓ Braille spans match single dots: {spans_match}")
+    print(f"✓ Half blocks combine upper and lower colors: {halves}")
+    print(f"✓ Rendered into another canvas: {copied}")
+    
+    # Drawing goes through the screen canvas, and so do the skip counts
+    shared_stats = half.stats is half.screen.stats and half.output_diff is half.screen.output_diff
+    print(f"✓ Stats are the screen's: {shared_stats}")
+    
+    return sizes and dots and spans_match and halves and copied and shared_stats
+
+def test_text():
+    print("\nTesting text rendering...")
+    
+    canvas = Canvas(6, 12)
+    end = canvas.text(-2, 0, "clipped text", 'red')
+    canvas.text(8, 1, "edge")
+    canvas.text(0, 5, "last\nbelow")
+    canvas.text(0, 9, "off canvas")
+    clipped = (canvas.canvas[0] == list("ipped text  ") and end == 10
+               and canvas.styles[0][0] == STYLES.resolve('red') and canvas.styles[0][10] == 0
+               and canvas.canvas[1][8:] == list("edge") and ''.join(canvas.canvas[5]) == "last        ")
+    
+    # Big text glyphs are drawn from cached sprites in the bitmap font
+    banner = Canvas(7, 12)
+    width = banner.big_text(1, 1, "HI", color='cyan')
+    glyphs = ([''.join(row) for row in banner.canvas[1:6]] ==
+              [' █  █ ███   ', ' █  █  █    ', ' ████  █    ', ' █  █  █    ', ' █  █ ███   ']
+              and width == 9 and banner.styles[1][1] == STYLES.resolve('cyan'))
+    
+    # Partly visible glyphs are clipped like shapes and match a larger canvas
+    full = Canvas(20, 40)
+    full.big_text(10, 10, "Clip 42%", scale=2)
+    part = Canvas(14, 23)
+    part.big_text(10, 10, "Clip 42%", scale=2)
+    matches = all(part.canvas[r] == full.canvas[r][:23] for r in range(14))
+    
+    # Worlds split text at tile boundaries
+    world = WorldCanvas(200, 200, 4, 40, tile_size=16)
+    world.text(10, 1, "across tiles")
+    world_text = ''.join(world.render().canvas[1][10:22]) == "across tiles" and world.tile_count == 2
+    
+    print(f"✓ Text written and clipped: {clipped}")
+    print(f"✓ Big text drawn from the font: {glyphs}")
+    print(f"✓ Big text clipped at the edges: {matches}")
+    print(f"✓ Text written across world tiles: {world_text}")
+    
+    return clipped and glyphs and matches and world_text
+
+def test_lazy_package_import():
+    print("\nTesting lazy package import...")
+    
+    probe = """
+import sys
+import ascii_engine
+loaded = [name for name in ('ascii_engine.main', 'multiprocessing', 'numpy') if name in sys.modules]
+canvas = ascii_engine.Canvas(2, 2)
+particles = ascii_engine.ParticleSystem(10, use_numpy=False)
+print(loaded, 'ascii_engine.main' in sys.modules, 'multiprocessing' in sys.modules, 'numpy' in sys.modules)
+"""
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    output = result.stdout.strip()
+    lazy = output == "[] True False False"
+    
+    import ascii_engine
+    exported = ascii_engine.Canvas is Canvas and ascii_engine.world.WorldCanvas is WorldCanvas
+    try:
+        ascii_engine.NoSuchThing
+        unknown = False
+    except AttributeError:
+        unknown = True
+    
+    print(f"✓ Nothing loaded until first use: {lazy} {output or result.stderr.strip()}")
+    print(f"✓ Names resolve to their submodules: {exported}")
+    print(f"✓ Unknown names raise AttributeError: {unknown}")
+    
+    return lazy and exported and unknown
+
+def test_sketch_runner():
+    print("\nTesting the command line sketch runner...")
+    
+    import json
+    import pstats
+    import tempfile
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        cast = os.path.join(tmp, 'spiral.cast')
+        profile = os.path.join(tmp, 'spiral.prof')
+        result = subprocess.run([sys.executable, '-m', 'ascii_engine', 'run', os.path.join('examples', 'spiral.py'),
+                                 '--backend', 'headless', '--frames', '12', '--size', '20x60', '--fps', '24',
+                                 '--record', cast, '--profile', profile],
+                                capture_output=True, text=True, cwd=here)
+        ran = result.returncode == 0 and '12 frames' in result.stderr
+        
+        with open(cast, encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            events = [json.loads(line) for line in f]
+        recorded = (header['width'] == 60 and header['height'] == 21 and len(events) == 12
+                    and events[0][0] == 0.0 and events[-1][0] == round(11 / 24, 6)
+                    and events[0][2].startswith('\x1b[2J') and all(e[1] == 'o' for e in events))
+        
+        stats = pstats.Stats(profile)
+        profiled_draw = any(func[2] == 'draw' and func[0].endswith('spiral.py') for func in stats.stats)
+        profiled_setup = any(func[2] == 'setup' for func in stats.stats)
+        
+        broken = os.path.join(tmp, 'broken.py')
+        with open(broken, 'w') as f:
+            f.write("def draw():\n    1 / 0\n")
+        failed = subprocess.run([sys.executable, '-m', 'ascii_engine', 'run', broken, '--backend', 'headless',
+                                 '--frames', '1'], capture_output=True, text=True, cwd=here)
+        errors = failed.returncode == 1 and 'ZeroDivisionError' in failed.stderr
+    
+    # Standalone scripts are turned away without running their own main loop
+    script = subprocess.run([sys.executable, '-m', 'ascii_engine', 'run', os.path.join('examples', 'stripes.py'),
+                             '--backend', 'headless', '--frames', '1'], capture_output=True, text=True,
+                            cwd=here, timeout=30)
+    rejected = (script.returncode == 1 and len(script.stderr.strip().splitlines()) == 1
+                and 'not a setup()/draw() sketch' in script.stderr)
+    negative = subprocess.run([sys.executable, '-m', 'ascii_engine', 'run', os.path.join('examples', 'spiral.py'),
+                               '--backend', 'headless', '--frames', '-3'], capture_output=True, text=True, cwd=here)
+    validated = negative.returncode == 2 and 'positive' in negative.stderr
+    
+    print(f"✓ Sketch ran headless for a fixed frame count: {ran} {(result.stderr.strip().splitlines() or [''])[0]}")
+    print(f"✓ Frames recorded as asciicast timed by frame number: {recorded}")
+    print(f"✓ Profile covers draw() but not setup(): {profiled_draw and not profiled_setup}")
+    print(f"✓ Sketch errors give a traceback and exit status 1: {errors}")
+    print(f"✓ Scripts without draw() get a one line error: {rejected} {script.stderr.strip()[-60:]}")
+    print(f"✓ Frame counts must be positive: {validated}")
+    
+    return ran and recorded and profiled_draw and not profiled_setup and errors and rejected and validated
+
+def test_parallel_render():
+    print("\nTesting parallel offline rendering...")
+    
+    import tempfile
+    from ascii_engine.runner import run_sketch, render_sketch, frame_ranges
+    here = os.path.dirname(os.path.abspath(__file__))
+    sketch = os.path.join(here, 'examples', 'simple_shapes.py')
+    
+    def read(path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        serial = os.path.join(tmp, 'serial.cast')
+        parallel = os.path.join(tmp, 'parallel.cast')
+        reseeded = os.path.join(tmp, 'reseeded.cast')
+        run_sketch(sketch, frames=120, size=(20, 60), backend='headless', record=serial, seed=5)
+        stats = render_sketch(sketch, parallel, 120, size=(20, 60), seed=5, workers=2)
+        render_sketch(sketch, reseeded, 120, size=(20, 60), seed=6, workers=1)
+        same = read(serial) == read(parallel) and stats['workers'] == 2
+        seeded = read(reseeded) != read(parallel)
+        events = len(read(parallel).splitlines()) - 1
+    
+    ranges = (frame_ranges(10, 3) == [(0, 4), (4, 8), (8, 10)] and frame_ranges(2, 8) == [(0, 1), (1, 2)]
+              and frame_ranges(0, 4) == [] and frame_ranges(-5, 4) == [])
+    
+    print(f"✓ Frame ranges split contiguously: {ranges}")
+    print(f"✓ Parallel render matches a serial seeded run byte for byte: {same} ({events} events)")
+    print(f"✓ Another seed renders different frames: {seeded}")
+    
+    rejected = []
+    for option in (['--frames', '0'], ['--frames', '-4'], ['--frames', '10', '--workers', '0']):
+        result = subprocess.run([sys.executable, '-m', 'ascii_engine', 'render', sketch, os.devnull] + option,
+                                capture_output=True, text=True, cwd=here)
+        rejected.append(result.returncode == 2 and 'positive' in result.stderr and 'Traceback' not in result.stderr)
+    print(f"✓ Frame and worker counts must be positive: {rejected}")
+    
+    return ranges and same and seeded and all(rejected)
+
+def main():
+    print("=== ASCII Engine Rendering Tests ===\n")
+    
+    tests = [
+        test_style_interning,
+        test_styled_canvas_encoding,
+        test_rgb_color_modes,
+        test_swap_chain_hands_off_complete_frames,
+        test_sketch_process_shared_framebuffer,
+        test_hot_reload_keeps_state,
+        test_identical_frames_skipped,
+        test_terminal_writer,
+        test_resize_without_restart,
+        test_world_canvas,
+        test_analytic_clipping,
+        test_polyline,
+        test_polygon_fill,
+        test_batched_shapes,
+        test_particles,
+        test_subcell_canvases,
+        test_text,
+        test_lazy_package_import,
+        test_sketch_runner,
+        test_parallel_render,
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+        
+    print(f"=== Test Results: {passed}/{total} tests passed ===")
+    
+    if passed == total:
+        print("🎉 All rendering tests passed!")
+    else:
+        print("❌ Some tests failed")
+        
+    return passed == total
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -11,6 +11,7 @@ import time
 sys.path.append('.')
 
 from ascii_engine.main import Canvas, COLORS
+from ascii_engine.sketch_process import sketch_namespace
 
 def test_code_execution():
     print("Testing code execution system...")
@@ -143,7 +144,8 @@ def test_example_sketches():
         return False
         
     # Test only our new example files
-    test_files = ['bouncing_ball.py', 'sine_wave.py', 'spiral.py', 'simple_shapes.py']
+    test_files = ['bouncing_ball.py', 'sine_wave.py', 'spiral.py', 'simple_shapes.py',
+                  'fireworks.py', 'braille_plot.py']
     
     canvas = Canvas(20, 60)
     success_count = 0
@@ -160,14 +162,7 @@ def test_example_sketches():
                 code = f.read()
                     
             # Create execution namespace
-            namespace = {
-                'canvas': canvas,
-                'Canvas': Canvas,
-                'COLORS': COLORS,
-                'randint': __import__('random').randint,
-                'math': __import__('math'),
-                'time': __import__('time')
-            }
+            namespace = sketch_namespace(canvas)
             
             # Execute code
             exec(code, namespace)
@@ -191,6 +186,190 @@ def test_example_sketches():
     print(f"\nExample sketches: {success_count}/{total_count} successful")
     return success_count == total_count
 
+def test_preview_style_runs():
+    """Test that canvas rows split into one curses write per style run"""
+    print("\nTesting preview style runs...")
+    
+    from ascii_ide import style_runs
+    from ascii_engine.styles import STYLES
+    
+    canvas = Canvas(1, 10)
+    canvas.rect(0, 0, 3, 1, color='red')
+    canvas.rect(5, 0, 2, 1, color='blue')
+    runs = list(style_runs(canvas.canvas[0], canvas.styles[0]))
+    
+    print(f"✓ Runs: {[(start, text) for start, text, _ in runs]}")
+    
+    expected = [(0, '███', STYLES.resolve('red')), (3, '  ', 0),
+                (5, '██', STYLES.resolve('blue')), (7, '   ', 0)]
+    return runs == expected
+
+def test_curses_color_pairs():
+    """Test that color pairs stay within 256 and fall back to the nearest pair"""
+    print("\nTesting curses color pair allocation...")
+    
+    from ascii_engine.curses_output import CursesPairs
+    
+    initialized = {}
+    pairs = CursesPairs(65536, init_pair=lambda n, fg, bg: initialized.setdefault(n, (fg, bg)))
+    numbers = [pairs.pair(fg, bg) for fg in range(16, 232) for bg in (-1, 16)]
+    in_range = max(numbers) == 255 and len(initialized) == 240 and pairs.limit == 256
+    print(f"✓ Pairs limited to the 8 bits color_pair() packs: {in_range} (max {max(numbers)})")
+    
+    # Foregrounds 16-135 got pairs; bright red (196) now reuses the closest red, 124
+    near = (initialized[pairs.pair(196, -1)] == (124, -1)
+            and initialized[pairs.pair(196, 16)] == (124, 16))
+    default = pairs.pair(-1, -1) == 0 and len(initialized) == 240
+    print(f"✓ Exhausted pairs fall back to the nearest one: {near}")
+    print(f"✓ Existing pairs are never redefined: {default}")
+    
+    return in_range and near and default
+
+def test_piece_table_editing():
+    """Test the editor's piece table buffer against plain string edits, with undo/redo"""
+    print("\nTesting piece table buffer...")
+    
+    from ascii_ide import PieceTable
+    
+    text = "def setup():\n    pass\n\ndef draw():\n    pass"
+    buffer = PieceTable(text)
+    rng = __import__('random').Random(7)
+    for i in range(300):
+        offset = rng.randint(0, len(text))
+        length = rng.randint(0, 3)
+        insert = rng.choice(['', 'x', 'ab', '\n', 'q\nr'])
+        buffer.replace(offset, length, insert)
+        text = text[:offset] + insert + text[offset + length:]
+        if i % 10 == 0:
+            buffer.close_undo_entry()
+    
+    lines = text.split('\n')
+    if buffer.text() != text or buffer.line_count() != len(lines):
+        print("✗ Buffer text diverged from reference")
+        return False
+    if [buffer.line(i) for i in range(len(lines))] != lines:
+        print("✗ Line lookup diverged from reference")
+        return False
+    print(f"✓ 300 random edits match ({len(lines)} lines)")
+    
+    # Typing coalesces into one undo step; undo and redo restore exact snapshots
+    buffer = PieceTable("x = 1\n")
+    for ch in "print(x)":
+        buffer.insert(1, len(buffer.line(1)), ch)
+    buffer.close_undo_entry()
+    buffer.delete(0, 0, 6)
+    typed = "x = 1\nprint(x)"
+    if buffer.undo() != (1, 0) or buffer.text() != typed:
+        print("✗ Undo of delete failed")
+        return False
+    if buffer.undo() != (1, 0) or buffer.text() != "x = 1\n":
+        print("✗ Undo of typing failed")
+        return False
+    if buffer.redo() != (1, 8) or buffer.text() != typed:
+        print("✗ Redo failed")
+        return False
+    print("✓ Undo/redo restore typing runs and deletions")
+    return True
+
+def test_incremental_highlighting():
+    """Test cached per-line highlighting across multi-line strings and edits"""
+    print("\nTesting incremental syntax highlighting...")
+    
+    from ascii_ide import PieceTable, SyntaxHighlighter, PAIR_KEYWORD, PAIR_STRING, PAIR_TEXT
+    
+    buffer = PieceTable('def draw():\n    text = """\n    if inside\n    """\n    if x: pass')
+    highlighter = SyntaxHighlighter(buffer)
+    
+    line, runs = highlighter.line_runs(2)
+    if runs != [(0, len(line), PAIR_STRING)]:
+        print(f"✗ Line inside triple-quoted string: {runs}")
+        return False
+    line, runs = highlighter.line_runs(4)
+    if (4, 6, PAIR_KEYWORD) not in runs:
+        print(f"✗ Keyword after string not highlighted: {runs}")
+        return False
+    print("✓ Multi-line string state carried between lines")
+    
+    # Closing the string early re-lexes the lines after the edit
+    buffer.insert(1, len(buffer.line(1)), '"""')
+    line, runs = highlighter.line_runs(2)
+    if (4, 6, PAIR_KEYWORD) not in runs:
+        print(f"✗ Edit did not invalidate later lines: {runs}")
+        return False
+    print("✓ Edits invalidate only the lines after them")
+    
+    cached = len(highlighter.cache)
+    highlighter.line_runs(2)
+    if len(highlighter.cache) != cached:
+        print("✗ Unchanged line was lexed again")
+        return False
+    print(f"✓ Unchanged lines come from the cache ({cached} entries)")
+    return True
+
+def test_bracketed_paste_parsing():
+    """Test that drained keys group bracketed pastes into single text events"""
+    print("\nTesting bracketed paste parsing...")
+    
+    from ascii_ide import parse_keys
+    
+    keys = [ord('a')] + list(b'\x1b[200~x = 1\r\tpass\x1b[201~') + [27]
+    events = parse_keys(keys, final=True)
+    if events != [ord('a'), 'x = 1\n    pass', 27]:
+        print(f"✗ Unexpected events: {events}")
+        return False
+    print(f"✓ Paste collected into one event: {events[1]!r}")
+    
+    # A paste cut off mid-read waits for the rest
+    if parse_keys(list(b'\x1b[200~half')) is not None or parse_keys(list(b'\x1b[20')) is not None:
+        print("✗ Incomplete paste was not held back")
+        return False
+    print("✓ Incomplete pastes wait for more input")
+    
+    # ESC quits; only ESC [ could be the start of a paste worth waiting for
+    from ascii_ide import collect_events
+    
+    def drainer(*chunks):
+        waits = []
+        chunks = [list(chunk) for chunk in chunks]
+        def drain(wait):
+            waits.append(wait)
+            return chunks.pop(0) if chunks else []
+        return drain, waits
+    
+    drain, waits = drainer([27])
+    lone_esc = parse_keys([27]) == [27] and collect_events(drain) == [27] and waits == [0]
+    drain, waits = drainer(b'\x1b[200~x', b' = 1\x1b[201~')
+    split = collect_events(drain) == ['x = 1'] and waits == [0, 0.05]
+    if not (lone_esc and split):
+        print(f"✗ Lone ESC or split paste mishandled: {lone_esc} {split}")
+        return False
+    print("✓ Lone ESC acts at once; a split paste waits for its end")
+    return True
+
+def test_editor_damage_tracking():
+    """Test which editor rows are repainted after edits"""
+    print("\nTesting editor damage tracking...")
+    
+    from ascii_ide import LineDamage
+    
+    damage = LineDamage(line_count=100)
+    damage.mark(5, 6, 100)
+    in_place = damage.rows(0, 20) == [5, 6] and damage.rows(6, 20) == [0]
+    
+    # Inserting a line moves everything below it
+    damage.mark(50, 50, 101)
+    shifted = damage.rows(40, 20) == list(range(10, 20)) and damage.line_count == 101
+    
+    moved_cursor = damage.rows(0, 20, (2, 5)) == [2, 5, 6]
+    damage.clear()
+    cleared = damage.rows(0, 100) == [] and damage.rows(0, 20, (3,)) == [3]
+    
+    print(f"✓ Edits within lines repaint just those rows: {in_place}")
+    print(f"✓ Edits that shift lines repaint everything below: {shifted}")
+    print(f"✓ Cursor moves add their rows: {moved_cursor}")
+    print(f"✓ Nothing to repaint after painting: {cleared}")
+    return in_place and shifted and moved_cursor and cleared
+
 def main():
     print("=== ASCII Engine IDE Core Functionality Tests ===\n")
     
@@ -198,7 +377,13 @@ def main():
         test_code_execution,
         test_syntax_highlighting_keywords, 
         test_file_operations,
-        test_example_sketches
+        test_example_sketches,
+        test_preview_style_runs,
+        test_curses_color_pairs,
+        test_piece_table_editing,
+        test_incremental_highlighting,
+        test_bracketed_paste_parsing,
+        test_editor_damage_tracking
     ]
     
     passed = 0